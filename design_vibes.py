@@ -2,6 +2,8 @@
 # ABOUTME: CLI entry point for 1000 Design Vibes.
 # ABOUTME: Provides manifest and status commands. Design generation happens via Claude Code agents.
 
+import sys
+
 import click
 
 
@@ -33,22 +35,177 @@ def status(path: str):
 @cli.command()
 @click.option("--path", required=True, help="Path to output folder")
 @click.option("--fix", is_flag=True, help="Attempt to fix fixable issues")
-def validate(path: str, fix: bool):
-    """Validate designs for CSS comment issues and other problems."""
+@click.option("--no-cache", is_flag=True, help="Ignore and do not update the validation cache")
+@click.option("--rule", "only", multiple=True, help="Only run this rule (repeatable)")
+@click.option("--skip", multiple=True, help="Skip this rule (repeatable)")
+@click.option("--profile", is_flag=True, help="Show per-rule wall time and hit counts")
+@click.option("--dry-run", is_flag=True, help="With --fix, print unified diffs instead of writing")
+@click.option("--patch", "patch_path", default=None, help="With --fix, write fixes to this patch file instead")
+@click.option("--workers", default=None, type=int, help="Worker processes for fixing (default: CPU count)")
+@click.option("--rollback", is_flag=True, help="Undo the most recent --fix run for this batch")
+@click.option("--format", "fmt", type=click.Choice(["table", "jsonl", "junit", "sarif"]), default="table",
+              help="Output format; non-table formats stream to stdout and exit 0 when clean, "
+                   "1 for warnings only, 3 for errors, 2 for usage errors")
+def validate(path: str, fix: bool, no_cache: bool, only: tuple[str, ...], skip: tuple[str, ...],
+             profile: bool, dry_run: bool, patch_path: str | None, workers: int | None, rollback: bool,
+             fmt: str):
+    """Validate designs for CSS comment issues and other problems.
+
+    --path may also be an outputs folder when streaming with --format.
+    Exit codes for streamed formats: 0 clean, 1 warnings only, 3 errors,
+    2 for usage errors such as a missing path or an unknown rule.
+    """
     from pathlib import Path
-    from src.validate import validate_batch, show_validation_report
+    from src.reporters import stream_validation
+    from src.validate import (RuleProfile, rollback_fixes, select_rules, show_rule_profile,
+                              show_validation_report, validate_batch)
 
+    if (dry_run or patch_path) and not fix:
+        raise click.UsageError("--dry-run and --patch only apply with --fix")
+
+    # Streamed formats gate CI, so setup errors are usage errors (exit 2).
+    streaming = fmt != "table"
     batch_path = Path(path)
+    if streaming and not batch_path.is_dir():
+        reason = "Path not found" if not batch_path.exists() else "Not a folder"
+        raise click.BadParameter(f"{reason}: {path}", param_hint="'--path'")
     if not batch_path.exists():
         click.echo(f"Path not found: {path}")
         return
 
-    results = validate_batch(batch_path, fix=fix)
+    if rollback:
+        try:
+            restored, skipped = rollback_fixes(batch_path)
+        except FileNotFoundError as e:
+            click.echo(str(e))
+            return
+        click.echo(f"Restored {restored} files")
+        for line in skipped:
+            click.echo(f"  skipped {line}")
+        return
+
+    try:
+        rules = select_rules(list(only), list(skip))
+    except ValueError as e:
+        if streaming:
+            raise click.BadParameter(str(e), param_hint="'--rule' / '--skip'")
+        click.echo(str(e))
+        return
+
+    if streaming:
+        if fix or profile:
+            raise click.UsageError(f"--format {fmt} cannot be combined with --fix or --profile")
+        sys.exit(stream_validation(batch_path, fmt, use_cache=not no_cache, rules=rules))
+
+    rule_profile = RuleProfile() if profile else None
+    results = validate_batch(batch_path, fix=fix, use_cache=not no_cache, rules=rules, profile=rule_profile,
+                             dry_run=dry_run, patch_path=Path(patch_path) if patch_path else None,
+                             workers=workers)
     show_validation_report(results)
+    if rule_profile is not None:
+        show_rule_profile(rule_profile)
+
+
+@cli.command()
+@click.option("--path", required=True, help="Path to output folder")
+@click.option("--settle", default=5.0, help="Seconds a staged file must be unmodified before promotion")
+@click.option("--workers", default=None, type=int, help="Worker processes for validation (default: CPU count)")
+@click.option("--dry-run", is_flag=True, help="Report what would be promoted without moving anything")
+def promote(path: str, settle: float, workers: int | None, dry_run: bool):
+    """Validate staged designs and move passing ones into designs/."""
+    from pathlib import Path
+    from src.promote import promote_batch, show_promote_report
+
+    batch_path = Path(path)
+    if not batch_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    try:
+        summary = promote_batch(batch_path, settle_seconds=settle, dry_run=dry_run, workers=workers)
+    except RuntimeError as e:
+        click.echo(str(e))
+        return
+    show_promote_report(summary, dry_run=dry_run)
+
+
+@cli.group()
+def postprocess():
+    """Transforms applied to finished design files."""
+    pass
+
+
+@postprocess.command("run")
+@click.option("--path", default="outputs", help="Batch folder or outputs folder (default: outputs)")
+@click.option("--transform", "names", multiple=True, help="Transform to apply, in order (default: all)")
+@click.option("--dry-run", is_flag=True, help="Report changes without writing files")
+@click.option("--workers", default=None, type=int, help="Worker processes (default: CPU count)")
+@click.option("--force", is_flag=True, help="Reprocess files even if unchanged since the last run")
+def postprocess_run(path: str, names: tuple[str, ...], dry_run: bool, workers: int | None, force: bool):
+    """Run a chain of transforms over every design, reading and writing each file once."""
+    _run_transforms(path, list(names), dry_run, workers, force)
+
+
+@postprocess.command("strip-arrow-nav")
+@click.option("--path", default="outputs", help="Batch folder or outputs folder (default: outputs)")
+@click.option("--dry-run", is_flag=True, help="Report changes without writing files")
+@click.option("--workers", default=None, type=int, help="Worker processes (default: CPU count)")
+@click.option("--force", is_flag=True, help="Reprocess files even if unchanged since the last run")
+def strip_arrow_nav(path: str, dry_run: bool, workers: int | None, force: bool):
+    """Remove the designs' own arrow-key navigation so the viewer's keys work."""
+    _run_transforms(path, ["strip-arrow-nav"], dry_run, workers, force)
+
+
+def _run_transforms(path: str, names: list[str], dry_run: bool, workers: int | None, force: bool):
+    from pathlib import Path
+    from src.pipeline import chain_signature, run_pipeline, select_transforms, show_pipeline_report
+
+    target = Path(path)
+    if not target.exists():
+        click.echo(f"Path not found: {path}")
+        return
+    if not target.is_dir():
+        click.echo(f"Not a folder: {path}")
+        return
+
+    try:
+        transforms = select_transforms(names)
+    except ValueError as e:
+        click.echo(str(e))
+        return
+
+    total, skipped, results = run_pipeline(target, transforms, dry_run=dry_run, workers=workers, force=force)
+    show_pipeline_report(chain_signature(transforms), total, skipped, results, dry_run)
+
+
+@cli.command()
+@click.argument("query")
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--limit", default=10, type=click.IntRange(min=1), help="Number of results (default: 10)")
+@click.option("--workers", default=None, type=int, help="Worker processes for indexing (default: CPU count)")
+def search(query: str, path: str, limit: int, workers: int | None):
+    """Full-text search over the text and headings of every design page."""
+    from pathlib import Path
+    from src.fulltext import index_designs, show_search_results
+    from src.viewer import collect_all_designs
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    designs = collect_all_designs(outputs_path)
+    build = index_designs(outputs_path, designs, workers=workers)
+    if build.parsed:
+        click.echo(f"Indexed {build.parsed} new or changed pages")
+    show_search_results(build.index.query(query, limit), designs, query)
 
 
 @cli.command()
-def build_viewer():
+@click.option("--no-cache", is_flag=True, help="Re-read every manifest instead of reusing cached batches")
+@click.option("--preload", default=2, type=click.IntRange(min=0),
+              help="Designs to keep loaded on each side of the current one (default: 2)")
+def build_viewer(no_cache: bool, preload: int):
     """Build unified viewer for browsing all designs."""
     from pathlib import Path
     from src.viewer import build_viewer
@@ -58,7 +215,251 @@ def build_viewer():
         click.echo("No outputs directory found")
         return
 
-    build_viewer(outputs_path)
+    build_viewer(outputs_path, use_cache=not no_cache, preload=preload)
+
+
+@cli.command()
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--dist", default="dist", help="Where to write the site (default: dist)")
+@click.option("--workers", default=None, type=int, help="Worker processes (default: CPU count)")
+@click.option("--preload", default=2, type=click.IntRange(min=0),
+              help="Designs the viewer keeps loaded on each side of the current one (default: 2)")
+@click.option("--clean", is_flag=True, help="Delete the dist folder first and rebuild everything")
+@click.option("--no-minify", is_flag=True, help="Publish designs byte-for-byte instead of minified")
+def build_site(path: str, dist: str, workers: int | None, preload: int, clean: bool, no_minify: bool):
+    """Build the publishable site: minified designs, hashed file names, .gz/.br siblings."""
+    from pathlib import Path
+    from src.site import build_site, clean_site, show_site_report, show_size_budget
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    dist_path = Path(dist)
+    if clean:
+        clean_site(dist_path)
+
+    result = build_site(outputs_path, dist_path, workers=workers, preload=preload, minify=not no_minify)
+    if result is None:
+        click.echo("No designs found")
+        return
+    show_size_budget(result)
+    show_site_report(result, dist_path)
+
+
+@cli.command()
+@click.argument("design", required=False)
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--workers", default=None, type=int, help="Worker processes for extraction (default: CPU count)")
+def tokens(design: str | None, path: str, workers: int | None):
+    """Extract design tokens into the token database; show one design's with BATCH/ID."""
+    from pathlib import Path
+    from src.tokens import build_token_db, find_design, show_design_tokens, show_token_summary
+    from src.viewer import collect_all_designs
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    designs = collect_all_designs(outputs_path)
+    position = None
+    if design:
+        try:
+            position = find_design(designs, design)
+        except ValueError as e:
+            click.echo(str(e))
+            return
+        if position is None:
+            click.echo(f"Design not found: {design} (expected BATCH/ID)")
+            return
+
+    build = build_token_db(outputs_path, designs, workers=workers)
+    if position is None:
+        show_token_summary(build)
+        return
+    found = designs[position]
+    show_design_tokens(build.db.for_design(position), f"{found['name']} ({found['batch']}/{found['id']})")
+
+
+@cli.command()
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--threshold", default=0.8, type=click.FloatRange(0.0, 1.0),
+              help="Minimum estimated similarity of page HTML/CSS (default: 0.8)")
+@click.option("--workers", default=None, type=int, help="Worker processes for hashing (default: CPU count)")
+@click.option("--paths", "list_paths", is_flag=True,
+              help="Only print the page path of every duplicate (all but the first design of each cluster)")
+def duplicates(path: str, threshold: float, workers: int | None, list_paths: bool):
+    """Find designs whose pages are near-duplicates of each other."""
+    from pathlib import Path
+    from src.duplicates import find_duplicates, show_duplicates
+    from src.viewer import collect_all_designs
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    designs = collect_all_designs(outputs_path)
+    report = find_duplicates(outputs_path, designs, threshold=threshold, workers=workers)
+    if list_paths:
+        for position in report.duplicates():
+            click.echo(designs[position]["path"])
+        return
+    show_duplicates(report, designs)
+
+
+@cli.command()
+@click.argument("design")
+@click.option("--limit", default=10, type=click.IntRange(min=1), help="Number of results (default: 10)")
+@click.option("--metric", default="cosine", type=click.Choice(["cosine", "l2"]),
+              help="Cosine similarity or L2 distance (default: cosine)")
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--workers", default=None, type=int, help="Worker processes for token extraction (default: CPU count)")
+def similar(design: str, limit: int, metric: str, path: str, workers: int | None):
+    """Find the designs most like DESIGN (given as BATCH/ID)."""
+    from pathlib import Path
+    from src.similar import build_similar_index, show_similar
+    from src.tokens import collect_tokens, find_design
+    from src.viewer import collect_all_designs
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    designs = collect_all_designs(outputs_path)
+    try:
+        position = find_design(designs, design)
+    except ValueError as e:
+        click.echo(str(e))
+        return
+    if position is None:
+        click.echo(f"Design not found: {design} (expected BATCH/ID)")
+        return
+
+    tokens, _ = collect_tokens(outputs_path, designs, workers)
+    index = build_similar_index(outputs_path, designs, tokens)
+    show_similar(index, designs, position, index.query(position, limit, metric), metric)
+
+
+@cli.command()
+@click.argument("design", required=False)
+@click.option("--batch", default=None, help="Export every design in one batch")
+@click.option("--format", "formats", multiple=True,
+              type=click.Choice(["tailwind", "style-dictionary", "figma"]),
+              help="Format to write; repeat for several (default: all)")
+@click.option("--out", default="exports", help="Output folder (default: exports)")
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--workers", default=None, type=int, help="Worker processes (default: CPU count)")
+def export(design: str | None, batch: str | None, formats: tuple[str, ...], out: str, path: str,
+           workers: int | None):
+    """Export design tokens as Tailwind, Style Dictionary and Figma tokens files.
+
+    Give one design as BATCH/ID, a whole batch with --batch, or nothing to
+    export every design.
+    """
+    from pathlib import Path
+    from src.export import EXPORT_FORMATS, export_tokens, show_export_report
+    from src.tokens import build_token_db, find_design
+    from src.viewer import collect_all_designs
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    designs = collect_all_designs(outputs_path)
+    if design:
+        try:
+            position = find_design(designs, design)
+        except ValueError as e:
+            click.echo(str(e))
+            return
+        if position is None:
+            click.echo(f"Design not found: {design} (expected BATCH/ID)")
+            return
+        rows = [position]
+    elif batch:
+        rows = [i for i, d in enumerate(designs) if d["batch"] == batch]
+        if not rows:
+            click.echo(f"No designs found in batch: {batch}")
+            return
+    else:
+        rows = list(range(len(designs)))
+
+    db = build_token_db(outputs_path, designs, workers=workers).db
+    out_path = Path(out)
+    result = export_tokens([db.for_design(row) for row in rows], [designs[row] for row in rows], out_path,
+                           formats or tuple(EXPORT_FORMATS), workers=workers)
+    show_export_report(result, out_path)
+
+
+@cli.command()
+@click.argument("design", required=False)
+@click.option("--path", default="outputs", help="Outputs folder (default: outputs)")
+@click.option("--limit", default=15, type=click.IntRange(min=0), help="Worst designs to list (default: 15)")
+@click.option("--workers", default=None, type=int, help="Worker processes for extraction (default: CPU count)")
+def audit(design: str | None, path: str, limit: int, workers: int | None):
+    """WCAG contrast and palette audit; give BATCH/ID for one design's pairs."""
+    from pathlib import Path
+    from src.audit import run_audit, show_audit, show_design_audit
+    from src.tokens import collect_tokens, find_design
+    from src.viewer import collect_all_designs
+
+    outputs_path = Path(path)
+    if not outputs_path.exists():
+        click.echo(f"Path not found: {path}")
+        return
+
+    designs = collect_all_designs(outputs_path)
+    position = None
+    if design:
+        try:
+            position = find_design(designs, design)
+        except ValueError as e:
+            click.echo(str(e))
+            return
+        if position is None:
+            click.echo(f"Design not found: {design} (expected BATCH/ID)")
+            return
+
+    tokens, _ = collect_tokens(outputs_path, designs, workers)
+    result = run_audit(outputs_path, designs, tokens, workers=workers)
+    if position is None:
+        show_audit(result, limit)
+    else:
+        show_design_audit(result, position)
+
+
+@cli.command()
+@click.option("--port", default=8000, type=int, help="Port to listen on (default: 8000)")
+@click.option("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+@click.option("--dist", "dist", default=None, help="Serve a build-site folder (e.g. dist) instead of the project root")
+@click.option("--no-watch", is_flag=True, help="Don't rebuild and live-reload when designs change")
+@click.option("--verbose", is_flag=True, help="Log every request")
+def serve(port: int, host: str, dist: str | None, no_watch: bool, verbose: bool):
+    """Preview the gallery over HTTP with caching, gzip and live reload."""
+    from functools import partial
+    from pathlib import Path
+    from src.server import serve as run_server
+
+    outputs_path = Path("outputs")
+    root = Path(dist) if dist else Path(".")
+    rebuild = None
+    if not no_watch:
+        if dist:
+            from src.site import build_site
+            rebuild = partial(build_site, outputs_path, root)
+        else:
+            from src.viewer import build_viewer
+            rebuild = partial(build_viewer, outputs_path)
+
+    if not (root / "index.html").exists():
+        click.echo(f"No index.html in {root}; run {'build-site' if dist else 'build-viewer'} first")
+        return
+    run_server(root, outputs_path, rebuild, host=host, port=port, quiet=not verbose)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+# ABOUTME: Benchmarks the viewer search index on a synthetic corpus built from outputs/.
+# ABOUTME: Reports index size (raw and gzipped), build time and query latency percentiles.
+
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.search_index import SearchIndex, build_search_index  # noqa: E402
+from src.viewer import collect_all_designs  # noqa: E402
+
+QUERIES = [
+    "velvet", "sakura", "velvet sakura", "status page", "dashboard dark", "neon",
+    "brutal", "glass", "velv", "sak", "sakra", "minimal serif", "retro", "zzz",
+]
+
+
+def synthetic_corpus(designs: list[dict], size: int) -> list[dict]:
+    """Repeat the real designs under suffixed batch names until there are size of them."""
+    corpus = []
+    copy = 0
+    while len(corpus) < size:
+        for design in designs:
+            corpus.append({**design, "batch": f"{design['batch']}-{copy:02d}"})
+        copy += 1
+    return corpus[:size]
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main(size: int = 10_000, rounds: int = 50) -> None:
+    designs = collect_all_designs(Path("outputs"))
+    if not designs:
+        print("No designs found under outputs/")
+        return
+    corpus = synthetic_corpus(designs, size)
+
+    started = time.perf_counter()
+    index = build_search_index(corpus)
+    build_ms = (time.perf_counter() - started) * 1000
+    raw = json.dumps(index, separators=(",", ":")).encode()
+
+    print(f"designs: {len(corpus)}  terms: {len(index['terms'])}  trigrams: {len(index['trigrams'])}")
+    print(f"build: {build_ms:.0f} ms  size: {len(raw) / 1024:.0f} KB  gzip: {len(gzip.compress(raw)) / 1024:.0f} KB")
+    print(f"\n{'query':<16}{'hits':>6}{'cold ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+    for query in QUERIES:
+        # Cold: a fresh SearchIndex, so postings are decoded on demand.
+        started = time.perf_counter()
+        hits = SearchIndex(index).query(query, limit=len(corpus))
+        cold = (time.perf_counter() - started) * 1000
+
+        searcher = SearchIndex(index)
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            searcher.query(query)
+            samples.append((time.perf_counter() - started) * 1000)
+        print(f"{query:<16}{len(hits):>6}{cold:>10.2f}{statistics.median(samples):>10.2f}{percentile(samples, 0.95):>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,80 @@
+# ABOUTME: Benchmarks the `serve` preview server with many concurrent keep-alive clients.
+# ABOUTME: Reports requests/second and latency percentiles for full, gzip, 304 and range requests.
+
+import http.client
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.server import make_server  # noqa: E402
+from src.viewer import collect_all_designs  # noqa: E402
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def client(port: int, paths: list[str], headers: dict, requests: int, offset: int) -> list[float]:
+    """One keep-alive connection issuing requests round-robin over paths; returns latencies in ms."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    latencies = []
+    for i in range(requests):
+        path = paths[(offset + i) % len(paths)]
+        started = time.perf_counter()
+        connection.request("GET", path, headers=headers(path) if callable(headers) else headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    return latencies
+
+
+def run(port: int, label: str, paths: list[str], headers, clients: int, requests: int) -> None:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda n: client(port, paths, headers, requests, n), range(clients)))
+    elapsed = time.perf_counter() - started
+    samples = [ms for latencies in results for ms in latencies]
+    print(f"{label:<14}{clients:>8}{len(samples) / elapsed:>12,.0f}"
+          f"{statistics.median(samples):>10.2f}{percentile(samples, 0.95):>10.2f}{percentile(samples, 0.99):>10.2f}")
+
+
+def main(clients: int = 64, requests: int = 200) -> None:
+    designs = collect_all_designs(Path("outputs"))
+    if not designs or not Path("index.html").exists():
+        print("Run build-viewer first")
+        return
+
+    server = make_server(Path("."), port=0, live_reload=False)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    paths = ["/" + design["path"] for design in designs]
+    etags = {}
+    for path in paths:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("GET", path, headers={"Accept-Encoding": "gzip"})
+        response = connection.getresponse()
+        response.read()
+        etags[path] = response.getheader("ETag")
+        connection.close()
+
+    print(f"{len(paths)} designs, {requests} requests per client (files cached in memory after warm-up)")
+    print(f"\n{'request':<14}{'clients':>8}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for concurrency in sorted({1, clients // 4 or 1, clients}):
+        run(port, "full", paths, {}, concurrency, requests)
+        run(port, "gzip", paths, {"Accept-Encoding": "gzip"}, concurrency, requests)
+        run(port, "304", paths, lambda p: {"Accept-Encoding": "gzip", "If-None-Match": etags[p]},
+            concurrency, requests)
+        run(port, "range 4KB", paths, {"Range": "bytes=0-4095"}, concurrency, requests)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
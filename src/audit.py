@@ -0,0 +1,353 @@
+# ABOUTME: WCAG contrast audit: foreground/background pairs from design tokens and common CSS selectors.
+# ABOUTME: Contrast ratios and palette delta-E spread are computed for the whole corpus at once with NumPy.
+
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from .cache import cached_map
+from .tokens import page_css, parse_color, resolve_vars
+
+console = Console()
+
+# Bump when selector pair extraction changes so cached pairs are redone.
+AUDIT_VERSION = 3
+
+# Minimum contrast per pair kind: body text (WCAG 1.4.3 AA), large text such
+# as headings (1.4.3 AA large), and UI components like buttons (1.4.11).
+REQUIRED_RATIO = {"text": 4.5, "large": 3.0, "ui": 3.0}
+KINDS = tuple(REQUIRED_RATIO)
+
+# Selectors whose color/background pairs are audited, and what they hold.
+SELECTOR_KINDS = {
+    "body": "text", "main": "text", "p": "text", "a": "text", "li": "text", "nav": "text",
+    "header": "text", "footer": "text", "label": "text", "small": "text", "td": "text",
+    "th": "text", "code": "text", "blockquote": "text", ".card": "text",
+    "h1": "large", "h2": "large", "h3": "large",
+    "button": "ui", ".btn": "ui", ".button": "ui", "input": "ui",
+}
+
+# Dimensions the report breaks failures down by.
+AUDIT_DIMENSIONS = ("color_contrast", "color_mode")
+
+# Palette colors closer than this (CIE76 delta-E) are hard to tell apart.
+CLOSE_DELTA_E = 5.0
+
+_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_COLOR_TOKEN_RE = re.compile(r"#[0-9a-fA-F]{3,8}\b|(?:rgba?|hsla?)\([^()]*\)|\b[a-zA-Z]+\b")
+_CLIP_TEXT_RE = re.compile(r"(?:^|[;\s])(?:-webkit-)?background-clip\s*:\s*text\b", re.IGNORECASE)
+_COLOR_DECLARATION_RE = re.compile(r"(?:^|;)\s*(color|background-color|background)\s*:\s*([^;]+)", re.IGNORECASE)
+
+_TEXT_WORDS = ("text", "foreground", "fg")
+_BACKGROUND_WORDS = ("background", "bg", "surface")
+# Tokens for a different surface than the page's, and status/effect colors.
+_QUALIFIER_WORDS = ("inverse", "invert", "light", "dark", "white", "black", "contrast")
+_SKIPPED_WORDS = ("shadow", "glow", "error", "success", "warning", "danger", "info", "decoration", "selection")
+_ON_RE = re.compile(r"-on-([a-z0-9-]+)$")
+_UI_RE = re.compile(r"-(?:primary|accent)(?:-\d+)?$")
+
+_WHITE = [255.0, 255.0, 255.0, 1.0]
+_BLACK = [0.0, 0.0, 0.0, 1.0]
+
+
+def _rgba(value: str, props: dict[str, str]) -> list[float] | None:
+    parsed = parse_color(resolve_vars(value, props).strip().removesuffix("!important").strip())
+    return [*parsed[0], parsed[1]] if parsed else None
+
+
+def _stops(value: str, props: dict[str, str]) -> list[list[float]]:
+    """A background's colors: the color itself, or a gradient's stops. Empty for images."""
+    value = resolve_vars(value, props)
+    if "url(" in value:
+        return []
+    color = _rgba(value, props)
+    if color is not None:
+        return [color]
+    return [[*rgb, alpha] for rgb, alpha in (p for p in map(parse_color, _COLOR_TOKEN_RE.findall(value)) if p)]
+
+
+def _background(value: str, props: dict[str, str]) -> list[float] | None:
+    """A background's color; gradients count as the mean of their stops. None for images."""
+    stops = _stops(value, props)
+    return np.array(stops, dtype=float).mean(axis=0).tolist() if stops else None
+
+
+def extract_selector_pairs(html: str) -> list[list]:
+    """[label, kind, fg rgba, bg rgba, backdrop rgba] for common selectors that set a color.
+
+    A rule's missing side is inherited from body; body falls back to the
+    browser's black on white. backdrop is what a translucent background
+    sits on (body's background). Rules over background images are skipped.
+    Gradient text (background-clip: text) is scored stop by stop as the
+    foreground on the page background, since that's what shows through.
+    """
+    css, props = page_css(html)
+    rules: dict[str, dict] = {}
+    for selectors, body in _RULE_RE.findall(css):
+        declared: dict = {}
+        clip_text = bool(_CLIP_TEXT_RE.search(body))
+        for prop, value in _COLOR_DECLARATION_RE.findall(body):
+            if prop.lower() == "color":
+                color = _rgba(value, props)
+                if color is not None and not clip_text:
+                    declared["fg"] = color
+            elif value.strip().lower() in ("inherit", "none", "initial", "unset"):
+                continue
+            elif clip_text:
+                declared["stops"] = _stops(value, props)  # Empty: an image, contrast unknown
+            else:
+                declared["bg"] = _background(value, props)  # None: an image, contrast unknown
+        if not declared:
+            continue
+        for selector in selectors.split(","):
+            selector = " ".join(selector.split())
+            if selector in SELECTOR_KINDS or selector == "html":
+                # First rule wins: later ones tend to be media-query or state overrides.
+                for side, color in declared.items():
+                    rules.setdefault(selector, {}).setdefault(side, color)
+
+    page = {**rules.get("html", {}), **rules.get("body", {})}
+    page_fg = page.get("fg", _BLACK)
+    page_bg = page.get("bg", _WHITE)
+    if page_bg is None:
+        return []
+    pairs = []
+    for selector, kind in SELECTOR_KINDS.items():
+        declared = rules.get(selector)
+        if declared and "stops" in declared:
+            stops = declared["stops"]
+            for n, stop in enumerate(stops, 1):
+                label = f"{selector} (gradient text)" if len(stops) == 1 else f"{selector} (gradient stop {n})"
+                pairs.append([label, kind, stop, page_bg, page_bg])
+        elif declared:
+            fg, bg = declared.get("fg", page_fg), declared.get("bg", page_bg)
+            if bg is not None:
+                pairs.append([selector, kind, fg, bg, page_bg])
+    return pairs
+
+
+def _has(name: str, words: tuple[str, ...]) -> bool:
+    lowered = name.lower()
+    return any(w in lowered for w in words)
+
+
+def token_pairs(tokens: dict) -> list[list]:
+    """[label, kind, fg rgba, bg rgba, backdrop rgba] for text and accent tokens on background tokens.
+
+    Plain text tokens are checked on the main background and every plain
+    surface; "on-X" text on the X token; primary/accent on the main
+    background. Text meant for some other surface (inverse, light, dark)
+    can't be paired reliably and is skipped, as are status colors.
+    """
+    colors = {name: [*color["rgb"], color["alpha"]] for name, color in tokens["colors"].items()}
+    backgrounds = [name for name in colors if _has(name, _BACKGROUND_WORDS)
+                   and not _has(name, _SKIPPED_WORDS + _QUALIFIER_WORDS + ("border", "overlay", "hover"))]
+    if not backgrounds:
+        return []
+    main = backgrounds[0]
+    backdrop = colors[main] if colors[main][3] >= 1 else _WHITE
+
+    pairs = []
+    for name, fg in colors.items():
+        if _has(name, _SKIPPED_WORDS + ("border", "background", "bg")):
+            continue
+        on = _ON_RE.search(name.lower())
+        if on:
+            target = next((other for other in colors if other != name and other.lower().endswith(on.group(1))), None)
+            if target:
+                pairs.append([f"{name} on {target}", "text", fg, colors[target], backdrop])
+        elif _has(name, _TEXT_WORDS) and not _has(name, _QUALIFIER_WORDS):
+            pairs += [[f"{name} on {background}", "text", fg, colors[background], backdrop]
+                      for background in backgrounds]
+        elif _UI_RE.search(name.lower()):
+            pairs.append([f"{name} on {main}", "ui", fg, colors[main], backdrop])
+    return pairs
+
+
+def collect_selector_pairs(outputs_path: Path, designs: list[dict], workers: int | None = None) -> list[list]:
+    """Selector pairs for every design, in catalog order.
+
+    Cached per batch in <batch>/.cache/audit.json (see cached_map), so only
+    new or edited pages are read.
+    """
+    return cached_map(outputs_path, designs, extract_selector_pairs, "audit", AUDIT_VERSION, workers)[0]
+
+
+def _composite(top: np.ndarray, bottom: np.ndarray) -> np.ndarray:
+    """RGB of rgba colors drawn over opaque RGB colors, row by row."""
+    alpha = top[:, 3:4]
+    return top[:, :3] * alpha + bottom * (1 - alpha)
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """WCAG relative luminance of sRGB colors (0-255) in the last axis."""
+    c = rgb / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratio(fg: np.ndarray, bg: np.ndarray) -> np.ndarray:
+    """WCAG contrast ratios (1-21) of opaque foreground/background RGB rows."""
+    a, b = relative_luminance(fg), relative_luminance(bg)
+    return (np.maximum(a, b) + 0.05) / (np.minimum(a, b) + 0.05)
+
+
+def palette_spread(tokens: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Per design, the mean and the smallest CIE76 delta-E between its distinct opaque token colors.
+
+    Palettes are padded into one (designs, colors, 3) Lab array so every
+    pairwise distance is computed in a single broadcast. NaN when a design
+    has fewer than two distinct colors.
+    """
+    palettes = [np.unique(np.asarray([c["lab"] for c in found["colors"].values() if c["alpha"] >= 0.5]
+                                     or np.empty((0, 3)), dtype=np.float64), axis=0) for found in tokens]
+    width = max((len(p) for p in palettes), default=0)
+    labs = np.zeros((len(palettes), max(width, 1), 3))
+    present = np.zeros((len(palettes), max(width, 1)), dtype=bool)
+    for row, palette in enumerate(palettes):
+        labs[row, :len(palette)] = palette
+        present[row, :len(palette)] = True
+
+    distances = np.linalg.norm(labs[:, :, None, :] - labs[:, None, :, :], axis=-1)
+    valid = present[:, :, None] & present[:, None, :] & ~np.eye(labs.shape[1], dtype=bool)
+    counts = valid.sum(axis=(1, 2))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(counts > 0, np.where(valid, distances, 0).sum(axis=(1, 2)) / counts, np.nan)
+    closest = np.where(counts > 0, np.where(valid, distances, np.inf).min(axis=(1, 2)), np.nan)
+    return mean, closest
+
+
+@dataclass
+class AuditResult:
+    """Every audited pair (parallel arrays) plus per-design palette spread."""
+    designs: list[dict]
+    design: np.ndarray      # design position of each pair
+    labels: list[str]
+    kinds: np.ndarray       # index into KINDS
+    ratios: np.ndarray
+    required: np.ndarray
+    spread: np.ndarray      # mean delta-E per design
+    closest: np.ndarray     # smallest delta-E per design
+    seconds: float
+
+    @property
+    def failing(self) -> np.ndarray:
+        return self.ratios < self.required
+
+    def per_design(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per design: pairs checked, pairs failing, and the worst ratio (NaN with no pairs)."""
+        size = len(self.designs)
+        checked = np.bincount(self.design, minlength=size)
+        failing = np.bincount(self.design, weights=self.failing, minlength=size).astype(int)
+        worst = np.full(size, np.inf)
+        np.minimum.at(worst, self.design, self.ratios)
+        return checked, failing, np.where(np.isinf(worst), np.nan, worst)
+
+
+def run_audit(outputs_path: Path, designs: list[dict], tokens: list[dict],
+              workers: int | None = None) -> AuditResult:
+    """Audit every design; tokens[i] belongs to designs[i]."""
+    started = time.perf_counter()
+    selector_pairs = collect_selector_pairs(outputs_path, designs, workers)
+
+    positions, labels, kinds, colors = [], [], [], []
+    for position, (found, selectors) in enumerate(zip(tokens, selector_pairs)):
+        for label, kind, fg, bg, backdrop in token_pairs(found) + selectors:
+            positions.append(position)
+            labels.append(label)
+            kinds.append(KINDS.index(kind))
+            colors.append(fg + bg + backdrop)
+
+    table = np.asarray(colors, dtype=np.float64).reshape(-1, 12)
+    backdrop = _composite(table[:, 8:12], np.full((len(table), 3), 255.0))
+    bg = _composite(table[:, 4:8], backdrop)
+    fg = _composite(table[:, 0:4], bg)
+    kinds_array = np.asarray(kinds, dtype=np.int8)
+    required = np.asarray([REQUIRED_RATIO[k] for k in KINDS])[kinds_array] if len(kinds) else np.empty(0)
+    spread, closest = palette_spread(tokens)
+    return AuditResult(designs, np.asarray(positions, dtype=np.int64), labels, kinds_array,
+                       contrast_ratio(fg, bg), required, spread, closest, time.perf_counter() - started)
+
+
+def _group_table(title: str, column: str, groups: dict[str, np.ndarray], result: AuditResult) -> Table:
+    checked, failing, worst = result.per_design()
+    table = Table(title=title)
+    table.add_column(column, style="cyan")
+    table.add_column("Designs", justify="right")
+    table.add_column("With failures", justify="right")
+    table.add_column("Failing pairs", justify="right")
+    table.add_column("Median worst ratio", justify="right")
+    table.add_column("Median ΔE spread", justify="right")
+    for name, rows in groups.items():
+        failed = int((failing[rows] > 0).sum())
+        share = failing[rows].sum() / max(1, checked[rows].sum())
+        ratios = worst[rows][~np.isnan(worst[rows])]
+        spreads = result.spread[rows][~np.isnan(result.spread[rows])]
+        table.add_row(name, str(len(rows)), f"{failed} ({failed / max(1, len(rows)):.0%})", f"{share:.0%}",
+                      f"{np.median(ratios):.2f}" if len(ratios) else "–",
+                      f"{np.median(spreads):.1f}" if len(spreads) else "–")
+    return table
+
+
+def show_audit(result: AuditResult, limit: int = 15) -> None:
+    designs = result.designs
+    checked, failing, worst = result.per_design()
+    console.print(f"[bold]Audited {len(designs)} designs:[/bold] {len(result.ratios):,} color pairs, "
+                  f"{int(result.failing.sum()):,} below WCAG AA, "
+                  f"{int((failing > 0).sum())} designs with failures ({result.seconds:.2f}s)")
+
+    batches: dict[str, list[int]] = {}
+    for position, design in enumerate(designs):
+        batches.setdefault(design["batch"], []).append(position)
+    console.print(_group_table("By batch", "Batch", {k: np.asarray(v) for k, v in batches.items()}, result))
+
+    for dimension in AUDIT_DIMENSIONS:
+        values: dict[str, list[int]] = {}
+        for position, design in enumerate(designs):
+            value = design.get("dimensions", {}).get(dimension)
+            if value is not None:
+                values.setdefault(str(value), []).append(position)
+        if values:
+            groups = {k: np.asarray(v) for k, v in sorted(values.items())}
+            console.print(_group_table(f"By {dimension}", dimension, groups, result))
+
+    order = [p for p in np.lexsort((worst, -failing)).tolist() if failing[p] > 0][:limit]
+    if not order:
+        return
+    fails = result.failing
+    table = Table(title=f"Designs with the most failing pairs (top {len(order)})")
+    table.add_column("Design", style="cyan")
+    table.add_column("Batch / ID")
+    table.add_column("Failing", justify="right")
+    table.add_column("Worst pair")
+    table.add_column("Ratio", justify="right", style="red")
+    for position in order:
+        rows = np.flatnonzero((result.design == position) & fails)
+        row = rows[np.argmin(result.ratios[rows])]
+        design = designs[position]
+        table.add_row(design["name"], f"{design['batch']}/{design['id']}", f"{failing[position]}/{checked[position]}",
+                      result.labels[row], f"{result.ratios[row]:.2f}")
+    console.print(table)
+
+
+def show_design_audit(result: AuditResult, position: int) -> None:
+    design = result.designs[position]
+    table = Table(title=f"{design['name']} ({design['batch']}/{design['id']})")
+    table.add_column("Pair")
+    table.add_column("Kind", style="dim")
+    table.add_column("Ratio", justify="right")
+    table.add_column("Needs", justify="right", style="dim")
+    for row in np.flatnonzero(result.design == position).tolist():
+        ok = result.ratios[row] >= result.required[row]
+        table.add_row(result.labels[row], KINDS[result.kinds[row]],
+                      f"[{'green' if ok else 'red'}]{result.ratios[row]:.2f}[/]", f"{result.required[row]:g}")
+    console.print(table)
+    if not np.isnan(result.spread[position]):
+        note = " [yellow](hard to tell apart)[/yellow]" if result.closest[position] < CLOSE_DELTA_E else ""
+        console.print(f"Palette ΔE: mean {result.spread[position]:.1f}, "
+                      f"closest distinct pair {result.closest[position]:.1f}{note}")
@@ -0,0 +1,147 @@
+# ABOUTME: On-disk cache of per-file results keyed by stat signature and content hash.
+# ABOUTME: Lets batch commands skip files that have not changed since the last run.
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+from .utils import atomic_write_text, content_hash, ensure_dir, parallel_map
+
+CACHE_DIR_NAME = ".cache"
+
+
+class FileCache:
+    """JSON-backed cache mapping file paths to previously computed results.
+
+    Each entry records the file's size, mtime_ns and SHA-256. A matching
+    (size, mtime_ns) pair is trusted without reading the file; when the stat
+    signature changed but the content hash still matches (e.g. after a
+    checkout or touch), the entry is re-stamped and reused.
+    """
+
+    def __init__(self, path: Path, version: int = 1):
+        self.path = path
+        self.version = version
+        self.entries: dict[str, dict] = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.version:
+            self.entries = data.get("entries", {})
+
+    def lookup(self, key: str, stat: os.stat_result) -> dict | None:
+        """Return the entry for key if its stat signature is unchanged."""
+        entry = self.entries.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry
+        return None
+
+    def lookup_content(self, key: str, stat: os.stat_result, data: bytes) -> tuple[dict | None, str]:
+        """Fall back to the content hash; returns (entry or None, digest)."""
+        digest = content_hash(data)
+        entry = self.entries.get(key)
+        if entry and entry.get("sha256") == digest:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.dirty = True
+            return entry, digest
+        return None, digest
+
+    def store(self, key: str, stat: os.stat_result, digest: str, results: dict) -> dict:
+        """Record fresh results for key and return the new entry."""
+        return self.store_signature(key, stat.st_size, stat.st_mtime_ns, digest, results)
+
+    def store_signature(self, key: str, size: int, mtime_ns: int, digest: str, results: dict) -> dict:
+        """Like store, for callers that got the stat signature elsewhere (e.g. a worker)."""
+        entry = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "sha256": digest,
+            "results": results,
+        }
+        self.entries[key] = entry
+        self.dirty = True
+        return entry
+
+    def prune(self, live_keys: set[str], prefix: str = "") -> None:
+        """Drop entries under prefix whose files no longer exist."""
+        stale = [k for k in self.entries if k.startswith(prefix) and k not in live_keys]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.dirty = True
+
+    def save(self) -> None:
+        """Persist the cache if anything changed."""
+        if not self.dirty:
+            return
+        ensure_dir(self.path.parent)
+        atomic_write_text(self.path, json.dumps({"version": self.version, "entries": self.entries}))
+        self.dirty = False
+
+
+def _cached_extract(job: tuple[str, str | None, Callable[[str], Any]]) -> tuple[str, Any, int, int]:
+    """Worker: hash a design and run extract on it unless the hash is already known.
+
+    Returns (sha256, result or None if unchanged, size, mtime_ns).
+    """
+    path_str, known_sha256, extract = job
+    path = Path(path_str)
+    stat = path.stat()
+    data = path.read_bytes()
+    digest = content_hash(data)
+    result = None if digest == known_sha256 else extract(data.decode("utf-8", errors="replace"))
+    return digest, result, stat.st_size, stat.st_mtime_ns
+
+
+def cached_map(outputs_path: Path, designs: list[dict], extract: Callable[[str], Any], namespace: str,
+               version: int, workers: int | None = None) -> tuple[list, int]:
+    """extract(page html) for every design, in catalog order.
+
+    Results must be JSON-ready; extract must be a module-level function so
+    worker processes can run it. Each batch keeps them in
+    <batch>/.cache/<namespace>.json keyed by stat signature and content hash,
+    so only new or edited pages are read. Returns (results, pages extracted).
+    """
+    caches: dict[str, FileCache] = {}
+    results: list = [None] * len(designs)
+    pending = []  # (position, cache, key, job)
+
+    for position, design in enumerate(designs):
+        batch = design["batch"]
+        if batch not in caches:
+            caches[batch] = FileCache(outputs_path / batch / CACHE_DIR_NAME / f"{namespace}.json", version=version)
+        cache = caches[batch]
+        key = f"designs/design-{design['id']}.html"
+        path = outputs_path / batch / key
+        entry = cache.lookup(key, os.stat(path))
+        if entry:
+            results[position] = entry["results"]["value"]
+            continue
+        known = cache.entries.get(key, {}).get("sha256")
+        pending.append((position, cache, key, (str(path), known, extract)))
+
+    extracted = 0
+    jobs = [job for _, _, _, job in pending]
+    for (position, cache, key, _), result in zip(pending, parallel_map(_cached_extract, jobs, workers)):
+        digest, value, size, mtime_ns = result
+        if value is None:
+            value = cache.entries[key]["results"]["value"]
+        else:
+            extracted += 1
+        cache.store_signature(key, size, mtime_ns, digest, {"value": value})
+        results[position] = value
+
+    for batch, cache in caches.items():
+        live = {f"designs/design-{d['id']}.html" for d in designs if d["batch"] == batch}
+        cache.prune(live)
+        cache.save()
+    return results, extracted
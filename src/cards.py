@@ -0,0 +1,81 @@
+# ABOUTME: Static SVG "vibe cards" rendered from each design's extracted tokens (src/tokens.py).
+# ABOUTME: Colors become swatches, fonts become type samples; a cheap stand-in for screenshots.
+
+from html import escape
+
+CARD_WIDTH = 240
+CARD_HEIGHT = 150
+MAX_SWATCHES = 6
+
+# Swatches come in this order, then any other colors in declaration order.
+_PREFERRED_COLORS = ("primary", "secondary", "accent", "surface", "text")
+
+
+def _pick(named: dict[str, str], words: tuple[str, ...], exclude: tuple[str, ...] = ()) -> str | None:
+    for name, value in named.items():
+        if any(w in name for w in words) and not any(w in name for w in exclude):
+            return value
+    return None
+
+
+def _font(fonts: dict[str, dict], words: tuple[str, ...]) -> dict | None:
+    for name, font in fonts.items():
+        if any(w in name for w in words):
+            return font
+    return None
+
+
+def _font_family(font: dict | None) -> str:
+    """An SVG font-family: the first family, then the stack's generic family."""
+    if not font:
+        return "sans-serif"
+    return f"'{font['stack'][0]}', {font['generic']}"
+
+
+def render_card(tokens: dict, name: str) -> str:
+    """A small SVG card: background, an "Aa" heading sample, the name and swatches.
+
+    Web fonts don't load inside an <img>, so the families fall back to their
+    generic family; serif, mono and script designs still look different.
+    """
+    colors = {prop: color["hex"] for prop, color in tokens["colors"].items()}
+    background = _pick(colors, ("background", "bg")) or "#ffffff"
+    text = _pick(colors, ("text", "foreground", "fg"), ("muted", "secondary", "light", "dim")) or "#222222"
+    muted = _pick(colors, ("muted",)) or text
+    first_font = next(iter(tokens["fonts"].values()), None)
+    heading = _font(tokens["fonts"], ("head", "display", "title")) or first_font
+    body = _font(tokens["fonts"], ("body", "base", "text")) or heading
+    radius = next((length["px"] for length in tokens["lengths"].values() if length["kind"] == "radius"), 0)
+
+    swatches: list[str] = []
+    for word in _PREFERRED_COLORS:
+        value = _pick(colors, (word,))
+        if value and value not in swatches and value != background:
+            swatches.append(value)
+    for value in colors.values():
+        if value not in swatches and value != background:
+            swatches.append(value)
+    swatches = swatches[:MAX_SWATCHES]
+
+    radius = min(max(radius, 0), 16)
+    label = name if len(name) <= 30 else name[:29] + "…"
+    type_label = f"{heading['stack'][0] if heading else 'sans-serif'} / {body['stack'][0] if body else 'sans-serif'}"
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {CARD_WIDTH} {CARD_HEIGHT}" '
+        f'width="{CARD_WIDTH}" height="{CARD_HEIGHT}">',
+        f'<rect width="{CARD_WIDTH}" height="{CARD_HEIGHT}" rx="{radius:g}" fill="{background}"/>',
+        f'<text x="16" y="56" font-size="40" font-family="{escape(_font_family(heading))}" fill="{text}">Aa</text>',
+        f'<text x="16" y="80" font-size="12" font-family="{escape(_font_family(body))}" fill="{text}">{escape(label)}</text>',
+    ]
+    for i, color in enumerate(swatches):
+        parts.append(f'<rect x="{16 + i * 30}" y="96" width="24" height="24" rx="{min(radius, 12):g}" '
+                     f'fill="{color}" stroke="{muted}" stroke-opacity="0.35"/>')
+    parts.append(f'<text x="16" y="138" font-size="9" font-family="{escape(_font_family(body))}" fill="{muted}">'
+                 f'{escape(type_label)}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def build_cards(designs: list[dict], tokens: list[dict]) -> list[str]:
+    """One SVG card per design, in catalog order."""
+    return [render_card(found, design["name"]) for design, found in zip(designs, tokens)]
@@ -0,0 +1,193 @@
+# ABOUTME: Writes the viewer's design catalog as a small bootstrap index plus fixed-size shards.
+# ABOUTME: Shards are columnar: dimension values are dictionary-encoded and paths are derived.
+
+import base64
+import json
+from pathlib import Path
+
+from .facets import build_facets, id_runs
+from .fulltext import FULLTEXT_DIR_NAME, FulltextBuild, write_fulltext
+from .search_index import build_search_index
+from .utils import content_hash, ensure_dir, write_if_changed
+
+CATALOG_DIR_NAME = "data"
+CATALOG_VERSION = 4
+
+DESIGN_PATH = "outputs/{batch}/designs/design-{id}.html"
+HASHED_DESIGN_PATH = "designs/{batch}/design-{id}.{hash}.html"
+
+# Hex digits of the content hash put into hashed file names.
+HASH_LENGTH = 10
+
+# Designs per shard. Small enough that the first shard arrives quickly,
+# large enough that browsing rarely waits on a fetch.
+SHARD_SIZE = 64
+
+
+class SiteWriter:
+    """Writes generated files under a site root and returns the URL each ended up at.
+
+    With hashed=True a short content hash goes into every file name
+    (data/facets.json -> data/facets.0123456789.json), so published files
+    can be cached forever; an existing file with that name already holds
+    the right bytes and is not rewritten. Every URL written is remembered so
+    prune() can remove leftovers from earlier builds.
+    """
+
+    def __init__(self, root: Path, hashed: bool = False):
+        self.root = root
+        self.hashed = hashed
+        self.urls: set[str] = set()
+        self.written = 0
+
+    def url_for(self, url: str, data: bytes) -> str:
+        if not self.hashed:
+            return url
+        stem, dot, ext = url.rpartition(".")
+        return f"{stem}.{content_hash(data)[:HASH_LENGTH]}.{ext}"
+
+    def write(self, url: str, data: str | bytes) -> str:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        url = self.url_for(url, data)
+        path = self.root / url
+        ensure_dir(path.parent)
+        if self.hashed and path.exists():
+            changed = False
+        else:
+            changed = write_if_changed(path, data)
+        self.written += changed
+        self.urls.add(url)
+        return url
+
+    def write_json(self, url: str, value) -> str:
+        return self.write(url, json.dumps(value, separators=(",", ":")))
+
+    def prune(self, directory: str, pattern: str = "*.json") -> int:
+        """Remove files matching pattern under directory that this build did not write."""
+        removed = 0
+        for path in (self.root / directory).rglob(pattern):
+            if path.relative_to(self.root).as_posix() not in self.urls:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def build_dictionaries(designs: list[dict]) -> tuple[list[str], list[list[str]]]:
+    """Intern dimension names and, per dimension, its values.
+
+    Both are kept in first-seen order, so appending a batch only appends
+    codes and existing shards keep their bytes.
+    """
+    dimensions: dict[str, dict[str, int]] = {}
+    for design in designs:
+        for key, value in design.get("dimensions", {}).items():
+            values = dimensions.setdefault(key, {})
+            values.setdefault(str(value), len(values))
+    return list(dimensions), [list(values) for values in dimensions.values()]
+
+
+def build_bootstrap(designs: list[dict], shard_size: int = SHARD_SIZE) -> dict:
+    """Counts, batch ranges, dictionaries and the shard map; everything the viewer needs up front."""
+    batches = []
+    ids: list[list[int]] = []
+    for position, design in enumerate(designs):
+        if not batches or batches[-1]["name"] != design["batch"]:
+            batches.append({"name": design["batch"], "start": position, "count": 0})
+            ids.append([])
+        batches[-1]["count"] += 1
+        ids[-1].append(design["id"])
+    # (batch, id) -> position without fetching shards: start + offset within the runs.
+    for batch, batch_ids in zip(batches, ids):
+        batch["ids"] = id_runs(batch_ids)
+
+    dimensions, values = build_dictionaries(designs)
+    # Code 0 means "dimension absent", so a dimension needs len(values) + 1 codes.
+    code_bytes = 1 if all(len(v) < 255 for v in values) else 2
+
+    hashed = any("hash" in design for design in designs)
+    return {
+        "version": CATALOG_VERSION,
+        "total": len(designs),
+        "shardSize": shard_size,
+        "batches": batches,
+        "dimensions": dimensions,
+        "values": values,
+        "codeBytes": code_bytes,
+        # {hash} is only present for published builds with content-hashed design files.
+        "pathTemplate": HASHED_DESIGN_PATH if hashed else DESIGN_PATH,
+    }
+
+
+def encode_shard(designs: list[dict], bootstrap: dict) -> dict:
+    """Columnar shard: parallel arrays plus a base64 row-major matrix of value codes.
+
+    The viewer rebuilds each design's path from its batch index and id (plus
+    its content hash in published builds), and decodes the code matrix
+    straight into a typed array.
+    """
+    batch_index = {batch["name"]: i for i, batch in enumerate(bootstrap["batches"])}
+    lookups = [{value: code for code, value in enumerate(values, 1)} for values in bootstrap["values"]]
+    names = bootstrap["dimensions"]
+    width = bootstrap["codeBytes"]
+
+    codes = bytearray()
+    for design in designs:
+        dims = design.get("dimensions", {})
+        for name, lookup in zip(names, lookups):
+            code = lookup[str(dims[name])] if name in dims else 0
+            codes += code.to_bytes(width, "little")
+
+    shard = {
+        "batch": [batch_index[d["batch"]] for d in designs],
+        "id": [d["id"] for d in designs],
+        "name": [d["name"] for d in designs],
+        "tagline": [d["tagline"] for d in designs],
+        "dims": base64.b64encode(bytes(codes)).decode("ascii"),
+    }
+    if "{hash}" in bootstrap["pathTemplate"]:
+        shard["hash"] = [d["hash"] for d in designs]
+    return shard
+
+
+def write_catalog(designs: list[dict], writer: SiteWriter, fulltext: FulltextBuild | None = None,
+                  cards: list[str] | None = None, similar: list[list[list[int]]] | None = None,
+                  shard_size: int = SHARD_SIZE) -> dict:
+    """Write shards, facets, the search index and (optionally) the full-text index, vibe cards
+    and similar-design lists.
+
+    Everything goes under data/ via writer; unchanged files are left
+    untouched and files from earlier builds are removed. Cards and
+    similar-design lists ([[position, percent], ...] per design) are grouped
+    into one JSON array per design shard, so a screenful of them costs a
+    fetch or two. Returns the bootstrap index, which lists the URL of every
+    file, together with counts of files written and removed.
+    """
+    bootstrap = build_bootstrap(designs, shard_size)
+    before = writer.written
+
+    bootstrap["shards"] = [
+        writer.write_json(f"{CATALOG_DIR_NAME}/designs-{start // shard_size:04d}.json",
+                          encode_shard(designs[start:start + shard_size], bootstrap))
+        for start in range(0, len(designs), shard_size)
+    ]
+    bootstrap["facets"] = writer.write_json(f"{CATALOG_DIR_NAME}/facets.json", build_facets(designs, bootstrap))
+    bootstrap["search"] = writer.write_json(f"{CATALOG_DIR_NAME}/search.json", build_search_index(designs))
+    if fulltext is not None:
+        bootstrap["fulltext"] = write_fulltext(fulltext, writer, f"{CATALOG_DIR_NAME}/{FULLTEXT_DIR_NAME}")
+    if cards is not None:
+        bootstrap["cards"] = [
+            writer.write_json(f"{CATALOG_DIR_NAME}/cards-{start // shard_size:04d}.json",
+                              cards[start:start + shard_size])
+            for start in range(0, len(cards), shard_size)
+        ]
+    if similar is not None:
+        bootstrap["similar"] = [
+            writer.write_json(f"{CATALOG_DIR_NAME}/similar-{start // shard_size:04d}.json",
+                              similar[start:start + shard_size])
+            for start in range(0, len(similar), shard_size)
+        ]
+
+    writer.write_json(f"{CATALOG_DIR_NAME}/index.json", bootstrap)
+    removed = writer.prune(CATALOG_DIR_NAME)
+    return {"bootstrap": bootstrap, "written": writer.written - before, "removed": removed}
@@ -0,0 +1,187 @@
+# ABOUTME: Near-duplicate design detection: MinHash signatures of each page's normalized HTML/CSS shingles.
+# ABOUTME: LSH banding finds candidate pairs in near-linear time; pairs above a threshold form clusters.
+
+import base64
+import re
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from .cache import cached_map
+
+console = Console()
+
+# Bump when normalization, shingling or hashing changes so cached signatures are redone.
+MINHASH_VERSION = 2
+
+# Tokens per shingle, and MinHash permutations split into BANDS bands of
+# ROWS rows. Pairs become candidates when any band matches exactly, which
+# is likely above a similarity of about (1 / BANDS) ** (1 / ROWS) = 0.42.
+SHINGLE_SIZE = 5
+PERMUTATIONS = 128
+BANDS = 32
+ROWS = PERMUTATIONS // BANDS
+
+DEFAULT_THRESHOLD = 0.8
+
+# Multiply-shift hashing: permutation k maps h to the top 32 bits of a[k] * h + b[k] (mod 2**64).
+_seeds = np.random.default_rng(MINHASH_VERSION)
+_A = _seeds.integers(0, 1 << 63, PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _seeds.integers(0, 1 << 63, PERMUTATIONS, dtype=np.uint64)
+
+_COMMENT_RE = re.compile(r"<!--[\s\S]*?-->|/\*[\s\S]*?\*/")
+_TOKEN_RE = re.compile(r"[a-z0-9_#.-]+|[^\sa-z0-9_#.-]")
+
+
+def shingle_hashes(html: str) -> np.ndarray:
+    """Distinct 32-bit hashes of every SHINGLE_SIZE-token window of the normalized page.
+
+    Normalizing drops comments, case and whitespace, so reformatting a
+    page or editing a comment doesn't make it look different.
+    """
+    tokens = _TOKEN_RE.findall(_COMMENT_RE.sub(" ", html.lower()))
+    if not tokens:
+        return np.zeros(1, dtype=np.uint64)
+    # crc32 is stable across processes (unlike hash()), so cached signatures stay comparable.
+    crc = {token: zlib.crc32(token.encode()) for token in set(tokens)}
+    ids = np.fromiter((crc[t] for t in tokens), dtype=np.uint64, count=len(tokens))
+    if len(ids) < SHINGLE_SIZE:
+        ids = np.pad(ids, (0, SHINGLE_SIZE - len(ids)))
+    windows = np.lib.stride_tricks.sliding_window_view(ids, SHINGLE_SIZE)
+    mixed = np.zeros(len(windows), dtype=np.uint64)
+    for column in range(SHINGLE_SIZE):
+        mixed = (mixed * np.uint64(1_000_003)) ^ windows[:, column]
+    return np.unique(mixed & np.uint64(0xFFFFFFFF))
+
+
+def minhash(hashes: np.ndarray) -> np.ndarray:
+    """PERMUTATIONS-long MinHash signature: per permutation, the smallest hash of any shingle."""
+    signature = np.full(PERMUTATIONS, np.iinfo(np.uint32).max, dtype=np.uint32)
+    for start in range(0, len(hashes), 4096):  # bounds the shingles x permutations temporary
+        chunk = hashes[start:start + 4096, None]
+        permuted = (chunk * _A + _B) >> np.uint64(32)
+        signature = np.minimum(signature, permuted.min(axis=0).astype(np.uint32))
+    return signature
+
+
+def _encode(signature: np.ndarray) -> str:
+    return base64.b64encode(signature.astype("<u4").tobytes()).decode("ascii")
+
+
+def _decode(text: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype="<u4").astype(np.uint32)
+
+
+def _signature(html: str) -> str:
+    return _encode(minhash(shingle_hashes(html)))
+
+
+def collect_signatures(outputs_path: Path, designs: list[dict], workers: int | None = None) -> tuple[np.ndarray, int]:
+    """MinHash signatures for every design (one row each, in catalog order).
+
+    Cached per batch in <batch>/.cache/minhash.json (see cached_map), so only
+    new or edited pages are hashed. Returns (signature matrix, number of
+    pages hashed).
+    """
+    encoded, hashed = cached_map(outputs_path, designs, _signature, "minhash", MINHASH_VERSION, workers)
+    signatures = np.zeros((len(designs), PERMUTATIONS), dtype=np.uint32)
+    for position, text in enumerate(encoded):
+        signatures[position] = _decode(text)
+    return signatures, hashed
+
+
+def candidate_pairs(signatures: np.ndarray) -> np.ndarray:
+    """(i, j) pairs, i < j, that share at least one identical band; shape (pairs, 2)."""
+    found = []
+    for band in range(BANDS):
+        rows = np.ascontiguousarray(signatures[:, band * ROWS:(band + 1) * ROWS])
+        keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * ROWS))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        # Runs of equal keys are buckets; only buckets with 2+ designs yield pairs.
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = np.sort(order[start:start + size])
+            first, second = np.triu_indices(size, 1)
+            found.append(np.stack([members[first], members[second]], axis=1))
+    if not found:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(found), axis=0)
+
+
+def _clusters(size: int, pairs: np.ndarray) -> list[list[int]]:
+    """Connected components (union-find) of the pairs, each sorted, largest first."""
+    parent = list(range(size))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        a, b = root(i), root(j)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    groups: dict[int, list[int]] = {}
+    for i in np.unique(pairs).tolist():
+        groups.setdefault(root(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: (-len(group), group[0]))
+
+
+@dataclass
+class DuplicateReport:
+    """Near-duplicate clusters (design positions, earliest first) and how they were found."""
+    clusters: list[list[int]]
+    similarity: dict[tuple[int, int], float]
+    candidates: int
+    hashed: int
+    threshold: float
+
+    def duplicates(self) -> list[int]:
+        """Every clustered design except the earliest of its cluster, which is kept."""
+        return [position for cluster in self.clusters for position in cluster[1:]]
+
+
+def find_duplicates(outputs_path: Path, designs: list[dict], threshold: float = DEFAULT_THRESHOLD,
+                    workers: int | None = None) -> DuplicateReport:
+    """Cluster designs whose estimated Jaccard similarity is at least threshold."""
+    signatures, hashed = collect_signatures(outputs_path, designs, workers)
+    pairs = candidate_pairs(signatures)
+    # Fraction of agreeing MinHash values estimates the pages' shingle Jaccard similarity.
+    estimates = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1) if len(pairs) else np.empty(0)
+    close = pairs[estimates >= threshold]
+    similarity = {(int(i), int(j)): float(s) for (i, j), s in zip(close, estimates[estimates >= threshold])}
+    return DuplicateReport(_clusters(len(designs), close), similarity, len(pairs), hashed, threshold)
+
+
+def show_duplicates(report: DuplicateReport, designs: list[dict]) -> None:
+    console.print(f"[dim]{report.hashed} new or changed pages hashed; "
+                  f"{report.candidates} candidate pairs from LSH[/dim]")
+    if not report.clusters:
+        console.print(f"[green]No near-duplicates at similarity ≥ {report.threshold:.2f}[/green]")
+        return
+
+    table = Table(title=f"Near-duplicate clusters (similarity ≥ {report.threshold:.2f})")
+    table.add_column("Cluster", justify="right", style="dim")
+    table.add_column("Design", style="cyan")
+    table.add_column("Batch / ID")
+    table.add_column("Similarity to first", justify="right")
+    for number, cluster in enumerate(report.clusters, 1):
+        first = cluster[0]
+        for position in cluster:
+            design = designs[position]
+            score = report.similarity.get((first, position))
+            label = "keep" if position == first else (f"{score:.2f}" if score is not None else "linked")
+            table.add_row(str(number) if position == first else "", design["name"],
+                          f"{design['batch']}/{design['id']}", label)
+        if number < len(report.clusters):
+            table.add_section()
+    console.print(table)
+    console.print(f"[yellow]{len(report.duplicates())} designs duplicate an earlier one "
+                  f"across {len(report.clusters)} clusters[/yellow]")
@@ -0,0 +1,207 @@
+# ABOUTME: Exports extracted design tokens as Tailwind config, Style Dictionary and Figma Tokens JSON.
+# ABOUTME: One folder per design; whole batches or the corpus are written through a process pool.
+
+import json
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from rich.console import Console
+
+from .utils import parallel_map, write_if_changed
+
+console = Console()
+
+# Format name -> file written into each design's export folder.
+EXPORT_FORMATS = {
+    "tailwind": "tailwind.config.js",
+    "style-dictionary": "tokens.json",
+    "figma": "figma-tokens.json",
+}
+
+# Leading words dropped from token names: --color-primary becomes "primary".
+_PREFIXES = ("color-", "colors-", "font-family-", "font-size-", "font-", "fs-", "text-", "type-",
+             "spacing-", "space-", "size-", "radius-", "border-radius-", "rounded-", "shadow-", "box-shadow-")
+
+# Size tokens with these words, or declared in rem/em (a type scale), are
+# font sizes; other sizes are treated as spacing.
+_FONT_SIZE_WORDS = ("text", "font", "fs", "type", "heading", "body", "display", "caption")
+_FONT_SIZE_UNITS = ("rem", "em")
+
+_SHADOW_LAYER_RE = re.compile(r",(?![^(]*\))")
+_SHADOW_PART_RE = re.compile(r"(?:rgba?|hsla?)\([^)]*\)|#[0-9a-fA-F]+|-?[\d.]+[a-z%]*|[a-z]+", re.IGNORECASE)
+
+
+def _short_name(name: str) -> str:
+    short = name.lstrip("-").lower()
+    for prefix in _PREFIXES:
+        if short.startswith(prefix) and len(short) > len(prefix):
+            return short[len(prefix):]
+    return short
+
+
+def _short_names(names: list[str]) -> dict[str, str]:
+    """Short name per token; tokens whose short names clash keep their full names."""
+    shorts = {name: _short_name(name) for name in names}
+    counts: dict[str, int] = {}
+    for short in shorts.values():
+        counts[short] = counts.get(short, 0) + 1
+    return {name: short if counts[short] == 1 else name.lstrip("-").lower() for name, short in shorts.items()}
+
+
+def _css_color(color: dict) -> str:
+    if color["alpha"] >= 1:
+        return color["hex"]
+    r, g, b = (round(c) for c in color["rgb"])
+    return f"rgba({r}, {g}, {b}, {color['alpha']:g})"
+
+
+def _px(value: float) -> str:
+    return f"{value:g}px"
+
+
+def _css_stack(stack: list[str]) -> str:
+    return ", ".join(f'"{family}"' if " " in family else family for family in stack)
+
+
+def _grouped(found: dict) -> dict[str, dict[str, str]]:
+    """Tokens grouped into the categories every format shares, with short names."""
+    groups: dict[str, dict[str, str]] = {
+        "color": {}, "fontFamily": {}, "fontSize": {}, "spacing": {}, "borderRadius": {}, "boxShadow": {}}
+    values: dict[str, dict[str, str]] = {group: {} for group in groups}
+    for name, color in found["colors"].items():
+        values["color"][name] = _css_color(color)
+    for name, font in found["fonts"].items():
+        values["fontFamily"][name] = _css_stack(font["stack"])
+    for name, length in found["lengths"].items():
+        if length["kind"] == "radius":
+            group = "borderRadius"
+        elif length["kind"] == "size" and (any(word in name for word in _FONT_SIZE_WORDS)
+                                           or length.get("unit") in _FONT_SIZE_UNITS):
+            group = "fontSize"
+        else:
+            group = "spacing"
+        values[group][name] = _px(length["px"])
+    for name, value in found["shadows"].items():
+        values["boxShadow"][name] = " ".join(value.split())
+    for group, named in values.items():
+        shorts = _short_names(list(named))
+        groups[group] = {shorts[name]: value for name, value in named.items()}
+    return groups
+
+
+def to_tailwind(found: dict, title: str) -> str:
+    """A tailwind.config.js extending the default theme with the design's tokens."""
+    groups = _grouped(found)
+    extend = {
+        "colors": groups["color"],
+        "fontFamily": {short: found["fonts"][name]["stack"]
+                       for name, short in _short_names(list(found["fonts"])).items()},
+        "fontSize": groups["fontSize"],
+        "spacing": groups["spacing"],
+        "borderRadius": groups["borderRadius"],
+        "boxShadow": groups["boxShadow"],
+    }
+    # Tailwind's bare utility (rounded, shadow) reads the DEFAULT key.
+    extend = {key: {"DEFAULT" if name == "default" else name: v for name, v in value.items()}
+              for key, value in extend.items() if value}
+    theme = json.dumps({"theme": {"extend": extend}}, indent=2)
+    return (f"// Design tokens from {title}\n"
+            "/** @type {import('tailwindcss').Config} */\n"
+            f"module.exports = {theme};\n")
+
+
+def to_style_dictionary(found: dict) -> str:
+    """Style Dictionary source tokens, nested category / type / item."""
+    groups = _grouped(found)
+    tree: dict = {
+        "color": {name: {"value": value} for name, value in groups["color"].items()},
+        "font": {"family": {name: {"value": value} for name, value in groups["fontFamily"].items()}},
+        "size": {
+            "font": {name: {"value": value} for name, value in groups["fontSize"].items()},
+            "spacing": {name: {"value": value} for name, value in groups["spacing"].items()},
+            "radius": {name: {"value": value} for name, value in groups["borderRadius"].items()},
+        },
+        "shadow": {name: {"value": value} for name, value in groups["boxShadow"].items()},
+    }
+    tree["font"] = {k: v for k, v in tree["font"].items() if v}
+    tree["size"] = {k: v for k, v in tree["size"].items() if v}
+    return json.dumps({k: v for k, v in tree.items() if v}, indent=2) + "\n"
+
+
+def _figma_shadow(value: str) -> dict | list[dict] | str:
+    """Tokens Studio shadow layers, or the raw value when it can't be split up."""
+    layers = []
+    for layer in _SHADOW_LAYER_RE.split(value):
+        parts = _SHADOW_PART_RE.findall(layer)
+        inset = "inset" in (p.lower() for p in parts)
+        lengths = [p for p in parts if re.fullmatch(r"-?[\d.]+[a-z%]*", p)]
+        colors = [p for p in parts if p not in lengths and p.lower() != "inset"]
+        if not 2 <= len(lengths) <= 4 or len(colors) > 1:
+            return value
+        x, y, blur, spread = (lengths + ["0", "0"])[:4]
+        layers.append({"x": x, "y": y, "blur": blur, "spread": spread, "color": colors[0] if colors else "#000000",
+                       "type": "innerShadow" if inset else "dropShadow"})
+    return layers[0] if len(layers) == 1 else layers
+
+
+def to_figma(found: dict, token_set: str) -> str:
+    """A Tokens Studio for Figma token set named after the design."""
+    groups = _grouped(found)
+    types = {"color": "color", "fontFamily": "fontFamilies", "fontSize": "fontSizes",
+             "spacing": "spacing", "borderRadius": "borderRadius", "boxShadow": "boxShadow"}
+    tokens: dict = {}
+    for group, kind in types.items():
+        if not groups[group]:
+            continue
+        tokens[kind] = {}
+        for name, value in groups[group].items():
+            if group == "boxShadow":
+                shadow = _figma_shadow(value)
+                tokens[kind][name] = {"value": shadow, "type": "boxShadow" if not isinstance(shadow, str) else "other"}
+            else:
+                tokens[kind][name] = {"value": value, "type": kind}
+    return json.dumps({token_set: tokens}, indent=2) + "\n"
+
+
+def _export_design(job: tuple[dict, str, str, str, tuple[str, ...]]) -> int:
+    """Write one design's exports; returns how many files changed."""
+    found, title, token_set, folder, formats = job
+    renderers = {
+        "tailwind": lambda: to_tailwind(found, title),
+        "style-dictionary": lambda: to_style_dictionary(found),
+        "figma": lambda: to_figma(found, token_set),
+    }
+    target = Path(folder)
+    target.mkdir(parents=True, exist_ok=True)
+    return sum(write_if_changed(target / EXPORT_FORMATS[fmt], renderers[fmt]()) for fmt in formats)
+
+
+@dataclass
+class ExportResult:
+    """What an export run wrote."""
+    designs: int
+    files: int
+    written: int
+    seconds: float
+
+
+def export_tokens(tokens: list[dict], designs: list[dict], out_path: Path, formats: tuple[str, ...],
+                  workers: int | None = None) -> ExportResult:
+    """Export each design's tokens into out_path/<batch>/design-<id>/.
+
+    tokens[i] belongs to designs[i]. Files whose content is unchanged are
+    not rewritten, so re-exporting the corpus only touches what moved.
+    """
+    started = time.perf_counter()
+    jobs = [(found, f"{d['name']} ({d['batch']}/{d['id']})", f"{d['batch']}/design-{d['id']}",
+             str(out_path / d["batch"] / f"design-{d['id']}"), formats)
+            for found, d in zip(tokens, designs)]
+    written = sum(parallel_map(_export_design, jobs, workers))
+    return ExportResult(len(jobs), len(jobs) * len(formats), written, time.perf_counter() - started)
+
+
+def show_export_report(result: ExportResult, out_path: Path) -> None:
+    console.print(f"[green]Exported {result.designs} design(s) to {out_path}/[/green] "
+                  f"({result.written} of {result.files} files written, {result.seconds:.2f}s)")
@@ -0,0 +1,107 @@
+# ABOUTME: Build-time inverted index from dimension values to compressed position bitmaps.
+# ABOUTME: The viewer intersects these bitmaps to filter designs by facet in the browser.
+
+import base64
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_varints(values: list[int]) -> bytes:
+    """Non-negative integers as concatenated LEB128 varints."""
+    return b"".join(_varint(value) for value in values)
+
+
+def decode_varints(data: bytes) -> list[int]:
+    """Inverse of encode_varints."""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+    return values
+
+
+def encode_gaps(positions: list[int]) -> bytes:
+    """Sorted positions as LEB128 varints of (gap to previous position - 1)."""
+    gaps = []
+    previous = -1
+    for position in positions:
+        gaps.append(position - previous - 1)
+        previous = position
+    return encode_varints(gaps)
+
+
+def decode_gaps(data: bytes) -> list[int]:
+    """Inverse of encode_gaps."""
+    positions = []
+    previous = -1
+    for gap in decode_varints(data):
+        previous += gap + 1
+        positions.append(previous)
+    return positions
+
+
+def encode_positions(positions: list[int], total: int) -> dict:
+    """Compress a sorted list of design positions.
+
+    Uses whichever container is smaller: "a" is the gap list from
+    encode_gaps (sparse values), "b" is a plain bitset with bit i of
+    byte i // 8 set for position i (dense values). Both are base64.
+    """
+    gaps = encode_gaps(positions)
+    bits = bytearray((total + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+
+    kind, data = ("a", gaps) if len(gaps) <= len(bits) else ("b", bits)
+    return {"n": len(positions), "k": kind, "d": base64.b64encode(bytes(data)).decode("ascii")}
+
+
+def decode_positions(container: dict, total: int) -> list[int]:
+    """Inverse of encode_positions (the viewer does the same in JS)."""
+    data = base64.b64decode(container["d"])
+    if container["k"] == "b":
+        return [i for i in range(total) if data[i >> 3] >> (i & 7) & 1]
+    return decode_gaps(data)
+
+
+def build_facets(designs: list[dict], bootstrap: dict) -> list[list[dict]]:
+    """Per dimension, per value (aligned with the bootstrap dictionaries), its positions."""
+    names = bootstrap["dimensions"]
+    lookups = [{value: code for code, value in enumerate(values)} for values in bootstrap["values"]]
+    postings = [[[] for _ in values] for values in bootstrap["values"]]
+
+    for position, design in enumerate(designs):
+        dims = design.get("dimensions", {})
+        for d, name in enumerate(names):
+            if name in dims:
+                postings[d][lookups[d][str(dims[name])]].append(position)
+
+    total = len(designs)
+    return [[encode_positions(positions, total) for positions in values] for values in postings]
+
+
+def id_runs(ids: list[int]) -> list[list[int]]:
+    """Collapse a batch's design ids (in catalog order) into [first id, length] runs.
+
+    Batches are usually numbered 1..n, so the whole (batch, id) -> position
+    map typically costs one run per batch.
+    """
+    runs: list[list[int]] = []
+    for design_id in ids:
+        if runs and design_id == runs[-1][0] + runs[-1][1]:
+            runs[-1][1] += 1
+        else:
+            runs.append([design_id, 1])
+    return runs
@@ -0,0 +1,227 @@
+# ABOUTME: Full-text BM25 index over the visible text and headings of every design page.
+# ABOUTME: Extraction runs in parallel with a per-batch content-hash cache; the index is written as JSON shards.
+
+import base64
+import math
+from collections import Counter
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from .cache import cached_map
+from .facets import decode_gaps, decode_varints, encode_gaps, encode_varints
+from .search_index import tokenize
+
+console = Console()
+
+FULLTEXT_DIR_NAME = "fulltext"
+FULLTEXT_VERSION = 1
+
+# Bump when extraction or weighting changes so cached term counts are redone.
+EXTRACT_VERSION = 2
+
+# Heading and label text counts this many times towards a term's frequency.
+HEADING_WEIGHT = 3
+
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+# Target size of one postings shard before base64/JSON overhead.
+SHARD_BYTES = 64 * 1024
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "th", "button", "label", "legend", "summary"}
+_LABEL_ATTRS = {"alt", "aria-label", "placeholder", "title"}
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i if in into is it its of on or our so that the
+their them then there these they this to was we were what when which will with you your
+""".split())
+
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, with heading/label text kept separately."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.text: list[str] = []
+        self.headings: list[str] = []
+        self._skip = 0
+        self._heading = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag in _HEADING_TAGS:
+            self._heading += 1
+        if not self._skip:
+            for name, value in attrs:
+                if name in _LABEL_ATTRS and value:
+                    self.headings.append(value)
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag in _HEADING_TAGS and self._heading:
+            self._heading -= 1
+
+    def handle_data(self, data):
+        if self._skip or not data.strip():
+            return
+        (self.headings if self._heading else self.text).append(data)
+
+
+def extract_terms(html: str) -> dict[str, int]:
+    """Weighted term frequencies of a page's visible text; headings and labels count extra."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    counts: Counter[str] = Counter()
+    for chunk in parser.text:
+        counts.update(t for t in tokenize(chunk) if len(t) > 1 and t not in STOPWORDS)
+    for chunk in parser.headings:
+        for term in tokenize(chunk):
+            if len(term) > 1 and term not in STOPWORDS:
+                counts[term] += HEADING_WEIGHT
+    return dict(counts)
+
+
+def collect_terms(outputs_path: Path, designs: list[dict], workers: int | None = None) -> tuple[list[dict], int]:
+    """Term frequencies for every design, in catalog order.
+
+    Cached per batch in <batch>/.cache/fulltext.json (see cached_map), so
+    only new or edited pages are parsed. Returns (per-design term dicts,
+    number of pages parsed).
+    """
+    return cached_map(outputs_path, designs, extract_terms, "fulltext", EXTRACT_VERSION, workers)
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def fnv1a(text: str) -> int:
+    """32-bit FNV-1a over UTF-8 bytes; the viewer uses the same hash to find a term's shard."""
+    value = 0x811C9DC5
+    for byte in text.encode("utf-8"):
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def build_fulltext(terms: list[dict]) -> tuple[dict, list[dict]]:
+    """BM25 index over per-design term frequencies.
+
+    Returns (meta, shards). meta holds the document count, average and
+    per-document lengths; each term lives in shard fnv1a(term) % len(shards)
+    as [gap-encoded positions, varint frequencies], both base64.
+    """
+    postings: dict[str, list[tuple[int, int]]] = {}
+    lengths = []
+    for position, counts in enumerate(terms):
+        lengths.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((position, tf))
+
+    encoded = {}
+    size = 0
+    for term, entries in postings.items():
+        positions = encode_gaps([p for p, _ in entries])
+        frequencies = encode_varints([tf for _, tf in entries])
+        encoded[term] = [_b64(positions), _b64(frequencies)]
+        size += len(term) + len(positions) + len(frequencies)
+
+    shard_count = max(1, math.ceil(size / SHARD_BYTES))
+    shards: list[dict] = [{} for _ in range(shard_count)]
+    for term in sorted(encoded):
+        shards[fnv1a(term) % shard_count][term] = encoded[term]
+
+    meta = {
+        "version": FULLTEXT_VERSION,
+        "total": len(terms),
+        "avgLength": sum(lengths) / len(lengths) if lengths else 0.0,
+        "lengths": _b64(encode_varints(lengths)),
+        "shards": shard_count,
+        "k1": K1,
+        "b": B,
+    }
+    return meta, shards
+
+
+class FulltextIndex:
+    """BM25 queries over build_fulltext output (the viewer scores the same way)."""
+
+    def __init__(self, meta: dict, shards: list[dict]):
+        self.total = meta["total"]
+        self.avg_length = meta["avgLength"] or 1.0
+        self.lengths = decode_varints(base64.b64decode(meta["lengths"]))
+        self.shards = shards
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+
+    def postings(self, term: str) -> list[tuple[int, int]]:
+        entry = self.shards[fnv1a(term) % len(self.shards)].get(term)
+        if not entry:
+            return []
+        positions = decode_gaps(base64.b64decode(entry[0]))
+        return list(zip(positions, decode_varints(base64.b64decode(entry[1]))))
+
+    def query(self, text: str, limit: int = 10) -> list[tuple[int, float]]:
+        """Ranked (position, BM25 score) pairs; any query term may match."""
+        scores: dict[int, float] = {}
+        for term in dict.fromkeys(tokenize(text)):
+            entries = self.postings(term)
+            if not entries:
+                continue
+            idf = math.log(1 + (self.total - len(entries) + 0.5) / (len(entries) + 0.5))
+            for position, tf in entries:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / self.avg_length)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+@dataclass
+class FulltextBuild:
+    """What an indexing run produced."""
+    index: FulltextIndex
+    meta: dict
+    shards: list[dict]
+    parsed: int
+
+
+def index_designs(outputs_path: Path, designs: list[dict], workers: int | None = None) -> FulltextBuild:
+    """Extract (incrementally) and index every design in catalog order."""
+    terms, parsed = collect_terms(outputs_path, designs, workers)
+    meta, shards = build_fulltext(terms)
+    return FulltextBuild(FulltextIndex(meta, shards), meta, shards, parsed)
+
+
+def write_fulltext(build: FulltextBuild, writer, directory: str) -> str:
+    """Write the shards and meta.json under directory via a catalog SiteWriter.
+
+    meta.json lists the shard URLs, so hashed shard names work; returns its URL.
+    """
+    files = [writer.write_json(f"{directory}/shard-{number:03d}.json", shard)
+             for number, shard in enumerate(build.shards)]
+    return writer.write_json(f"{directory}/meta.json", {**build.meta, "files": files})
+
+
+def show_search_results(results: list[tuple[int, float]], designs: list[dict], query: str) -> None:
+    """Display ranked full-text matches."""
+    if not results:
+        console.print(f"[yellow]No designs mention \"{query}\"[/yellow]")
+        return
+
+    table = Table(title=f"Designs matching \"{query}\"")
+    table.add_column("#", justify="right", style="dim")
+    table.add_column("Score", justify="right")
+    table.add_column("Design")
+    table.add_column("Path", style="cyan")
+    for rank, (position, score) in enumerate(results, 1):
+        design = designs[position]
+        table.add_row(str(rank), f"{score:.2f}", design["name"], design["path"])
+    console.print(table)
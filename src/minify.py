@@ -0,0 +1,139 @@
+# ABOUTME: Conservative HTML minifier for published designs: inline CSS, inline JS and text whitespace.
+# ABOUTME: <pre>/<textarea> content, strings, template literals and regex literals are never touched.
+
+import re
+
+from .postprocess import is_javascript, tokenize_js
+
+# Bump whenever minify_html output would change, so published copies are redone.
+MINIFY_VERSION = 1
+
+_REGION_RE = re.compile(r"""
+    (?P<comment><!--(?!\[if)[\s\S]*?-->)
+  | (?P<raw><(?P<rawtag>pre|textarea)(?=[\s>])[\s\S]*?</(?P=rawtag)\s*>)
+  | <script\b(?P<script_attrs>[^>]*)>(?P<script>[\s\S]*?)(?P<script_end></script\s*>)
+  | <style\b(?P<style_attrs>[^>]*)>(?P<style>[\s\S]*?)(?P<style_end></style\s*>)
+  | (?P<tag><[^>]*>)
+""", re.IGNORECASE | re.VERBOSE)
+
+# HTML whitespace only: \s would also match non-breaking spaces.
+_HTML_SPACE_RE = re.compile(r"[ \t\r\n\f]+")
+
+# Pages that style elements to keep their whitespace get no text collapsing.
+_PRESERVED_SPACE_RE = re.compile(r"white-space\s*:\s*(?:pre|break-spaces)", re.IGNORECASE)
+
+_CSS_TOKEN_RE = re.compile(r"""
+    (?P<string>"(?:[^"\\]|\\[\s\S])*"|'(?:[^'\\]|\\[\s\S])*')
+  | (?P<comment>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<ws>\s+)
+  | (?P<punct>[{};,:])
+  | (?P<other>[^"'/\s{};,:]+|/)
+""", re.VERBOSE)
+
+# Whitespace next to these is never significant in CSS. ":" only loses the
+# space after it, since "a :hover" and "a:hover" are different selectors.
+_CSS_TIGHT_BEFORE = set("{};,")
+_CSS_TIGHT_AFTER = set("{};,:")
+
+# What may separate JS tokens without changing their meaning.
+_JS_GAP_RE = re.compile(r"(?:\s+|//[^\n]*|/\*[\s\S]*?\*/)*")
+_WORD_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$\\")
+
+
+def _collapse_space(match: re.Match) -> str:
+    return "\n" if "\n" in match.group(0) else " "
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace, leaving strings untouched."""
+    out: list[str] = []
+    pending_space = False
+    for m in _CSS_TOKEN_RE.finditer(css):
+        kind = m.lastgroup
+        if kind == "ws" or kind == "comment":
+            pending_space = pending_space or kind == "ws"
+            continue
+        text = m.group(0)
+        if pending_space and out and out[-1][-1] not in _CSS_TIGHT_AFTER and text[0] not in _CSS_TIGHT_BEFORE:
+            out.append(" ")
+        pending_space = False
+        if text == "}" and out and out[-1] == ";":
+            out.pop()
+        out.append(text)
+    return "".join(out).strip()
+
+
+def _needs_space(before: str, after: str) -> bool:
+    if before[-1] in _WORD_CHARS and after[0] in _WORD_CHARS:
+        return True
+    # a + +b, a - -b, and a / /re/ must stay apart.
+    return (before[-1] in "+-/" and after[0] == before[-1]) or (before[-1].isdigit() and after[0] == ".")
+
+
+def minify_js(js: str) -> str:
+    """Drop comments and indentation, keeping one newline wherever a line break was.
+
+    Keeping the line breaks keeps automatic semicolon insertion working
+    exactly as before. Scripts the token scanner can't fully account for
+    are returned unchanged.
+    """
+    tokens = tokenize_js(js)
+    if not tokens:
+        return js if js.strip() else ""
+
+    pieces: list[str] = []
+    previous_end = 0
+    for token in tokens:
+        gap = js[previous_end:token.start]
+        if _JS_GAP_RE.fullmatch(gap) is None:
+            return js
+        if pieces:
+            if "\n" in gap:
+                pieces.append("\n")
+            elif gap and _needs_space(pieces[-1], token.value):
+                pieces.append(" ")
+        pieces.append(token.value)
+        previous_end = token.end
+    if _JS_GAP_RE.fullmatch(js[previous_end:]) is None:
+        return js
+    return "".join(pieces)
+
+
+def minify_html(html: str) -> str:
+    """Minify a design page without changing how it renders or behaves.
+
+    Removes HTML comments (not conditional comments), minifies <style> and
+    JavaScript <script> blocks, and collapses whitespace runs in text to a
+    single space or newline. <pre> and <textarea> are copied verbatim, and
+    text is left alone entirely on pages whose CSS preserves whitespace.
+    """
+    collapse_text = _PRESERVED_SPACE_RE.search(html) is None
+    pieces: list[str] = []
+    text: list[str] = []  # text since the last tag; dropped comments don't split it
+
+    def flush_text() -> None:
+        joined = "".join(text)
+        pieces.append(_HTML_SPACE_RE.sub(_collapse_space, joined) if collapse_text else joined)
+        text.clear()
+
+    last = 0
+    for m in _REGION_RE.finditer(html):
+        text.append(html[last:m.start()])
+        last = m.end()
+        if m.group("comment") is not None:
+            continue
+        flush_text()
+
+        if m.group("script") is not None:
+            script = m.group("script")
+            if is_javascript(m.group("script_attrs")):
+                script = minify_js(script)
+            pieces.append(html[m.start():m.start("script")] + script + m.group("script_end"))
+        elif m.group("style") is not None:
+            pieces.append(html[m.start():m.start("style")] + minify_css(m.group("style")) + m.group("style_end"))
+        else:
+            pieces.append(m.group(0))
+
+    text.append(html[last:])
+    flush_text()
+    return "".join(pieces).strip() + "\n"
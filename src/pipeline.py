@@ -0,0 +1,199 @@
+# ABOUTME: Composable single-read/single-write transform pipeline for design HTML files.
+# ABOUTME: Chains registered transforms per file, writes once atomically, and skips unchanged files.
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from rich.console import Console
+from rich.table import Table
+
+from .cache import CACHE_DIR_NAME, FileCache
+from .postprocess import strip_arrow_navigation
+from .utils import atomic_write_bytes, content_hash, parallel_map
+from .validate import RULES, DesignView, apply_fixes, find_batches
+
+console = Console()
+
+
+@dataclass
+class Transform:
+    """A registered text transform.
+
+    apply takes a document and returns (new document, change descriptions).
+    Bump version whenever the output would differ, so incremental runs
+    reprocess files the old version already handled.
+    """
+    name: str
+    apply: Callable[[str], tuple[str, list[str]]]
+    version: str = "1"
+    description: str = ""
+
+
+# Transforms run in registration order unless a chain is given explicitly.
+TRANSFORMS: dict[str, Transform] = {}
+
+
+def register_transform(name: str, version: str = "1"):
+    """Decorator registering a function as a pipeline transform."""
+    def decorator(apply: Callable[[str], tuple[str, list[str]]]):
+        doc = (apply.__doc__ or "").strip()
+        TRANSFORMS[name] = Transform(name, apply, version, doc.splitlines()[0] if doc else "")
+        return apply
+    return decorator
+
+
+def _fixable_rule_versions() -> str:
+    return ",".join(f"{rule.name}@{rule.version}" for rule in RULES.values() if rule.fixable)
+
+
+@register_transform("fix", version=_fixable_rule_versions())
+def fix_transform(content: str) -> tuple[str, list[str]]:
+    """Apply every fixable validation rule's fix."""
+    return apply_fixes(DesignView("", content, len(content)), list(RULES.values()))
+
+
+@register_transform("strip-arrow-nav", version="3")
+def strip_arrow_nav_transform(content: str) -> tuple[str, list[str]]:
+    """Remove the design's own arrow-key navigation."""
+    return strip_arrow_navigation(content)
+
+
+def select_transforms(names: list[str] | None = None) -> list[Transform]:
+    """Resolve transform names (all registered transforms by default)."""
+    if not names:
+        return list(TRANSFORMS.values())
+    unknown = [name for name in names if name not in TRANSFORMS]
+    if unknown:
+        raise ValueError(f"Unknown transform(s): {', '.join(unknown)}. Available: {', '.join(TRANSFORMS)}")
+    return [TRANSFORMS[name] for name in names]
+
+
+def chain_signature(transforms: list[Transform]) -> str:
+    """Identifies a transform chain, including each transform's version."""
+    return "+".join(f"{t.name}@{t.version}" for t in transforms)
+
+
+@dataclass
+class PipelineResult:
+    """What the pipeline did to one file."""
+    file: str
+    changes: list[str] = field(default_factory=list)
+    sha256: str = ""
+    size: int = 0
+    mtime_ns: int = 0
+    error: str = ""
+
+
+def _run_file(job: tuple[str, tuple[str, ...], bool, str | None]) -> PipelineResult:
+    """Worker: read a file once, run the chain, write once if anything changed.
+
+    Files that aren't valid UTF-8 are left untouched and come back with an error.
+    """
+    path_str, names, dry_run, known_sha256 = job
+    path = Path(path_str)
+    data = path.read_bytes()
+    digest = content_hash(data)
+    result = PipelineResult(path_str, sha256=digest)
+
+    if digest != known_sha256:
+        try:
+            content = data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            result.error = f"not valid UTF-8 (byte {e.start}), left unchanged"
+            return result
+        for name in names:
+            content, changes = TRANSFORMS[name].apply(content)
+            result.changes.extend(f"{name}: {change}" for change in changes)
+        output = content.encode("utf-8")
+        if output != data and not dry_run:
+            atomic_write_bytes(path, output)
+            result.sha256 = content_hash(output)
+
+    stat = path.stat()
+    result.size = stat.st_size
+    result.mtime_ns = stat.st_mtime_ns
+    return result
+
+
+def design_files_under(path: Path) -> list[Path]:
+    """Every designs/design-*.html under a batch or an outputs folder."""
+    files = []
+    for batch_path in find_batches(path):
+        designs_dir = batch_path / "designs"
+        if designs_dir.is_dir():
+            files.extend(sorted(designs_dir.glob("design-*.html")))
+    return files
+
+
+def run_pipeline(path: Path, transforms: list[Transform], dry_run: bool = False,
+                 workers: int | None = None, force: bool = False) -> tuple[int, int, list[PipelineResult]]:
+    """Run a transform chain over every design under path.
+
+    Each file is read once, passed through the whole chain in memory, and
+    written once via an atomic rename. Files whose stat signature (or, failing
+    that, content hash) matches the last output of the same chain are skipped.
+    Returns (files considered, files skipped, results with changes or errors).
+    """
+    signature = chain_signature(transforms)
+    chain_id = hashlib.sha256(signature.encode()).hexdigest()[:12]
+    cache = FileCache(path / CACHE_DIR_NAME / "pipeline" / f"{chain_id}.json")
+    names = tuple(t.name for t in transforms)
+
+    files = design_files_under(path)
+    jobs = []
+    keys = []
+    skipped = 0
+    for design_file in files:
+        key = design_file.relative_to(path).as_posix()
+        entry = None if force else cache.entries.get(key)
+        if entry and cache.lookup(key, os.stat(design_file)):
+            skipped += 1
+            continue
+        keys.append(key)
+        jobs.append((str(design_file), names, dry_run, entry["sha256"] if entry else None))
+
+    changed = []
+    for key, result in zip(keys, parallel_map(_run_file, jobs, workers)):
+        if result.error:
+            # Not cached, so the file is tried again once it has been fixed.
+            changed.append(result)
+            continue
+        if result.changes:
+            changed.append(result)
+            if dry_run:
+                # Nothing was written, so the file still needs processing.
+                continue
+        cache.store_signature(key, result.size, result.mtime_ns, result.sha256, {"chain": signature})
+
+    cache.prune({f.relative_to(path).as_posix() for f in files})
+    cache.save()
+    return len(files), skipped, changed
+
+
+def show_pipeline_report(signature: str, total: int, skipped: int, results: list[PipelineResult],
+                         dry_run: bool) -> None:
+    """Display which files a pipeline run changed."""
+    verb = "Would modify" if dry_run else "Modified"
+    errors = [r for r in results if r.error]
+    results = [r for r in results if not r.error]
+    for result in errors:
+        console.print(f"[yellow]Skipped {result.file}:[/yellow] {result.error}")
+    for result in results:
+        console.print(f"[cyan]{result.file}[/cyan]")
+        for change in result.changes:
+            console.print(f"    • {change}")
+
+    table = Table(show_header=False, box=None)
+    table.add_column("Label", style="dim")
+    table.add_column("Count", justify="right")
+    table.add_row("Files", str(total))
+    table.add_row("Unchanged since last run", f"[dim]{skipped}[/dim]")
+    table.add_row(verb, f"[green]{len(results)}[/green]")
+    if errors:
+        table.add_row("Skipped (errors)", f"[yellow]{len(errors)}[/yellow]")
+    table.add_row("Changes", str(sum(len(r.changes) for r in results)))
+    console.print(f"\n[bold]{signature}[/bold]")
+    console.print(table)
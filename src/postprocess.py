@@ -0,0 +1,437 @@
+# ABOUTME: Post-processing transforms applied to finished design HTML files (run via src/pipeline.py).
+# ABOUTME: Includes a small JS token scanner used to strip the designs' own arrow-key navigation.
+
+import re
+from dataclasses import dataclass
+
+_SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+_SCRIPT_TYPE_RE = re.compile(r"""\btype\s*=\s*["']?([^"'\s>]+)""", re.IGNORECASE)
+_JS_TYPES = {"text/javascript", "application/javascript", "module"}
+
+_JS_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<string>"(?:[^"\\\n]|\\[\s\S])*"?|'(?:[^'\\\n]|\\[\s\S])*'?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<number>\.?\d[\w.]*)
+  | (?P<punct>>>>=|\.\.\.|===|!==|\*\*=|<<=|>>=|>>>|=>|==|!=|<=|>=|&&|\|\||\?\?|\?\.|\+\+|--|[-+*/%&|^]=|[{}()\[\];,:?.<>=!+\-*/%&|^~@#])
+""", re.VERBOSE)
+_TEMPLATE_CHUNK_RE = re.compile(r"(?:[^`\\$]|\\[\s\S]|\$(?!\{))*")
+_REGEX_LITERAL_RE = re.compile(r"/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+# After these tokens a "/" starts a regex literal rather than a division.
+_REGEX_AFTER_KEYWORDS = {"return", "typeof", "instanceof", "in", "of", "new", "delete",
+                         "void", "throw", "case", "do", "else", "yield", "await"}
+
+# A token at the start of a new line that continues the previous statement.
+_CONTINUATION = {".", "?.", ")", "]", ",", "?", ":", "=>", "+", "-", "*", "/", "%", "&&", "||",
+                 "??", "==", "===", "!=", "!==", "<", ">", "<=", ">=", "=", "+=", "-=", "|", "&"}
+
+_ARROW_KEYS = {"ArrowLeft", "ArrowRight"}
+
+# Names that make an if condition a key test rather than a state guard.
+_KEY_NAMES = {"key", "code", "keyCode", "which"}
+
+
+@dataclass
+class Token:
+    kind: str
+    start: int
+    end: int
+    value: str
+
+
+def _scan_template(src: str, pos: int) -> tuple[int, bool]:
+    """Scan template literal text from pos. Returns (end, opened a ${ expression)."""
+    end = _TEMPLATE_CHUNK_RE.match(src, pos).end()
+    if end >= len(src):
+        return len(src), False
+    if src[end] == "`":
+        return end + 1, False
+    return end + 2, True
+
+
+def tokenize_js(src: str) -> list[Token]:
+    """Split JavaScript into significant tokens, skipping whitespace and comments.
+
+    Strings, template literals and regex literals are single tokens, so their
+    contents never affect brace matching. Code inside ${...} is tokenized
+    normally. Runs in one linear pass.
+    """
+    tokens: list[Token] = []
+    template_depths: list[int] = []
+    pos = 0
+    length = len(src)
+
+    while pos < length:
+        char = src[pos]
+
+        if char == "`" or (char == "}" and template_depths and template_depths[-1] == 0):
+            if char == "}":
+                template_depths.pop()
+            end, opened = _scan_template(src, pos + 1)
+            tokens.append(Token("template", pos, end, src[pos:end]))
+            if opened:
+                template_depths.append(0)
+            pos = end
+            continue
+
+        if char == "/" and src[pos + 1:pos + 2] not in ("/", "*"):
+            prev = tokens[-1] if tokens else None
+            regex_allowed = (prev is None
+                             or (prev.kind == "punct" and prev.value not in (")", "]", "}"))
+                             or (prev.kind == "name" and prev.value in _REGEX_AFTER_KEYWORDS))
+            if regex_allowed:
+                m = _REGEX_LITERAL_RE.match(src, pos)
+                if m:
+                    tokens.append(Token("regex", pos, m.end(), m.group(0)))
+                    pos = m.end()
+                    continue
+
+        m = _JS_TOKEN_RE.match(src, pos)
+        if m is None:
+            pos += 1
+            continue
+        kind = m.lastgroup
+        if kind not in ("ws", "comment"):
+            value = m.group(0)
+            if template_depths and kind == "punct":
+                if value == "{":
+                    template_depths[-1] += 1
+                elif value == "}":
+                    template_depths[-1] -= 1
+            tokens.append(Token(kind, pos, m.end(), value))
+        pos = m.end()
+
+    return tokens
+
+
+def is_javascript(script_attrs: str) -> bool:
+    """True if a <script> tag with these attributes holds JavaScript (no type counts)."""
+    type_match = _SCRIPT_TYPE_RE.search(script_attrs)
+    return not type_match or type_match.group(1).lower() in _JS_TYPES
+
+
+def _match_brackets(tokens: list[Token]) -> dict[int, int]:
+    """Map each opening bracket index to its closing bracket index."""
+    pairs = {}
+    stack = []
+    closers = {")": "(", "]": "[", "}": "{"}
+    for i, token in enumerate(tokens):
+        if token.kind != "punct":
+            continue
+        if token.value in "([{":
+            stack.append(i)
+        elif token.value in closers:
+            while stack and tokens[stack[-1]].value != closers[token.value]:
+                stack.pop()
+            if stack:
+                pairs[stack.pop()] = i
+    return pairs
+
+
+class _Parser:
+    """Just enough statement structure to find if-chains and case clauses."""
+
+    def __init__(self, src: str, tokens: list[Token]):
+        self.src = src
+        self.tokens = tokens
+        self.pairs = _match_brackets(tokens)
+
+    def value(self, i: int) -> str | None:
+        return self.tokens[i].value if 0 <= i < len(self.tokens) else None
+
+    def statement_end(self, i: int) -> int:
+        """Index of the last token of the statement starting at token i."""
+        tokens = self.tokens
+        if self.value(i) == "{":
+            return self.pairs.get(i, len(tokens) - 1)
+        if self.value(i) == "if" and self.value(i + 1) == "(":
+            body_end = self.statement_end(self.pairs.get(i + 1, i + 1) + 1)
+            if self.value(body_end + 1) == "else":
+                return self.statement_end(body_end + 2)
+            return body_end
+
+        j = i
+        while j < len(tokens):
+            value = tokens[j].value
+            if value in ("(", "[", "{") and tokens[j].kind == "punct":
+                j = self.pairs.get(j, len(tokens) - 1)
+            elif value == ";" and tokens[j].kind == "punct":
+                return j
+            elif value == "}" and tokens[j].kind == "punct":
+                return j - 1
+            nxt = j + 1
+            if nxt < len(tokens):
+                gap = self.src[tokens[j].end:tokens[nxt].start]
+                if "\n" in gap and tokens[nxt].value not in _CONTINUATION:
+                    return j
+            j += 1
+        return len(tokens) - 1
+
+    def text(self, first: int, last: int) -> str:
+        return self.src[self.tokens[first].start:self.tokens[last].end]
+
+    def _unwrap(self, first: int, last: int) -> tuple[int, int]:
+        while self.value(first) == "(" and self.pairs.get(first) == last:
+            first, last = first + 1, last - 1
+        return first, last
+
+    def _is_arrow_comparison(self, first: int, last: int) -> bool:
+        """x.key === "ArrowLeft" (either way round) with a plain name or member operand."""
+        tokens = self.tokens[first:last + 1]
+        if len(tokens) < 3:
+            return False
+        if tokens[0].kind == "string":
+            tokens = tokens[::-1]
+        key, op, operand = tokens[-1], tokens[-2], tokens[:-2]
+        if key.kind != "string" or key.value[1:-1] not in _ARROW_KEYS or op.value not in ("==", "==="):
+            return False
+        return (len(operand) % 2 == 1
+                and all(t.kind == "name" for t in operand[::2])
+                and all(t.value == "." for t in operand[1::2]))
+
+    def is_arrow_test(self, cond_open: int, cond_close: int) -> bool:
+        """True if the whole condition is ==/=== tests on ArrowLeft/ArrowRight joined by ||.
+
+        Negated guards (!==) and conditions that also test other keys or
+        modifiers are not arrow navigation and stay.
+        """
+        first, last = self._unwrap(cond_open + 1, cond_close - 1)
+        if first > last:
+            return False
+        parts = []
+        start = j = first
+        while j <= last:
+            if self.value(j) in ("(", "[", "{") and self.tokens[j].kind == "punct":
+                j = self.pairs.get(j, last)
+            elif self.value(j) == "||":
+                parts.append((start, j - 1))
+                start = j + 1
+            j += 1
+        parts.append((start, last))
+        return all(self._is_arrow_comparison(*self._unwrap(a, b)) for a, b in parts)
+
+    def guarded_bodies(self) -> list[tuple[int, int]]:
+        """Token ranges of braced if bodies whose condition is state, not a key test.
+
+        Arrow keys inside them (say, "if (lightboxOpen) { ... }") drive an
+        open overlay rather than the page, so they are left alone.
+        """
+        ranges = []
+        for i, token in enumerate(self.tokens):
+            if token.value != "if" or token.kind != "name" or self.value(i + 1) != "(":
+                continue
+            cond_close = self.pairs.get(i + 1)
+            if cond_close is None or self.value(cond_close + 1) != "{":
+                continue
+            if any(t.kind == "name" and t.value in _KEY_NAMES for t in self.tokens[i + 2:cond_close]):
+                continue
+            ranges.append((cond_close + 1, self.pairs.get(cond_close + 1, len(self.tokens) - 1)))
+        return ranges
+
+    def case_labels(self, i: int) -> tuple[list[tuple[int, int, bool]], int]:
+        """Stacked case/default labels from token i sharing one body.
+
+        Returns ([(label token, colon token, is an arrow key)], body start).
+        """
+        labels = []
+        while self.value(i) in ("case", "default") and self.tokens[i].kind == "name":
+            colon = i + 1
+            while colon < len(self.tokens) and self.value(colon) != ":":
+                if self.value(colon) in ("(", "[", "{") and self.tokens[colon].kind == "punct":
+                    colon = self.pairs.get(colon, len(self.tokens) - 1)
+                colon += 1
+            if colon >= len(self.tokens):
+                break
+            key = self.tokens[i + 1]
+            labels.append((i, colon, colon == i + 2 and key.kind == "string" and key.value[1:-1] in _ARROW_KEYS))
+            i = colon + 1
+        return labels, i
+
+    def braced(self, first: int, last: int) -> str:
+        """Statement text, wrapped in braces if it isn't a block, so it can be rejoined safely."""
+        text = self.text(first, last)
+        return text if self.value(first) == "{" else "{ " + text + " }"
+
+
+@dataclass
+class _Edit:
+    start: int
+    end: int
+    replacement: str
+    description: str
+
+
+def _whole_lines(src: str, start: int, end: int) -> tuple[int, int]:
+    """Grow [start, end) to whole lines when only whitespace surrounds it."""
+    line_start = src.rfind("\n", 0, start) + 1
+    if src[line_start:start].strip():
+        return start, end
+    line_end = src.find("\n", end)
+    if line_end == -1:
+        line_end = len(src)
+    if src[end:line_end].strip():
+        return start, end
+    return line_start, min(line_end + 1, len(src))
+
+
+def _line_of(src: str, offset: int) -> int:
+    return src.count("\n", 0, offset) + 1
+
+
+def _arrow_edits(src: str, first_line: int = 1) -> list[_Edit]:
+    """Find arrow-key if-branches and case clauses in one script.
+
+    first_line is the document line the script starts on, for descriptions.
+    """
+    tokens = tokenize_js(src)
+    parser = _Parser(src, tokens)
+    guarded = parser.guarded_bodies()
+    edits: list[_Edit] = []
+    i = 0
+
+    while i < len(tokens):
+        token = tokens[i]
+
+        if token.value == "if" and token.kind == "name" and parser.value(i + 1) == "(" \
+                and parser.value(i - 1) != "else":
+            branches = []
+            final_else = None
+            j = i
+            while True:
+                cond_close = parser.pairs.get(j + 1)
+                if cond_close is None:
+                    break
+                body_end = parser.statement_end(cond_close + 1)
+                branches.append((j + 1, cond_close, cond_close + 1, body_end))
+                if parser.value(body_end + 1) != "else":
+                    break
+                if parser.value(body_end + 2) == "if" and parser.value(body_end + 3) == "(":
+                    j = body_end + 2
+                    continue
+                final_else = (body_end + 2, parser.statement_end(body_end + 2))
+                break
+
+            arrow = [b for b in branches if parser.is_arrow_test(b[0], b[1])]
+            if not arrow or any(open_ < i < close for open_, close in guarded):
+                i += 1
+                continue
+
+            chain_end = final_else[1] if final_else else branches[-1][3]
+            line = _line_of(src, token.start) + first_line - 1
+            kept = [b for b in branches if b not in arrow]
+            if not kept and final_else:
+                # Removing every condition would make the else unconditional;
+                # empty the arrow branches instead.
+                to_empty = [b for b in arrow if not (parser.value(b[2]) == "{" and b[3] == b[2] + 1)]
+                if not to_empty:
+                    i += 1
+                    continue
+                for cond_open, cond_close, body_start, body_end in to_empty:
+                    edits.append(_Edit(tokens[body_start].start, tokens[body_end].end, "{}",
+                                       f"line {line}: emptied if {parser.text(cond_open, cond_close)}"))
+            elif not kept:
+                start, end = _whole_lines(src, token.start, tokens[chain_end].end)
+                edits.append(_Edit(start, end, "",
+                                   f"line {line}: removed if {parser.text(arrow[0][0], arrow[0][1])}"
+                                   + (f" (+{len(arrow) - 1} else-if)" if len(arrow) > 1 else "")))
+            else:
+                # Brace-less bodies may end by ASI, so each is braced before rejoining.
+                parts = [f"if {parser.text(c0, c1)} {parser.braced(b0, b1)}" for c0, c1, b0, b1 in kept]
+                if final_else:
+                    parts.append(parser.braced(*final_else))
+                edits.append(_Edit(token.start, tokens[chain_end].end, " else ".join(parts),
+                                   f"line {line}: removed {len(arrow)} arrow-key branch(es) from if chain"))
+            i = chain_end + 1
+            continue
+
+        if token.value in ("case", "default") and token.kind == "name" and parser.value(i - 1) != ":" \
+                and not any(open_ < i < close for open_, close in guarded):
+            labels, body_start = parser.case_labels(i)
+            arrow = [label for label in labels if label[2]]
+            if not arrow:
+                i += 1
+                continue
+            line = _line_of(src, token.start) + first_line - 1
+            if len(arrow) == len(labels):
+                # Every label is an arrow key: drop the clause body with them,
+                # up to the next label or the end of the switch.
+                j = body_start
+                while j < len(tokens) and tokens[j].value not in ("case", "default", "}"):
+                    if tokens[j].value in ("(", "[", "{") and tokens[j].kind == "punct":
+                        j = parser.pairs.get(j, len(tokens) - 1)
+                    j += 1
+                start, stop = _whole_lines(src, token.start, tokens[j - 1].end)
+                edits.append(_Edit(start, stop, "", f"line {line}: removed "
+                                   + ", ".join(f"case {parser.text(a + 1, c - 1)}" for a, c, _ in arrow)))
+                i = j
+                continue
+            # Another label shares the body, so only the arrow labels go.
+            for label_start, colon, _ in arrow:
+                start, stop = _whole_lines(src, tokens[label_start].start, tokens[colon].end)
+                label_line = _line_of(src, tokens[label_start].start) + first_line - 1
+                edits.append(_Edit(start, stop, "",
+                                   f"line {label_line}: removed case {parser.text(label_start + 1, colon - 1)}"))
+            i = body_start
+            continue
+
+        i += 1
+
+    return edits
+
+
+def _apply_edits(src: str, edits: list[_Edit]) -> str:
+    for edit in sorted(edits, key=lambda e: e.start, reverse=True):
+        src = src[:edit.start] + edit.replacement + src[edit.end:]
+    return src
+
+
+def strip_arrow_navigation(html: str) -> tuple[str, list[str]]:
+    """Remove ArrowLeft/ArrowRight key handling from a design's scripts.
+
+    Only <script> regions are scanned, with a token scanner that understands
+    strings, comments and brace depth. Returns (new html, change descriptions).
+    Repeats until nothing changes so handlers nested inside kept branches are
+    also removed.
+
+    Kept branches stay valid even when their bodies end by ASI:
+
+    >>> strip_arrow_navigation('<script>if (e.key === "Escape") close()\\n'
+    ...                        'else if (e.key === "ArrowLeft") prev()\\nelse other()</script>')[0]
+    '<script>if (e.key === "Escape") { close() } else { other() }</script>'
+    >>> strip_arrow_navigation('<script>if (e.key !== "ArrowLeft") return;</script>')[1]
+    []
+
+    Stacked arrow labels take their shared body with them:
+
+    >>> strip_arrow_navigation('<script>switch (e.key) { case "ArrowLeft": case "ArrowRight": nav(); break; '
+    ...                        'case "Escape": close(); }</script>')[0]
+    '<script>switch (e.key) {  case "Escape": close(); }</script>'
+    """
+    changes: list[str] = []
+    for _ in range(5):
+        if "ArrowLeft" not in html and "ArrowRight" not in html:
+            break
+        pieces = []
+        last = 0
+        changed = False
+        for m in _SCRIPT_RE.finditer(html):
+            if not is_javascript(m.group(1)):
+                continue
+            script = m.group(2)
+            if "ArrowLeft" not in script and "ArrowRight" not in script:
+                continue
+            edits = _arrow_edits(script, _line_of(html, m.start(2)))
+            if not edits:
+                continue
+            changes.extend(e.description for e in edits)
+            pieces.append(html[last:m.start(2)])
+            pieces.append(_apply_edits(script, edits))
+            last = m.end(2)
+            changed = True
+        if not changed:
+            break
+        pieces.append(html[last:])
+        html = "".join(pieces)
+    return html, changes
@@ -0,0 +1,269 @@
+# ABOUTME: Promotes validated designs from a batch's .staging folder into designs/.
+# ABOUTME: Validates and fixes staged files in parallel, moves passing ones atomically, logs failures.
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from .cache import CACHE_DIR_NAME
+from .utils import atomic_write_bytes, atomic_write_text, ensure_dir, parallel_map
+from .validate import RULES, DesignView, Rule, apply_fixes, run_rules
+
+console = Console()
+
+# A staged file must be untouched for this long before it is considered
+# finished; agents write designs in several chunks.
+DEFAULT_SETTLE_SECONDS = 5.0
+
+
+@dataclass
+class StagedResult:
+    """Validation outcome for one staged design."""
+    name: str
+    size: int
+    mtime_ns: int
+    fixed: bytes | None = None
+    fixes: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    warnings: int = 0
+
+
+def _check_staged(job: tuple[str, tuple[str, ...]]) -> StagedResult | None:
+    """Worker: validate one staged file, applying fixes in memory.
+
+    Returns None for files that do not look finished yet (no closing </html>)
+    or that were renamed or removed since the staging folder was listed.
+    """
+    path_str, rule_names = job
+    path = Path(path_str)
+    try:
+        stat = path.stat()
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    content = data.decode("utf-8", errors="replace")
+    if "</html>" not in content[-2000:].lower():
+        return None
+
+    rules = [RULES[name] for name in rule_names]
+    result = StagedResult(path.name, stat.st_size, stat.st_mtime_ns)
+
+    view = DesignView(path.name, content, len(data))
+    fixed, fixes = apply_fixes(view, rules)
+    if fixes:
+        result.fixes = fixes
+        result.fixed = fixed.encode("utf-8")
+        view = DesignView(path.name, fixed, len(result.fixed))
+
+    for issues in run_rules(view, rules).values():
+        for issue in issues:
+            if issue.severity == "error":
+                line_info = f" (line {issue.line})" if issue.line else ""
+                result.errors.append(f"{issue.issue_type}{line_info}: {issue.description}")
+            else:
+                result.warnings += 1
+    return result
+
+
+class PromoteLock:
+    """Exclusive per-batch lock so only one promote runs at a time.
+
+    A lock left behind by a process that no longer exists is taken over.
+    """
+
+    def __init__(self, batch_path: Path):
+        self.path = ensure_dir(batch_path / CACHE_DIR_NAME) / "promote.lock"
+
+    def __enter__(self):
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                if self._owner_alive():
+                    raise RuntimeError(f"Another promote is running ({self.path})")
+                self.path.unlink(missing_ok=True)
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(str(os.getpid()))
+            return self
+        raise RuntimeError(f"Could not acquire {self.path}")
+
+    def __exit__(self, *exc):
+        self.path.unlink(missing_ok=True)
+
+    def _owner_alive(self) -> bool:
+        try:
+            pid = int(self.path.read_text().strip())
+            os.kill(pid, 0)
+        except (OSError, ValueError):
+            return False
+        return True
+
+
+def _design_id(name: str) -> int | None:
+    try:
+        return int(name.removeprefix("design-").removesuffix(".html"))
+    except ValueError:
+        return None
+
+
+def _unchanged(path: Path, result: StagedResult) -> bool:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return False
+    return stat.st_size == result.size and stat.st_mtime_ns == result.mtime_ns
+
+
+def _move_into_designs(staged: Path, target: Path, result: StagedResult) -> None:
+    """Publish a staged design under its final name without clobbering.
+
+    os.link fails if the target exists, so two promotes (or a design written
+    straight to designs/) can never overwrite each other.
+    """
+    if result.fixed is None:
+        os.link(staged, target)
+    else:
+        tmp = target.with_name(f".{target.name}.promote")
+        atomic_write_bytes(tmp, result.fixed)
+        try:
+            os.link(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+    staged.unlink(missing_ok=True)
+
+
+def promote_batch(batch_path: Path, rules: list[Rule] | None = None,
+                  settle_seconds: float = DEFAULT_SETTLE_SECONDS, dry_run: bool = False,
+                  workers: int | None = None) -> dict:
+    """Validate every finished file in .staging/ and move passing ones into designs/.
+
+    Files still being written (modified within settle_seconds, missing their
+    closing </html>, or changed during validation) are left for the next run.
+    Fixable issues are fixed on the way. Files with error-severity issues stay
+    in .staging/ and are recorded in failures.json, which is rewritten once,
+    atomically, at the end.
+    """
+    if rules is None:
+        rules = list(RULES.values())
+
+    staging_dir = batch_path / ".staging"
+    designs_dir = batch_path / "designs"
+    summary = {"promoted": [], "fixed": [], "failed": {}, "conflicts": [], "in_progress": []}
+    if not staging_dir.exists():
+        return summary
+
+    with PromoteLock(batch_path):
+        now = time.time_ns()
+        candidates = []
+        with os.scandir(staging_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith("design-") and entry.name.endswith(".html")):
+                    continue
+                try:
+                    mtime_ns = entry.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if now - mtime_ns < settle_seconds * 1e9:
+                    summary["in_progress"].append(entry.name)
+                    continue
+                candidates.append(Path(entry.path))
+
+        candidates.sort(key=lambda p: (_design_id(p.name) or 0, p.name))
+        rule_names = tuple(rule.name for rule in rules)
+        jobs = [(str(path), rule_names) for path in candidates]
+
+        for path, result in zip(candidates, parallel_map(_check_staged, jobs, workers)):
+            if result is None:
+                summary["in_progress"].append(path.name)
+                continue
+            if result.errors:
+                summary["failed"][path.name] = result.errors
+                continue
+
+            target = designs_dir / path.name
+            if target.exists():
+                summary["conflicts"].append(path.name)
+                continue
+            if dry_run:
+                summary["promoted"].append(path.name)
+                if result.fixes:
+                    summary["fixed"].append(path.name)
+                continue
+            if not _unchanged(path, result):
+                summary["in_progress"].append(path.name)
+                continue
+            try:
+                ensure_dir(designs_dir)  # only once something moves, so dry runs leave no trace
+                _move_into_designs(path, target, result)
+            except FileExistsError:
+                summary["conflicts"].append(path.name)
+                continue
+            except FileNotFoundError:
+                summary["in_progress"].append(path.name)
+                continue
+            summary["promoted"].append(path.name)
+            if result.fixes:
+                summary["fixed"].append(path.name)
+
+        if not dry_run:
+            _update_failures(batch_path, summary)
+
+    return summary
+
+
+def _update_failures(batch_path: Path, summary: dict) -> None:
+    """Drop promoted designs from failures.json and record new failures."""
+    failures_path = batch_path / "failures.json"
+    failures = json.loads(failures_path.read_text()) if failures_path.exists() else []
+    if not failures and not summary["failed"]:
+        return
+
+    promoted_ids = {_design_id(name) for name in summary["promoted"]}
+    by_id = {f["id"]: f for f in failures if f["id"] not in promoted_ids}
+    for name, errors in summary["failed"].items():
+        design_id = _design_id(name)
+        if design_id is None:
+            continue
+        previous = by_id.get(design_id, {})
+        by_id[design_id] = {
+            "id": design_id,
+            "error": f"Validation failed: {errors[0]}",
+            "issues": errors,
+            "attempts": previous.get("attempts", 0) + 1,
+            "failed_at": datetime.now().isoformat(),
+        }
+
+    atomic_write_text(failures_path, json.dumps(sorted(by_id.values(), key=lambda f: f["id"]), indent=2))
+
+
+def show_promote_report(summary: dict, dry_run: bool = False) -> None:
+    """Display the outcome of a promote run."""
+    verb = "Would promote" if dry_run else "Promoted"
+
+    table = Table(show_header=False, box=None)
+    table.add_column("Label", style="dim")
+    table.add_column("Count", justify="right")
+    table.add_row(verb, f"[green]{len(summary['promoted'])}[/green]")
+    table.add_row("  after auto-fix", f"[green]{len(summary['fixed'])}[/green]")
+    table.add_row("Failed validation", f"[red]{len(summary['failed'])}[/red]")
+    table.add_row("Already in designs/", f"[yellow]{len(summary['conflicts'])}[/yellow]")
+    table.add_row("Still being written", f"[dim]{len(summary['in_progress'])}[/dim]")
+    console.print()
+    console.print(table)
+
+    if summary["failed"]:
+        console.print("\n[red]Failed designs (left in .staging/):[/red]")
+        for name, errors in list(summary["failed"].items())[:5]:
+            console.print(f"  {name}: {errors[0]}")
+        if len(summary["failed"]) > 5:
+            console.print(f"  ... and {len(summary['failed']) - 5} more")
+
+    if summary["conflicts"]:
+        console.print(f"\n[yellow]Skipped (already in designs/):[/yellow] {', '.join(summary['conflicts'][:10])}")
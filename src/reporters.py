@@ -0,0 +1,171 @@
+# ABOUTME: Streaming machine-readable validation output (JSON Lines, JUnit XML, SARIF).
+# ABOUTME: Each reporter writes issues as soon as a file is checked, holding nothing in memory.
+
+import json
+import sys
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from .validate import Rule, ValidationIssue, find_batches, iter_validate_batch
+
+# Process exit codes, by the worst severity found. 2 is left to click,
+# which uses it for usage errors, so CI can tell bad flags from bad designs.
+EXIT_CLEAN = 0
+EXIT_WARNINGS = 1
+EXIT_ERRORS = 3
+
+
+class Reporter(ABC):
+    """Base class: subclasses write one file's issues at a time to a stream."""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def start(self) -> None:
+        pass
+
+    @abstractmethod
+    def file(self, batch: str, path: str, issues: list[ValidationIssue]) -> None:
+        """Write one checked file's issues."""
+
+    def finish(self, totals: dict) -> None:
+        pass
+
+
+class JsonlReporter(Reporter):
+    """One JSON object per issue, then a summary object."""
+
+    def file(self, batch: str, path: str, issues: list[ValidationIssue]) -> None:
+        for issue in issues:
+            self.stream.write(json.dumps({
+                "kind": "issue",
+                "batch": batch,
+                "path": path,
+                "rule": issue.rule,
+                "type": issue.issue_type,
+                "severity": issue.severity,
+                "line": issue.line,
+                "fixable": issue.fixable,
+                "description": issue.description,
+            }) + "\n")
+        self.stream.flush()
+
+    def finish(self, totals: dict) -> None:
+        self.stream.write(json.dumps({"kind": "summary", **totals}) + "\n")
+
+
+class JunitReporter(Reporter):
+    """JUnit XML: a testsuite per batch and a testcase per design.
+
+    Errors become <failure> elements; warnings go to <system-out>.
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.batch = None
+
+    def start(self) -> None:
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites name="design-vibes-validate">\n')
+
+    def file(self, batch: str, path: str, issues: list[ValidationIssue]) -> None:
+        if batch != self.batch:
+            if self.batch is not None:
+                self.stream.write('  </testsuite>\n')
+            self.stream.write(f'  <testsuite name={quoteattr(batch)}>\n')
+            self.batch = batch
+
+        errors = [i for i in issues if i.severity == "error"]
+        warnings = [i for i in issues if i.severity != "error"]
+        name = quoteattr(Path(path).name)
+        if not issues:
+            self.stream.write(f'    <testcase classname={quoteattr(batch)} name={name}/>\n')
+        else:
+            self.stream.write(f'    <testcase classname={quoteattr(batch)} name={name}>\n')
+            for issue in errors:
+                line_info = f"line {issue.line}: " if issue.line else ""
+                self.stream.write(
+                    f'      <failure type={quoteattr(issue.issue_type)} message={quoteattr(issue.description)}>'
+                    f'{escape(line_info + issue.description)}</failure>\n'
+                )
+            if warnings:
+                text = "\n".join(f"warning {i.issue_type}: {i.description}" for i in warnings)
+                self.stream.write(f'      <system-out>{escape(text)}</system-out>\n')
+            self.stream.write('    </testcase>\n')
+        self.stream.flush()
+
+    def finish(self, totals: dict) -> None:
+        if self.batch is not None:
+            self.stream.write('  </testsuite>\n')
+        self.stream.write('</testsuites>\n')
+
+
+class SarifReporter(Reporter):
+    """SARIF 2.1.0 with a single run; results are streamed into its array."""
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self.first = True
+
+    def start(self) -> None:
+        driver = {"name": "design-vibes-validate",
+                  "informationUri": "https://github.com/andrewedunn/1000-design-vibes"}
+        self.stream.write(
+            '{"version": "2.1.0", "$schema": "https://json.schemastore.org/sarif-2.1.0.json", '
+            f'"runs": [{{"tool": {{"driver": {json.dumps(driver)}}}, "results": [\n'
+        )
+
+    def file(self, batch: str, path: str, issues: list[ValidationIssue]) -> None:
+        for issue in issues:
+            location = {"artifactLocation": {"uri": path}}
+            if issue.line:
+                location["region"] = {"startLine": issue.line}
+            result = {
+                "ruleId": issue.issue_type,
+                "level": "error" if issue.severity == "error" else "warning",
+                "message": {"text": issue.description},
+                "locations": [{"physicalLocation": location}],
+                "properties": {"rule": issue.rule, "fixable": issue.fixable},
+            }
+            self.stream.write(("" if self.first else ",\n") + json.dumps(result))
+            self.first = False
+        self.stream.flush()
+
+    def finish(self, totals: dict) -> None:
+        self.stream.write('\n]}]}\n')
+
+
+REPORTERS = {
+    "jsonl": JsonlReporter,
+    "junit": JunitReporter,
+    "sarif": SarifReporter,
+}
+
+
+def stream_validation(path: Path, fmt: str, use_cache: bool = True, rules: list[Rule] | None = None,
+                      stream: TextIO | None = None) -> int:
+    """Validate a batch (or every batch under an outputs folder) and stream issues.
+
+    Returns the exit code: EXIT_ERRORS if any error-severity issue was found,
+    EXIT_WARNINGS if only warnings, EXIT_CLEAN otherwise.
+    """
+    reporter = REPORTERS[fmt](stream or sys.stdout)
+    totals = {"files": 0, "files_with_issues": 0, "errors": 0, "warnings": 0}
+
+    reporter.start()
+    for batch_path in find_batches(path):
+        for design_file, issues in iter_validate_batch(batch_path, use_cache=use_cache, rules=rules):
+            totals["files"] += 1
+            if issues:
+                totals["files_with_issues"] += 1
+            for issue in issues:
+                totals["errors" if issue.severity == "error" else "warnings"] += 1
+            reporter.file(batch_path.name, design_file.as_posix(), issues)
+    reporter.finish(totals)
+
+    if totals["errors"]:
+        return EXIT_ERRORS
+    if totals["warnings"]:
+        return EXIT_WARNINGS
+    return EXIT_CLEAN
@@ -0,0 +1,137 @@
+# ABOUTME: Builds the viewer's type-ahead search index over names, taglines, batches and dimensions.
+# ABOUTME: Sorted terms give prefix matches, a trigram table gives fuzzy matches; query() mirrors the viewer.
+
+import base64
+import bisect
+import re
+from collections import defaultdict
+
+from .facets import decode_gaps, encode_gaps
+
+SEARCH_VERSION = 1
+
+# Indexed fields, in the order their postings are stored, and how much a
+# match in each counts towards a design's score.
+FIELDS = ("name", "tagline", "dimension", "batch")
+FIELD_WEIGHTS = (8.0, 3.0, 2.0, 1.0)
+
+# Match quality multipliers: exact term, term prefix, trigram similarity.
+# Fuzzy matching is only a fallback for tokens with no exact or prefix match.
+EXACT = 1.0
+PREFIX = 0.7
+FUZZY = 0.5
+MIN_SIMILARITY = 0.5
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric words; underscores and punctuation split words."""
+    return _WORD_RE.findall(str(text).lower())
+
+
+def trigrams(term: str) -> set[str]:
+    """Trigrams of a term padded with spaces, so short terms still have some."""
+    padded = f" {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def build_search_index(designs: list[dict]) -> dict:
+    """Index every design's name, tagline, dimension values and batch name.
+
+    terms is sorted so a prefix is a contiguous range. postings[i] holds,
+    per field, the gap-encoded positions of designs containing terms[i].
+    trigrams maps each trigram to the gap-encoded ids of terms containing it.
+    """
+    postings: dict[str, list[set[int]]] = defaultdict(lambda: [set() for _ in FIELDS])
+    for position, design in enumerate(designs):
+        texts = (
+            [design["name"]],
+            [design["tagline"]],
+            design.get("dimensions", {}).values(),
+            [design["batch"]],
+        )
+        for field, values in enumerate(texts):
+            for value in values:
+                for term in tokenize(value):
+                    postings[term][field].add(position)
+
+    terms = sorted(postings)
+    grams: dict[str, list[int]] = defaultdict(list)
+    for term_id, term in enumerate(terms):
+        for gram in trigrams(term):
+            grams[gram].append(term_id)
+
+    return {
+        "version": SEARCH_VERSION,
+        "fields": list(FIELDS),
+        "weights": list(FIELD_WEIGHTS),
+        "terms": terms,
+        "postings": [[_b64(encode_gaps(sorted(p))) for p in postings[term]] for term in terms],
+        "trigrams": {gram: _b64(encode_gaps(ids)) for gram, ids in sorted(grams.items())},
+    }
+
+
+class SearchIndex:
+    """Decoded search index; query() uses the same scoring as the viewer."""
+
+    def __init__(self, index: dict):
+        self.terms = index["terms"]
+        self.weights = index["weights"]
+        self._postings = index["postings"]
+        self._trigrams = index["trigrams"]
+        self._decoded: dict[int, list[list[int]]] = {}
+
+    def _term_postings(self, term_id: int) -> list[list[int]]:
+        if term_id not in self._decoded:
+            self._decoded[term_id] = [decode_gaps(base64.b64decode(p)) for p in self._postings[term_id]]
+        return self._decoded[term_id]
+
+    def matching_terms(self, token: str) -> dict[int, float]:
+        """Term id -> match quality for one query token."""
+        matches: dict[int, float] = {}
+        start = bisect.bisect_left(self.terms, token)
+        for term_id in range(start, len(self.terms)):
+            term = self.terms[term_id]
+            if not term.startswith(token):
+                break
+            matches[term_id] = EXACT if term == token else PREFIX * (0.5 + 0.5 * len(token) / len(term))
+
+        if not matches and len(token) >= 3:
+            wanted = trigrams(token)
+            shared: dict[int, int] = defaultdict(int)
+            for gram in wanted:
+                encoded = self._trigrams.get(gram)
+                if encoded:
+                    for term_id in decode_gaps(base64.b64decode(encoded)):
+                        shared[term_id] += 1
+            for term_id, count in shared.items():
+                # Dice coefficient over the two trigram sets.
+                similarity = 2 * count / (len(wanted) + len(trigrams(self.terms[term_id])))
+                if similarity >= MIN_SIMILARITY:
+                    matches[term_id] = FUZZY * similarity
+        return matches
+
+    def query(self, text: str, limit: int = 10) -> list[tuple[int, float]]:
+        """Ranked (position, score) pairs for designs matching every query token."""
+        scores: dict[int, float] | None = None
+        for token in tokenize(text):
+            token_scores: dict[int, float] = {}
+            for term_id, quality in self.matching_terms(token).items():
+                for field, positions in enumerate(self._term_postings(term_id)):
+                    score = quality * self.weights[field]
+                    for position in positions:
+                        if score > token_scores.get(position, 0.0):
+                            token_scores[position] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {p: s + token_scores[p] for p, s in scores.items() if p in token_scores}
+            if not scores:
+                return []
+        ranked = sorted((scores or {}).items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
@@ -0,0 +1,362 @@
+# ABOUTME: Local preview server: in-memory file cache, strong ETags, gzip, byte ranges and SSE live reload.
+# ABOUTME: Built on http.server; a watcher thread rebuilds and pushes a reload when designs land.
+
+import gzip
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import unquote, urlsplit
+
+from rich.console import Console
+
+from .utils import content_hash
+
+console = Console()
+
+EVENTS_PATH = "/__events"
+
+# Files cached in memory, in total; least recently used files go first.
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Files smaller than this are sent uncompressed.
+MIN_GZIP_BYTES = 256
+_COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+# Content-hashed names from build-site (design-1.0123456789.html) never change.
+_HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{10}\.\w+$")
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+# Appended to the viewer page so it reloads when the catalog is rebuilt.
+LIVE_RELOAD_SNIPPET = (
+    b"<script>new EventSource('" + EVENTS_PATH.encode() + b"')"
+    b".addEventListener('reload', () => location.reload());</script>\n"
+)
+
+# Seconds between SSE keep-alive comments; also how quickly dead clients are noticed.
+HEARTBEAT_SECONDS = 15
+
+
+@dataclass
+class CachedFile:
+    """A file's bytes and validators, plus its gzip form once someone asks for it."""
+    size: int
+    mtime_ns: int
+    data: bytes
+    etag: str
+    content_type: str
+    gzipped: bytes | None = None
+
+
+class FileStore:
+    """In-memory cache of files under root, revalidated by stat signature on every hit.
+
+    A precompressed .gz sibling (as written by build-site) is used when it
+    is at least as new as its file; otherwise the gzip form is made once
+    and kept with the entry.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_BYTES, inject: dict[str, bytes] | None = None):
+        self.root = root.resolve()
+        self.max_bytes = max_bytes
+        self.inject = inject or {}
+        self._entries: OrderedDict[str, CachedFile] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def resolve(self, url_path: str) -> Path | None:
+        """Map a URL path to a file under root, or None (missing or outside root)."""
+        relative = unquote(url_path).lstrip("/")
+        path = (self.root / relative).resolve()
+        if path != self.root and self.root not in path.parents:
+            return None
+        if path.is_dir():
+            path = path / "index.html"
+        return path if path.is_file() else None
+
+    def get(self, path: Path) -> CachedFile:
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                self._entries.move_to_end(key)
+                return entry
+
+        data = path.read_bytes()
+        relative = path.relative_to(self.root).as_posix()
+        if relative in self.inject:
+            data = data.replace(b"</body>", self.inject[relative] + b"</body>", 1)
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        entry = CachedFile(stat.st_size, stat.st_mtime_ns, data, f'"{content_hash(data)[:20]}"', content_type)
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= len(old.data) + len(old.gzipped or b"")
+            self._entries[key] = entry
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.data) + len(evicted.gzipped or b"")
+        return entry
+
+    def gzipped(self, path: Path, entry: CachedFile) -> bytes | None:
+        """The gzip form of entry, or None if it isn't worth compressing."""
+        if len(entry.data) < MIN_GZIP_BYTES or not entry.content_type.startswith(_COMPRESSIBLE):
+            return None
+        if entry.gzipped is None:
+            sibling = path.with_name(path.name + ".gz")
+            try:
+                fresh = sibling.stat().st_mtime_ns >= entry.mtime_ns
+            except FileNotFoundError:
+                fresh = False
+            relative = path.relative_to(self.root).as_posix()
+            packed = sibling.read_bytes() if fresh and relative not in self.inject else None
+            packed = packed or gzip.compress(entry.data, compresslevel=6, mtime=0)
+            with self._lock:
+                entry.gzipped = packed
+                self._bytes += len(packed)
+        return entry.gzipped
+
+
+class LiveReload:
+    """Fan-out of reload events to every connected SSE client."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.generation = 0
+
+    def notify(self) -> None:
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+
+    def wait(self, generation: int, timeout: float) -> int:
+        """Block until generation moves past the given one (or timeout); return the current one."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+def designs_signature(outputs_path: Path) -> tuple:
+    """What the watcher compares: every batch's manifest mtime and designs/ listing."""
+    signature = []
+    try:
+        with os.scandir(outputs_path) as entries:
+            batches = sorted(e.path for e in entries if e.is_dir() and not e.name.startswith("."))
+    except FileNotFoundError:
+        return ()
+    for batch in batches:
+        try:
+            manifest = os.stat(os.path.join(batch, "manifest.json")).st_mtime_ns
+            with os.scandir(os.path.join(batch, "designs")) as entries:
+                listing = tuple(sorted((e.name, e.stat().st_mtime_ns) for e in entries if e.name.endswith(".html")))
+        except FileNotFoundError:
+            continue
+        signature.append((batch, manifest, listing))
+    return tuple(signature)
+
+
+def watch_designs(outputs_path: Path, rebuild: Callable[[], None], reload: LiveReload,
+                  stop: threading.Event, interval: float = 1.0) -> None:
+    """Poll outputs/ and, when designs or manifests change, rebuild and notify clients."""
+    last = designs_signature(outputs_path)
+    while not stop.wait(interval):
+        current = designs_signature(outputs_path)
+        if current == last:
+            continue
+        # Let a burst of writes (a batch finishing) settle before rebuilding.
+        time.sleep(interval / 2)
+        last = designs_signature(outputs_path)
+        try:
+            rebuild()
+        except Exception as err:  # keep serving; the next change retries
+            console.print(f"[red]Rebuild failed: {err}[/red]")
+            continue
+        reload.notify()
+        console.print("[green]Designs changed; reloaded connected viewers[/green]")
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """(first, last) byte of a single-range header; None if it can't be satisfied."""
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, end
+
+
+class DesignRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD from a FileStore, with conditional requests, gzip, ranges and /__events."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY,
+    # keep-alive clients wait on delayed ACKs (~40 ms) for every response.
+    disable_nagle_algorithm = True
+    server_version = "DesignVibes"
+    store: FileStore
+    reload: LiveReload
+    redirects: dict[str, str] = {}
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head: bool = False):
+        path = urlsplit(self.path).path
+        if path == EVENTS_PATH:
+            self._events()
+            return
+
+        target = self.redirects.get(path.lstrip("/"))
+        if target:
+            self.send_response(HTTPStatus.FOUND)
+            self.send_header("Location", "/" + target)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        # A rebuild can delete the file between any of these stats and reads.
+        try:
+            file_path = self.store.resolve(path)
+            entry = self.store.get(file_path) if file_path is not None else None
+            packed = None
+            if entry is not None and "gzip" in self.headers.get("Accept-Encoding", ""):
+                packed = self.store.gzipped(file_path, entry)
+        except FileNotFoundError:
+            entry = None
+        if entry is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        # Strong ETags identify exact bytes, so the gzip form gets its own.
+        etag = entry.etag[:-1] + '-gz"' if packed is not None else entry.etag
+        body = packed if packed is not None else entry.data
+
+        status = HTTPStatus.OK
+        headers = {}
+        if etag in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+            status, body = HTTPStatus.NOT_MODIFIED, b""
+        elif packed is None and "Range" in self.headers and self.headers.get("If-Range", etag) == etag:
+            span = parse_range(self.headers["Range"], len(body))
+            if span is None:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            first, last = span
+            headers["Content-Range"] = f"bytes {first}-{last}/{len(body)}"
+            status, body = HTTPStatus.PARTIAL_CONTENT, body[first:last + 1]
+
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable"
+                         if _HASHED_NAME_RE.search(file_path.name) else "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", entry.content_type)
+            self.send_header("Accept-Ranges", "bytes")
+            if packed is not None:
+                self.send_header("Content-Encoding", "gzip")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _events(self):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+        generation = self.reload.generation
+        try:
+            self.wfile.write(b"retry: 2000\n\n")
+            self.wfile.flush()
+            while True:
+                current = self.reload.wait(generation, HEARTBEAT_SECONDS)
+                if current != generation:
+                    generation = current
+                    self.wfile.write(b"event: reload\ndata: {}\n\n")
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DesignServer(ThreadingHTTPServer):
+    """One thread per connection; a deeper accept backlog for bursts of parallel fetches."""
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def load_redirects(root: Path) -> dict[str, str]:
+    """build-site's redirects.json (stable outputs/ path -> hashed path), if root has one."""
+    path = root / "redirects.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def make_server(root: Path, host: str = "127.0.0.1", port: int = 8000, live_reload: bool = True,
+                max_bytes: int = DEFAULT_CACHE_BYTES, quiet: bool = True) -> DesignServer:
+    """A threaded server for root; handler state lives on a per-server handler class."""
+    store = FileStore(root, max_bytes, {"index.html": LIVE_RELOAD_SNIPPET} if live_reload else None)
+    handler = type("Handler", (DesignRequestHandler,), {
+        "store": store,
+        "reload": LiveReload(),
+        "redirects": load_redirects(root),
+        "quiet": quiet,
+    })
+    return DesignServer((host, port), handler)
+
+
+def serve(root: Path, outputs_path: Path, rebuild: Callable[[], None] | None, host: str = "127.0.0.1",
+          port: int = 8000, quiet: bool = True) -> None:
+    """Serve root until interrupted; with rebuild, watch outputs_path and live-reload viewers."""
+    server = make_server(root, host, port, live_reload=rebuild is not None, quiet=quiet)
+    handler = server.RequestHandlerClass
+    stop = threading.Event()
+
+    if rebuild is not None:
+        def rebuild_and_refresh():
+            rebuild()
+            handler.redirects = load_redirects(root)
+        threading.Thread(target=watch_designs, args=(outputs_path, rebuild_and_refresh, handler.reload, stop),
+                         daemon=True).start()
+
+    console.print(f"[bold]Serving {root.resolve()} at http://{host}:{server.server_address[1]}/[/bold]")
+    if rebuild is not None:
+        console.print(f"[dim]Watching {outputs_path}/ for new designs (Ctrl+C to stop)[/dim]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\nStopped")
+    finally:
+        stop.set()
+        server.server_close()
@@ -0,0 +1,302 @@
+# ABOUTME: "Similar designs": one feature vector per design from its manifest dimensions and page tokens.
+# ABOUTME: Top-k neighbours come from vectorized NumPy searches over a matrix cached in outputs/.cache/.
+
+import io
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from .cache import CACHE_DIR_NAME
+from .dimensions import ALL_DIMENSIONS
+from .utils import atomic_write_bytes, content_hash
+
+console = Console()
+
+# Bump whenever feature_vector() changes, so cached vectors are recomputed.
+SIMILAR_VERSION = 2
+SIMILAR_CACHE_NAME = "similar.npz"
+
+# Neighbours kept per design; the viewer shows the first VIEWER_NEIGHBOURS.
+NEIGHBOURS = 12
+VIEWER_NEIGHBOURS = 8
+
+# Rows of the similarity matrix computed at once (bounds memory to BLOCK x designs).
+BLOCK = 1024
+
+# One-hot columns: every (dimension, value) pair in dimensions.py, in order.
+DIMENSION_COLUMNS = {(d.name, value): i for i, (d, value) in
+                     enumerate((d, v) for d in ALL_DIMENSIONS for v in d.values)}
+
+FONT_CLASSES = ("sans-serif", "serif", "monospace", "cursive", "fantasy", "system-ui")
+
+# How much each block of features counts; each block is scaled to unit
+# length first, so these are the blocks' relative say in the cosine.
+WEIGHTS = {"dimensions": 1.0, "palette": 0.8, "shape": 0.4, "fonts": 0.5}
+
+# Color roles: (words in the token name, words that rule it out, fallback Lab).
+_ROLES = (
+    (("background", "bg"), (), (100.0, 0.0, 0.0)),
+    (("text", "foreground", "fg"), ("muted", "secondary", "light", "dim"), (13.0, 0.0, 0.0)),
+    (("primary",), (), None),
+    (("accent",), (), None),
+)
+
+
+# Dimension one-hots, Lab of each role plus the palette's mean and spread,
+# median/max radius and spacing, heading and body font classes.
+FEATURE_WIDTH = len(DIMENSION_COLUMNS) + 3 * (len(_ROLES) + 2) + 4 + 2 * len(FONT_CLASSES)
+
+
+def _find(named: dict, words: tuple[str, ...], exclude: tuple[str, ...] = ()):
+    for name, value in named.items():
+        if any(w in name for w in words) and not any(w in name for w in exclude):
+            return value
+    return None
+
+
+def _log_scale(values: list[float], center: float) -> list[float]:
+    """Median and max of some px values on a log scale, 0 at center; 0s when there are none."""
+    if not values:
+        return [0.0, 0.0]
+    ordered = sorted(min(max(v, 0.0), 999.0) for v in values)
+    median = ordered[len(ordered) // 2]
+    return [math.log2((median + 1) / (center + 1)) / 4, math.log2((ordered[-1] + 1) / (center + 1)) / 4]
+
+
+def _unit(block: list[float]) -> np.ndarray:
+    vector = np.asarray(block, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def feature_vector(design: dict, tokens: dict) -> np.ndarray:
+    """A design's features: dimension one-hots, Lab palette, radius/spacing scale and font classes.
+
+    Every feature uses fixed scales (no corpus statistics), so a design's
+    vector depends only on that design and cached vectors stay valid as
+    the corpus grows.
+    """
+    dimensions = np.zeros(len(DIMENSION_COLUMNS), dtype=np.float32)
+    for name, value in design.get("dimensions", {}).items():
+        column = DIMENSION_COLUMNS.get((name, str(value)))
+        if column is not None:
+            dimensions[column] = 1.0
+
+    colors = {name: color["lab"] for name, color in tokens["colors"].items() if color["alpha"] >= 0.5}
+    labs = np.asarray(list(colors.values()) or [[50.0, 0.0, 0.0]], dtype=np.float32)
+    palette: list[float] = []
+    for words, exclude, fallback in _ROLES:
+        lab = _find(colors, words, exclude) or fallback or labs.mean(axis=0)
+        palette += [(lab[0] - 50) / 50, lab[1] / 64, lab[2] / 64]
+    palette += [*((labs.mean(axis=0) - (50, 0, 0)) / (50, 64, 64)), *(labs.std(axis=0) / (50, 64, 64))]
+
+    lengths = tokens["lengths"].values()
+    shape = (_log_scale([l["px"] for l in lengths if l["kind"] == "radius"], 6)
+             + _log_scale([l["px"] for l in lengths if l["kind"] == "spacing"], 16))
+
+    fonts = np.zeros(2 * len(FONT_CLASSES), dtype=np.float32)
+    first = next(iter(tokens["fonts"].values()), None)
+    heading = _find(tokens["fonts"], ("head", "display", "title")) or first
+    body = _find(tokens["fonts"], ("body", "base", "text")) or heading
+    for offset, font in ((0, heading), (len(FONT_CLASSES), body)):
+        if font and font["generic"] in FONT_CLASSES:
+            fonts[offset + FONT_CLASSES.index(font["generic"])] = 1.0
+
+    return np.concatenate([
+        WEIGHTS["dimensions"] * _unit(dimensions),
+        WEIGHTS["palette"] * _unit(palette),
+        WEIGHTS["shape"] * _unit(shape),
+        WEIGHTS["fonts"] * _unit(fonts),
+    ]).astype(np.float32)
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Per row, the columns of the k highest scores (best first) and those scores."""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k] if k else np.empty((len(scores), 0), dtype=np.intp)
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def _pad(columns: np.ndarray, scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Pad neighbour lists to k entries with -1 / -inf (corpora smaller than k + 1)."""
+    missing = k - columns.shape[1]
+    if missing <= 0:
+        return columns.astype(np.int32), scores.astype(np.float32)
+    rows = len(columns)
+    return (np.hstack([columns, np.full((rows, missing), -1)]).astype(np.int32),
+            np.hstack([scores, np.full((rows, missing), -np.inf)]).astype(np.float32))
+
+
+@dataclass
+class SimilarIndex:
+    """Feature matrix plus each design's precomputed cosine neighbours (row positions)."""
+    keys: list[str]
+    vectors: np.ndarray
+    neighbours: np.ndarray
+    scores: np.ndarray
+    computed: int = 0     # feature vectors (re)computed this run
+    refreshed: int = 0    # neighbour lists searched from scratch this run
+
+    def query(self, row: int, limit: int, metric: str = "cosine") -> list[tuple[int, float]]:
+        """The limit designs nearest to row as (position, score) pairs, nearest first.
+
+        Cosine scores are similarities (higher is closer); L2 scores are
+        distances between the raw feature vectors (lower is closer).
+        """
+        if metric == "l2":
+            distances = np.sqrt(np.maximum(((self.vectors - self.vectors[row]) ** 2).sum(axis=1), 0))
+            scores = -distances
+        else:
+            matrix = _normalized(self.vectors)
+            scores = matrix @ matrix[row]
+        scores[row] = -np.inf
+        columns, found = _top_k(scores[None, :], limit)
+        sign = -1 if metric == "l2" else 1
+        return [(int(c), sign * float(s)) for c, s in zip(columns[0], found[0]) if np.isfinite(s)]
+
+    def viewer_lists(self, count: int = VIEWER_NEIGHBOURS) -> list[list[list[int]]]:
+        """Per design, [[position, similarity percent], ...] for the static viewer."""
+        lists = []
+        for columns, scores in zip(self.neighbours[:, :count].tolist(), self.scores[:, :count].tolist()):
+            lists.append([[c, round(max(s, 0) * 100)] for c, s in zip(columns, scores) if c >= 0])
+        return lists
+
+    def save(self, path: Path, signatures: list[str]) -> None:
+        buffer = io.BytesIO()
+        np.savez(buffer, meta=np.array(json.dumps({"version": SIMILAR_VERSION, "columns": _columns_hash(),
+                                                   "neighbours": NEIGHBOURS})),
+                 keys=np.array(self.keys), signatures=np.array(signatures), vectors=self.vectors,
+                 neighbours=self.neighbours, scores=self.scores)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, buffer.getvalue())
+
+
+def _columns_hash() -> str:
+    return content_hash(json.dumps(list(DIMENSION_COLUMNS)).encode())[:16]
+
+
+def _load_cache(path: Path) -> dict | None:
+    try:
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta != {"version": SIMILAR_VERSION, "columns": _columns_hash(), "neighbours": NEIGHBOURS}:
+                return None
+            return {name: data[name] for name in ("keys", "signatures", "vectors", "neighbours", "scores")}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _search(matrix: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Full cosine top-k for some rows of a row-normalized matrix, in blocks."""
+    columns = np.empty((len(rows), NEIGHBOURS), dtype=np.int32)
+    scores = np.empty((len(rows), NEIGHBOURS), dtype=np.float32)
+    for start in range(0, len(rows), BLOCK):
+        block = rows[start:start + BLOCK]
+        similarity = matrix[block] @ matrix.T
+        similarity[np.arange(len(block)), block] = -np.inf
+        found, found_scores = _pad(*_top_k(similarity, NEIGHBOURS), NEIGHBOURS)
+        # Self and padding slots score -inf; in tiny corpora top-k still picks them.
+        found[~np.isfinite(found_scores)] = -1
+        columns[start:start + len(block)] = found
+        scores[start:start + len(block)] = found_scores
+    return columns, scores
+
+
+def build_similar_index(outputs_path: Path, designs: list[dict], tokens: list[dict]) -> SimilarIndex:
+    """Update (incrementally) and save the similarity index for designs; tokens[i] belongs to designs[i].
+
+    Vectors are reused for designs whose dimensions and tokens are
+    unchanged. An unchanged design's neighbour list is merged with its
+    similarities to the new or changed designs only, which gives the exact
+    top-k unless one of its old neighbours changed or disappeared; those
+    lists, and those of new designs, are searched against the whole matrix.
+    """
+    path = outputs_path / CACHE_DIR_NAME / SIMILAR_CACHE_NAME
+    keys = [f"{d['batch']}/{d['id']}" for d in designs]
+    signatures = [content_hash(json.dumps([d.get("dimensions", {}), found], sort_keys=True).encode())[:16]
+                  for d, found in zip(designs, tokens)]
+
+    cached = _load_cache(path)
+    old_rows = {key: row for row, key in enumerate(cached["keys"].tolist())} if cached is not None else {}
+
+    size = len(designs)
+    kept = np.zeros(size, dtype=bool)            # same design, same features as in the cache
+    old_of = np.full(size, -1, dtype=np.int64)   # its row in the cached matrix
+    for position, (key, signature) in enumerate(zip(keys, signatures)):
+        row = old_rows.get(key)
+        if row is not None and cached["signatures"][row] == signature:
+            kept[position] = True
+            old_of[position] = row
+
+    vectors = np.zeros((size, FEATURE_WIDTH), dtype=np.float32)
+    if kept.any():
+        vectors[kept] = cached["vectors"][old_of[kept]]
+    changed = np.flatnonzero(~kept)
+    for position in changed:
+        vectors[position] = feature_vector(designs[position], tokens[position])
+
+    matrix = _normalized(vectors)
+    neighbours = np.full((size, NEIGHBOURS), -1, dtype=np.int32)
+    scores = np.full((size, NEIGHBOURS), -np.inf, dtype=np.float32)
+    refresh = changed
+
+    if cached is not None and kept.any():
+        # Old rows -> new positions; -1 for designs that changed or are gone.
+        new_of = np.full(len(cached["keys"]) + 1, -1, dtype=np.int64)
+        new_of[old_of[kept]] = np.flatnonzero(kept)
+        rows = np.flatnonzero(kept)
+        old_lists = cached["neighbours"][old_of[rows]]
+        mapped = np.where(old_lists >= 0, new_of[old_lists], -1)
+        # A list is only reusable if every real neighbour in it is still kept.
+        intact = ((mapped >= 0) | (old_lists < 0)).all(axis=1)
+        merge = rows[intact]
+        if len(merge):
+            extra = (matrix[merge] @ matrix[changed].T if len(changed)
+                     else np.empty((len(merge), 0), dtype=np.float32))
+            candidates = np.hstack([mapped[intact], np.broadcast_to(changed, extra.shape)])
+            candidate_scores = np.hstack([cached["scores"][old_of[merge]], extra])
+            candidate_scores[candidates < 0] = -np.inf
+            picked, picked_scores = _top_k(candidate_scores, NEIGHBOURS)
+            neighbours[merge] = np.take_along_axis(candidates, picked, axis=1)
+            scores[merge] = picked_scores
+            neighbours[merge] = np.where(np.isfinite(scores[merge]), neighbours[merge], -1)
+        refresh = np.concatenate([changed, rows[~intact]])
+
+    if len(refresh):
+        neighbours[refresh], scores[refresh] = _search(matrix, refresh)
+
+    index = SimilarIndex(keys, vectors, neighbours, scores, computed=len(changed), refreshed=len(refresh))
+    index.save(path, signatures)
+    return index
+
+
+def show_similar(index: SimilarIndex, designs: list[dict], row: int, results: list[tuple[int, float]],
+                 metric: str) -> None:
+    target = designs[row]
+    table = Table(title=f"Designs like {target['name']} ({target['batch']}/{target['id']})")
+    table.add_column("#", justify="right", style="dim")
+    table.add_column("Design", style="cyan")
+    table.add_column("Batch / ID")
+    table.add_column("Similarity" if metric == "cosine" else "Distance", justify="right")
+    table.add_column("Shared dimensions", justify="right", style="dim")
+    wanted = target.get("dimensions", {})
+    for rank, (position, score) in enumerate(results, 1):
+        design = designs[position]
+        shared = sum(1 for name, value in design.get("dimensions", {}).items() if wanted.get(name) == value)
+        table.add_row(str(rank), design["name"], f"{design['batch']}/{design['id']}",
+                      f"{score:.3f}", f"{shared}/{len(wanted)}")
+    console.print(table)
+    console.print(f"[dim]{index.computed} feature vectors computed, "
+                  f"{index.refreshed} neighbour lists searched in full[/dim]")
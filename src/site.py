@@ -0,0 +1,263 @@
+# ABOUTME: Builds the publishable dist/ tree: content-hashed designs and data, plus .gz/.br siblings.
+# ABOUTME: Designs are minified on the way; unchanged designs are neither re-read nor recompressed.
+
+import gzip
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from .cache import CACHE_DIR_NAME, FileCache
+from .cards import build_cards
+from .catalog import HASHED_DESIGN_PATH, HASH_LENGTH, SiteWriter, write_catalog
+from .fulltext import index_designs
+from .minify import MINIFY_VERSION, minify_html
+from .similar import build_similar_index
+from .tokens import collect_tokens
+from .utils import atomic_write_bytes, content_hash, ensure_dir, parallel_map, write_if_changed
+from .viewer import DEFAULT_PRELOAD, collect_all_designs, generate_viewer_html
+
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz siblings are written
+    brotli = None
+
+console = Console()
+
+# Bump when the bytes published for a design would change (e.g. new transforms).
+SITE_CACHE_VERSION = 2
+
+# Pages copied to dist/ under their own names.
+STATIC_PAGES = ("about.html",)
+
+# Files smaller than this are not worth compressing.
+MIN_COMPRESS_BYTES = 256
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def _publish_design(job: tuple[str, str, str, str, bool]) -> tuple[str, str, int, int, int]:
+    """Worker: (optionally) minify a design and write it into dist under its hashed name.
+
+    Returns (source sha256, published hash, size, mtime_ns, published size).
+    """
+    source_str, dist_str, batch, design_id, minify = job
+    source = Path(source_str)
+    stat = source.stat()
+    data = source.read_bytes()
+    digest = content_hash(data)
+    if minify:
+        data = minify_html(data.decode("utf-8", errors="replace")).encode("utf-8")
+    published = content_hash(data)[:HASH_LENGTH]
+    target = Path(dist_str) / HASHED_DESIGN_PATH.format(batch=batch, id=design_id, hash=published)
+    if not target.exists():
+        ensure_dir(target.parent)
+        atomic_write_bytes(target, data)
+    return digest, published, stat.st_size, stat.st_mtime_ns, len(data)
+
+
+def _compress(job: tuple[str, bool, bool]) -> tuple[int, int, int]:
+    """Worker: write .gz (and .br) siblings; returns (raw, gzip, brotli) sizes."""
+    path_str, want_gz, want_br = job
+    path = Path(path_str)
+    data = path.read_bytes()
+    gz_size = br_size = 0
+    if want_gz:
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        atomic_write_bytes(path.with_name(path.name + ".gz"), packed)
+        gz_size = len(packed)
+    if want_br:
+        packed = brotli.compress(data, quality=11)
+        atomic_write_bytes(path.with_name(path.name + ".br"), packed)
+        br_size = len(packed)
+    return len(data), gz_size, br_size
+
+
+def _stale_sibling(path: Path, suffix: str) -> bool:
+    sibling = path.with_name(path.name + suffix)
+    try:
+        return sibling.stat().st_mtime_ns < path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+@dataclass
+class SiteBuild:
+    """Summary of a build-site run."""
+    designs: int = 0
+    designs_published: int = 0
+    compressed: int = 0
+    removed: int = 0
+    raw_bytes: int = 0
+    gzip_bytes: int = 0
+    brotli_bytes: int = 0
+    files: set[str] = field(default_factory=set)
+    # Batch name -> [source bytes, published bytes] of its designs.
+    batch_bytes: dict[str, list[int]] = field(default_factory=dict)
+
+
+def build_site(outputs_path: Path, dist_path: Path, workers: int | None = None,
+               preload: int = DEFAULT_PRELOAD, minify: bool = True) -> SiteBuild | None:
+    """Write only the publishable files to dist_path.
+
+    Designs and data files get content-hashed names so they can be cached
+    forever; index.html (whose inlined catalog lists the hashed names) and
+    static pages keep theirs. redirects.json maps each design's stable
+    outputs/ path to its hashed one. Designs are minified unless
+    minify=False. Source hashes and published hashes are cached in
+    outputs/.cache/site.json, and compressed siblings are only rewritten
+    when missing or older than their file.
+    """
+    designs = collect_all_designs(outputs_path)
+    if not designs:
+        return None
+
+    result = SiteBuild(designs=len(designs))
+    ensure_dir(dist_path)
+    cache = FileCache(outputs_path / CACHE_DIR_NAME / "site.json", version=SITE_CACHE_VERSION)
+    # Cached published copies are only reused if made with the same minifier.
+    mode = MINIFY_VERSION if minify else 0
+
+    published: dict[int, dict] = {}
+    pending = []
+    for position, design in enumerate(designs):
+        key = design["path"].removeprefix("outputs/")
+        source = outputs_path / key
+        entry = cache.lookup(key, os.stat(source))
+        if entry and entry["results"].get("minify") == mode:
+            target = dist_path / HASHED_DESIGN_PATH.format(
+                batch=design["batch"], id=design["id"], hash=entry["results"]["hash"])
+            if target.exists():
+                published[position] = {**entry["results"], "source": entry["size"]}
+                continue
+        pending.append((position, key, (str(source), str(dist_path), design["batch"], str(design["id"]), minify)))
+
+    jobs = [job for _, _, job in pending]
+    for (position, key, _), (digest, short, size, mtime_ns, bytes_out) in zip(
+            pending, parallel_map(_publish_design, jobs, workers)):
+        results = {"hash": short, "bytes": bytes_out, "minify": mode}
+        cache.store_signature(key, size, mtime_ns, digest, results)
+        published[position] = {**results, "source": size}
+    result.designs_published = len(pending)
+    cache.prune({d["path"].removeprefix("outputs/") for d in designs})
+    cache.save()
+
+    for position, design in enumerate(designs):
+        sizes = result.batch_bytes.setdefault(design["batch"], [0, 0])
+        sizes[0] += published[position]["source"]
+        sizes[1] += published[position]["bytes"]
+
+    site_designs = [{**design, "hash": published[position]["hash"]} for position, design in enumerate(designs)]
+    redirects = {}
+    for design in site_designs:
+        url = HASHED_DESIGN_PATH.format(batch=design["batch"], id=design["id"], hash=design["hash"])
+        result.files.add(url)
+        redirects[design["path"]] = url
+
+    writer = SiteWriter(dist_path, hashed=True)
+    tokens, _ = collect_tokens(outputs_path, designs, workers)
+    similar = build_similar_index(outputs_path, designs, tokens)
+    catalog = write_catalog(site_designs, writer, index_designs(outputs_path, designs, workers),
+                            build_cards(designs, tokens), similar.viewer_lists())
+    result.files |= writer.urls
+
+    write_if_changed(dist_path / "index.html", generate_viewer_html(catalog["bootstrap"], preload=preload))
+    write_if_changed(dist_path / "redirects.json", json.dumps(redirects, indent=2, sort_keys=True))
+    result.files |= {"index.html", "redirects.json"}
+    for page in STATIC_PAGES:
+        source = outputs_path.parent / page
+        if source.exists():
+            write_if_changed(dist_path / page, source.read_bytes())
+            result.files.add(page)
+
+    _compress_all(dist_path, result, workers)
+    result.removed = _remove_stale(dist_path, result.files)
+    return result
+
+
+def _compress_all(dist_path: Path, result: SiteBuild, workers: int | None) -> None:
+    jobs = []
+    for url in sorted(result.files):
+        path = dist_path / url
+        if path.stat().st_size < MIN_COMPRESS_BYTES:
+            continue
+        want_gz = _stale_sibling(path, ".gz")
+        want_br = brotli is not None and _stale_sibling(path, ".br")
+        if want_gz or want_br:
+            jobs.append((str(path), want_gz, want_br))
+    result.compressed = sum(1 for _ in parallel_map(_compress, jobs, workers))
+
+    for url in list(result.files):
+        path = dist_path / url
+        result.raw_bytes += path.stat().st_size
+        for suffix in COMPRESSED_SUFFIXES:
+            sibling = path.with_name(path.name + suffix)
+            if sibling.exists() and (suffix != ".br" or brotli is not None):
+                result.files.add(url + suffix)
+                if suffix == ".gz":
+                    result.gzip_bytes += sibling.stat().st_size
+                else:
+                    result.brotli_bytes += sibling.stat().st_size
+
+
+def _remove_stale(dist_path: Path, live: set[str]) -> int:
+    """Delete files from earlier builds (old hashed names, their siblings)."""
+    removed = 0
+    for path in sorted(dist_path.rglob("*"), reverse=True):
+        if path.is_dir():
+            if not any(path.iterdir()):
+                path.rmdir()
+            continue
+        if path.relative_to(dist_path).as_posix() not in live:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def clean_site(dist_path: Path) -> None:
+    """Remove a dist tree entirely."""
+    if dist_path.exists():
+        shutil.rmtree(dist_path)
+
+
+def show_size_budget(result: SiteBuild) -> None:
+    """Display design bytes before and after publishing, per batch and in total."""
+    table = Table(title="Design size budget")
+    table.add_column("Batch")
+    table.add_column("Source", justify="right")
+    table.add_column("Published", justify="right")
+    table.add_column("Saved", justify="right", style="green")
+
+    def add(label: str, before: int, after: int, **kwargs) -> None:
+        saved = f"{100 * (1 - after / before):.1f}%" if before else "-"
+        table.add_row(label, f"{before / 1024:,.0f} KB", f"{after / 1024:,.0f} KB", saved, **kwargs)
+
+    for batch, (before, after) in sorted(result.batch_bytes.items()):
+        add(batch, before, after)
+    table.add_section()
+    add("Total", sum(b for b, _ in result.batch_bytes.values()),
+        sum(a for _, a in result.batch_bytes.values()), style="bold")
+    console.print(table)
+
+
+def show_site_report(result: SiteBuild, dist_path: Path) -> None:
+    """Display what build-site produced."""
+    table = Table(show_header=False, box=None)
+    table.add_column("Label", style="dim")
+    table.add_column("Value", justify="right")
+    table.add_row("Designs", str(result.designs))
+    table.add_row("  new or changed", f"[green]{result.designs_published}[/green]")
+    table.add_row("Files compressed", str(result.compressed))
+    table.add_row("Stale files removed", str(result.removed))
+    table.add_row("Published size", f"{result.raw_bytes / 1024 / 1024:.1f} MB")
+    if result.raw_bytes:
+        table.add_row("  gzip", f"{result.gzip_bytes / 1024 / 1024:.1f} MB")
+        if brotli is not None:
+            table.add_row("  brotli", f"{result.brotli_bytes / 1024 / 1024:.1f} MB")
+    console.print(f"\n[bold]{dist_path}/[/bold]")
+    console.print(table)
+    if brotli is None:
+        console.print("[dim]brotli is not installed; only .gz siblings were written[/dim]")
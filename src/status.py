@@ -55,7 +55,9 @@ def show_status(path: str) -> None:
         failures = json.loads(failures_path.read_text())
 
     failed_ids = {f["id"] for f in failures}
-    pending = total - len(completed) - len(staging) - len(failed_ids)
+    # Designs that failed promotion stay in .staging/; count them once, as failed
+    staging -= failed_ids
+    pending = total - len(completed | staging | failed_ids)
 
     # Display summary
     console.print(f"\n[bold blue]1000 Design Vibes[/bold blue] - Status\n")
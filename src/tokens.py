@@ -0,0 +1,462 @@
+# ABOUTME: Design token engine: parses each design's :root custom properties and font declarations.
+# ABOUTME: Normalizes colors to RGB/Lab and lengths to px, and stores the corpus in a columnar token DB.
+
+import ast
+import json
+import operator
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from .cache import CACHE_DIR_NAME, cached_map
+from .utils import write_if_changed
+
+console = Console()
+
+# Bump when extraction or normalization changes so cached tokens are redone.
+TOKENS_VERSION = 3
+TOKEN_DB_VERSION = 2
+TOKEN_DB_NAME = "tokens-db.json"
+
+# Lengths in rem/em are resolved against the browser default font size.
+ROOT_FONT_PX = 16.0
+
+LENGTH_KINDS = ("size", "spacing", "radius")
+
+_STYLE_BLOCK_RE = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"/\*[\s\S]*?(?:\*/|\Z)")
+_ROOT_RE = re.compile(r"(?:^|[},;\s]):root\s*\{([^{}]*)\}")
+_DECLARATION_RE = re.compile(r"(--[\w-]+)\s*:\s*([^;]+)")
+_FONT_FAMILY_RE = re.compile(r"font-family\s*:\s*([^;}]+)", re.IGNORECASE)
+_VAR_RE = re.compile(r"var\(\s*(--[\w-]+)\s*(?:,\s*([^()]*(?:\([^()]*\)[^()]*)*))?\)")
+
+_HEX_RE = re.compile(r"#([0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})")
+_FUNCTION_COLOR_RE = re.compile(r"(rgba?|hsla?)\(\s*([^()]*)\)", re.IGNORECASE)
+_LENGTH_RE = re.compile(r"(-?\d*\.?\d+)(px|rem|em|pt)\b")
+_CALC_RE = re.compile(r"calc\(", re.IGNORECASE)
+
+GENERIC_FAMILIES = ("serif", "sans-serif", "monospace", "cursive", "fantasy", "system-ui")
+
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+    "blue": (0, 0, 255), "yellow": (255, 255, 0), "orange": (255, 165, 0), "purple": (128, 0, 128),
+    "gray": (128, 128, 128), "grey": (128, 128, 128), "silver": (192, 192, 192), "navy": (0, 0, 128),
+    "teal": (0, 128, 128), "maroon": (128, 0, 0), "olive": (128, 128, 0), "lime": (0, 255, 0),
+    "aqua": (0, 255, 255), "cyan": (0, 255, 255), "fuchsia": (255, 0, 255), "magenta": (255, 0, 255),
+    "gold": (255, 215, 0), "crimson": (220, 20, 60), "coral": (255, 127, 80), "ivory": (255, 255, 240),
+    "beige": (245, 245, 220), "tan": (210, 180, 140), "salmon": (250, 128, 114), "pink": (255, 192, 203),
+    "indigo": (75, 0, 130), "violet": (238, 130, 238), "khaki": (240, 230, 140), "linen": (250, 240, 230),
+}
+
+_SIZE_WORDS = ("font-size", "text-", "size", "fs-", "type-", "scale", "heading", "display")
+_SPACING_WORDS = ("space", "spacing", "gap", "gutter", "pad", "margin", "inset", "unit")
+_RADIUS_WORDS = ("radius", "rounded", "corner")
+_SKIPPED_FONT_WORDS = ("size", "weight", "height", "leading", "tracking", "spacing")
+
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+def resolve_vars(value: str, props: dict[str, str], depth: int = 0) -> str:
+    """Substitute var(--x) references (with fallbacks) up to a few levels deep."""
+    if depth > 5 or "var(" not in value:
+        return value
+
+    def substitute(match: re.Match) -> str:
+        target = props.get(match.group(1))
+        if target is None:
+            return match.group(2) or ""
+        return resolve_vars(target, props, depth + 1)
+    return _VAR_RE.sub(substitute, value)
+
+
+def _channel(text: str, scale: float) -> float:
+    text = text.strip()
+    if text.endswith("%"):
+        return float(text[:-1]) / 100 * scale
+    return float(text)
+
+
+def _hsl_to_rgb(h: float, s: float, lightness: float) -> tuple[float, float, float]:
+    s, lightness = s / 100, lightness / 100
+    chroma = (1 - abs(2 * lightness - 1)) * s
+
+    def f(n: int) -> float:
+        k = (n + h / 30) % 12
+        return 255 * (lightness - chroma / 2 * max(-1, min(k - 3, 9 - k, 1)))
+    return f(0), f(8), f(4)
+
+
+def parse_color(value: str) -> tuple[tuple[float, float, float], float] | None:
+    """((r, g, b) in 0-255, alpha in 0-1) for hex, rgb(), hsl() and common named colors."""
+    value = value.strip()
+    lowered = value.lower()
+    if lowered in NAMED_COLORS:
+        return tuple(float(c) for c in NAMED_COLORS[lowered]), 1.0
+    if lowered == "transparent":
+        return (0.0, 0.0, 0.0), 0.0
+
+    match = _HEX_RE.fullmatch(value)
+    if match:
+        digits = match.group(1)
+        if len(digits) <= 4:
+            digits = "".join(c * 2 for c in digits)
+        channels = [int(digits[i:i + 2], 16) for i in range(0, len(digits), 2)]
+        alpha = channels[3] / 255 if len(channels) == 4 else 1.0
+        return (float(channels[0]), float(channels[1]), float(channels[2])), alpha
+
+    match = _FUNCTION_COLOR_RE.fullmatch(value)
+    if not match:
+        return None
+    parts = [p for p in re.split(r"[\s,/]+", match.group(2).strip()) if p]
+    if len(parts) not in (3, 4):
+        return None
+    try:
+        alpha = _channel(parts[3], 1.0) if len(parts) == 4 else 1.0
+        if match.group(1).lower().startswith("rgb"):
+            rgb = tuple(_channel(p, 255.0) for p in parts[:3])
+        else:
+            rgb = _hsl_to_rgb(float(parts[0].removesuffix("deg")), _channel(parts[1], 100.0), _channel(parts[2], 100.0))
+    except ValueError:
+        return None
+    return tuple(min(255.0, max(0.0, c)) for c in rgb), min(1.0, max(0.0, alpha))
+
+
+def srgb_to_lab(rgb: tuple[float, float, float]) -> tuple[float, float, float]:
+    """CIE L*a*b* (D65) of an sRGB color given in 0-255."""
+    def linear(c: float) -> float:
+        c /= 255
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    r, g, b = (linear(c) for c in rgb)
+    x = (0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047
+    y = 0.2126 * r + 0.7152 * g + 0.0722 * b
+    z = (0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883
+
+    def f(t: float) -> float:
+        return t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116
+    fx, fy, fz = f(x), f(y), f(z)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _evaluate(node: ast.AST) -> float:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_evaluate(node.operand)
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.left), _evaluate(node.right))
+    raise ValueError("unsupported expression")
+
+
+def parse_length(value: str) -> float | None:
+    """A length in px, including calc() over px/rem/em/pt values; None if it isn't one."""
+    value = _CALC_RE.sub("(", value.strip())
+    units = {"px": 1.0, "rem": ROOT_FONT_PX, "em": ROOT_FONT_PX, "pt": 4 / 3}
+    expression = _LENGTH_RE.sub(lambda m: repr(float(m.group(1)) * units[m.group(2)]), value)
+    # Unitless numbers (line heights, weights, z-indexes) aren't lengths; 0 is.
+    if expression == value and value != "0":
+        return None
+    if not re.fullmatch(r"[\d.\s()+\-*/e]+", expression):
+        return None
+    try:
+        return round(_evaluate(ast.parse(expression, mode="eval")), 3)
+    except (SyntaxError, ValueError, ZeroDivisionError, RecursionError):
+        return None
+
+
+def parse_font_stack(value: str) -> list[str]:
+    """Family names of a font-family value, unquoted, in order."""
+    return [f.strip().strip("'\"") for f in value.split(",") if f.strip().strip("'\"")]
+
+
+def generic_family(stack: list[str]) -> str:
+    """The generic family a stack falls back to (sans-serif if it names none)."""
+    for family in reversed(stack):
+        if family.lower() in GENERIC_FAMILIES:
+            return family.lower()
+    return "sans-serif"
+
+
+def _length_kind(name: str) -> str | None:
+    if any(word in name for word in _RADIUS_WORDS):
+        return "radius"
+    if any(word in name for word in _SPACING_WORDS):
+        return "spacing"
+    if any(word in name for word in _SIZE_WORDS):
+        return "size"
+    return None
+
+
+def _hex(rgb: tuple[float, float, float]) -> str:
+    return "#" + "".join(f"{round(c):02x}" for c in rgb)
+
+
+def page_css(html: str) -> tuple[str, dict[str, str]]:
+    """A page's <style> CSS without comments, and the custom properties declared on :root.
+
+    The first :root declaration of a property wins over later ones (e.g. a
+    dark-mode override).
+    """
+    css = _COMMENT_RE.sub("", "\n".join(_STYLE_BLOCK_RE.findall(html)))
+    props: dict[str, str] = {}
+    for block in _ROOT_RE.findall(css):
+        for name, value in _DECLARATION_RE.findall(block):
+            props.setdefault(name, value.strip())
+    return css, props
+
+
+def extract_tokens(html: str) -> dict:
+    """Normalized design tokens declared on :root, plus the families used anywhere.
+
+    Returns a JSON-ready dict:
+      colors:  {prop: {"hex", "rgb", "alpha", "lab"}}
+      fonts:   {prop: {"stack", "generic"}}
+      lengths: {prop: {"kind": size|spacing|radius, "px", "unit": declared unit, px/rem/em/pt}}
+      shadows: {prop: value}
+      families: font families named by font-family declarations, in first-use order
+    Properties keep declaration order (see page_css).
+    """
+    css, props = page_css(html)
+    tokens: dict = {"colors": {}, "fonts": {}, "lengths": {}, "shadows": {}, "families": []}
+    for name, raw in props.items():
+        value = resolve_vars(raw, props).strip()
+        lowered = name.lower()
+        color = parse_color(value)
+        if color:
+            rgb, alpha = color
+            tokens["colors"][name] = {
+                "hex": _hex(rgb),
+                "rgb": [round(c, 2) for c in rgb],
+                "alpha": round(alpha, 3),
+                "lab": [round(c, 2) for c in srgb_to_lab(rgb)],
+            }
+        elif "shadow" in lowered:
+            tokens["shadows"][name] = value
+        elif "font" in lowered and not any(word in lowered for word in _SKIPPED_FONT_WORDS) \
+                and parse_length(value) is None:
+            stack = parse_font_stack(value)
+            if stack:
+                tokens["fonts"][name] = {"stack": stack, "generic": generic_family(stack)}
+        else:
+            kind = _length_kind(lowered)
+            px = parse_length(value) if kind else None
+            if px is not None:
+                unit = _LENGTH_RE.search(value)
+                tokens["lengths"][name] = {"kind": kind, "px": px, "unit": unit.group(2) if unit else "px"}
+
+    families: dict[str, None] = {}
+    for declaration in _FONT_FAMILY_RE.findall(css):
+        for family in parse_font_stack(resolve_vars(declaration, props)):
+            if family.lower() not in GENERIC_FAMILIES and not family.lower().startswith(("inherit", "var(")):
+                families.setdefault(family, None)
+    tokens["families"] = list(families)
+    return tokens
+
+
+def collect_tokens(outputs_path: Path, designs: list[dict], workers: int | None = None) -> tuple[list[dict], int]:
+    """Tokens for every design, in catalog order.
+
+    Cached per batch in <batch>/.cache/tokens.json (see cached_map), so only
+    new or edited pages are read. Returns (per-design tokens, number of pages
+    extracted).
+    """
+    return cached_map(outputs_path, designs, extract_tokens, "tokens", TOKENS_VERSION, workers)
+
+
+@dataclass
+class TokenDB:
+    """Columnar store of every design's tokens.
+
+    Each table is a dict of equal-length columns with one row per token;
+    "design" is the row of the design in designs (batch, id), and token
+    names are codes into names. Columns load straight into arrays for
+    corpus-wide math, and for_design() rebuilds one design's tokens.
+    """
+    designs: list[tuple[str, int]] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    colors: dict[str, list] = field(default_factory=lambda: _columns(
+        "design", "name", "r", "g", "b", "alpha", "lab_l", "lab_a", "lab_b"))
+    fonts: dict[str, list] = field(default_factory=lambda: _columns("design", "name", "stack", "generic"))
+    lengths: dict[str, list] = field(default_factory=lambda: _columns("design", "name", "kind", "px", "unit"))
+    shadows: dict[str, list] = field(default_factory=lambda: _columns("design", "name", "value"))
+    families: dict[str, list] = field(default_factory=lambda: _columns("design", "family"))
+
+    TABLES = ("colors", "fonts", "lengths", "shadows", "families")
+
+    @classmethod
+    def build(cls, designs: list[dict], tokens: list[dict]) -> "TokenDB":
+        db = cls(designs=[(d["batch"], d["id"]) for d in designs])
+        codes: dict[str, int] = {}
+
+        def code(name: str) -> int:
+            return codes.setdefault(name, len(codes))
+
+        for row, found in enumerate(tokens):
+            for name, color in found["colors"].items():
+                _append(db.colors, design=row, name=code(name), r=color["rgb"][0], g=color["rgb"][1],
+                        b=color["rgb"][2], alpha=color["alpha"], lab_l=color["lab"][0],
+                        lab_a=color["lab"][1], lab_b=color["lab"][2])
+            for name, font in found["fonts"].items():
+                _append(db.fonts, design=row, name=code(name), stack=", ".join(font["stack"]),
+                        generic=font["generic"])
+            for name, length in found["lengths"].items():
+                _append(db.lengths, design=row, name=code(name), kind=length["kind"], px=length["px"],
+                        unit=length["unit"])
+            for name, value in found["shadows"].items():
+                _append(db.shadows, design=row, name=code(name), value=value)
+            for family in found["families"]:
+                _append(db.families, design=row, family=family)
+        db.names = list(codes)
+        return db
+
+    def for_design(self, row: int) -> dict:
+        """One design's tokens in the shape extract_tokens returns."""
+        found: dict = {"colors": {}, "fonts": {}, "lengths": {}, "shadows": {}, "families": []}
+        for i in _rows(self.colors, row):
+            c = self.colors
+            rgb = [c["r"][i], c["g"][i], c["b"][i]]
+            found["colors"][self.names[c["name"][i]]] = {
+                "hex": _hex(rgb), "rgb": rgb, "alpha": c["alpha"][i],
+                "lab": [c["lab_l"][i], c["lab_a"][i], c["lab_b"][i]],
+            }
+        for i in _rows(self.fonts, row):
+            stack = self.fonts["stack"][i].split(", ")
+            found["fonts"][self.names[self.fonts["name"][i]]] = {"stack": stack, "generic": self.fonts["generic"][i]}
+        for i in _rows(self.lengths, row):
+            found["lengths"][self.names[self.lengths["name"][i]]] = {
+                "kind": self.lengths["kind"][i], "px": self.lengths["px"][i], "unit": self.lengths["unit"][i]}
+        for i in _rows(self.shadows, row):
+            found["shadows"][self.names[self.shadows["name"][i]]] = self.shadows["value"][i]
+        found["families"] = [self.families["family"][i] for i in _rows(self.families, row)]
+        return found
+
+    def row_of(self, batch: str, design_id: int) -> int | None:
+        try:
+            return self.designs.index((batch, design_id))
+        except ValueError:
+            return None
+
+    def to_json(self) -> str:
+        tables = {name: getattr(self, name) for name in self.TABLES}
+        return json.dumps({"version": TOKEN_DB_VERSION, "designs": [list(d) for d in self.designs],
+                           "names": self.names, "tables": tables}, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Path) -> "TokenDB | None":
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != TOKEN_DB_VERSION:
+            return None
+        return cls(designs=[tuple(d) for d in data["designs"]], names=data["names"], **data["tables"])
+
+
+def _columns(*names: str) -> dict[str, list]:
+    return {name: [] for name in names}
+
+
+def _append(table: dict[str, list], **values) -> None:
+    for name, value in values.items():
+        table[name].append(value)
+
+
+def _rows(table: dict[str, list], row: int) -> range:
+    """Rows of one design; tables are built in design order, so they are contiguous."""
+    designs = table["design"]
+    lo, hi = 0, len(designs)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if designs[mid] < row:
+            lo = mid + 1
+        else:
+            hi = mid
+    end = lo
+    while end < len(designs) and designs[end] == row:
+        end += 1
+    return range(lo, end)
+
+
+_DESIGN_REF_RE = re.compile(r"(?:.*/)?(?P<batch>[^/]+)/(?:designs/)?(?:design-)?(?P<id>\d+)(?:\.html)?")
+
+
+def find_design(designs: list[dict], ref: str) -> int | None:
+    """Position of a design given as BATCH/ID (or a path to its page) in designs.
+
+    BATCH may be the whole folder name or its ending, so the-250/64 finds
+    2026-01-08-the-250/64. Raises ValueError if an ending matches more than
+    one batch.
+    """
+    m = _DESIGN_REF_RE.fullmatch(ref.strip().rstrip("/"))
+    if m is None:
+        return None
+    batch, design_id = m.group("batch"), int(m.group("id"))
+    exact = next((i for i, d in enumerate(designs) if d["batch"] == batch and d["id"] == design_id), None)
+    if exact is not None:
+        return exact
+    matches = [i for i, d in enumerate(designs) if d["batch"].endswith(f"-{batch}") and d["id"] == design_id]
+    if len(matches) > 1:
+        batches = ", ".join(sorted(designs[i]["batch"] for i in matches))
+        raise ValueError(f"{batch}/{design_id} is ambiguous: it matches {batches}")
+    return matches[0] if matches else None
+
+
+@dataclass
+class TokenBuild:
+    """What a token database update did."""
+    db: TokenDB
+    extracted: int
+    written: bool
+
+
+def build_token_db(outputs_path: Path, designs: list[dict], workers: int | None = None) -> TokenBuild:
+    """Extract (incrementally) every design's tokens and write outputs/.cache/tokens-db.json."""
+    tokens, extracted = collect_tokens(outputs_path, designs, workers)
+    db = TokenDB.build(designs, tokens)
+    written = write_if_changed(outputs_path / CACHE_DIR_NAME / TOKEN_DB_NAME, db.to_json())
+    return TokenBuild(db, extracted, written)
+
+
+def show_token_summary(build: TokenBuild) -> None:
+    """Corpus-wide token counts and the most used families."""
+    db = build.db
+    table = Table(title=f"Design tokens ({len(db.designs)} designs)")
+    table.add_column("Table")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Per design", justify="right")
+    for name in TokenDB.TABLES:
+        rows = len(getattr(db, name)["design"])
+        table.add_row(name, f"{rows:,}", f"{rows / max(1, len(db.designs)):.1f}")
+    console.print(table)
+
+    generics = Counter(db.fonts["generic"])
+    families = Counter(db.families["family"])
+    console.print("[bold]Generic families:[/bold] " + ", ".join(f"{g} {n}" for g, n in generics.most_common()))
+    console.print("[bold]Top families:[/bold] " + ", ".join(f"{f} ({n})" for f, n in families.most_common(8)))
+    console.print(f"[dim]{build.extracted} new or changed pages read; database "
+                  f"{'updated' if build.written else 'unchanged'}[/dim]")
+
+
+def show_design_tokens(found: dict, title: str) -> None:
+    """One design's tokens as a table."""
+    table = Table(title=title)
+    table.add_column("Token", style="cyan")
+    table.add_column("Value")
+    table.add_column("Normalized", style="dim")
+    for name, color in found["colors"].items():
+        lab = ", ".join(f"{c:.1f}" for c in color["lab"])
+        table.add_row(name, f"[{color['hex']}]██[/] {color['hex']}", f"Lab({lab}) α{color['alpha']:g}")
+    for name, font in found["fonts"].items():
+        table.add_row(name, ", ".join(font["stack"]), font["generic"])
+    for name, length in found["lengths"].items():
+        table.add_row(name, f"{length['px']:g}px", length["kind"])
+    for name, value in found["shadows"].items():
+        table.add_row(name, value, "shadow")
+    console.print(table)
+    if found["families"]:
+        console.print("[bold]Families used:[/bold] " + ", ".join(found["families"]))
@@ -1,10 +1,89 @@
 # ABOUTME: Shared utility functions.
 # ABOUTME: Common helpers used across multiple modules.
 
+import hashlib
+import os
+import stat
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 def ensure_dir(path: Path) -> Path:
     """Ensure a directory exists, creating it if necessary."""
     path.mkdir(parents=True, exist_ok=True)
     return path
+
+
+def content_hash(data: bytes) -> str:
+    """Return the hex SHA-256 digest used to identify file contents."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write a file via temp file + fsync + rename so readers never see a partial file.
+
+    An existing file's permissions are kept; new files get 0644.
+    """
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Text wrapper around atomic_write_bytes (UTF-8)."""
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def write_if_changed(path: Path, data: str | bytes) -> bool:
+    """Atomically write data unless the file already holds it; True if written.
+
+    Keeps mtimes (and anything keyed on them) stable across rebuilds.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    atomic_write_bytes(path, data)
+    return True
+
+
+def parallel_map(fn: Callable[[T], R], items: Iterable[T], workers: int | None = None,
+                 min_parallel: int = 8) -> Iterator[R]:
+    """Map fn over items on a process pool, yielding results in input order.
+
+    fn must be a module-level function so it can be pickled. Small inputs and
+    workers=1 run serially in-process, avoiding pool start-up cost.
+    """
+    items = list(items)
+    if workers == 1 or len(items) < min_parallel:
+        for item in items:
+            yield fn(item)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fn, items, chunksize=chunksize)
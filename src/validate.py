@@ -1,13 +1,24 @@
 # ABOUTME: Validates design HTML files for common issues.
-# ABOUTME: Checks for unclosed CSS comments, HTML comments in style blocks, and other problems.
+# ABOUTME: Checks CSS comments, brace/string balance, undefined custom properties, and other problems.
 
+import difflib
+import json
+import os
 import re
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from dataclasses import dataclass
+from typing import Callable, Iterator
 
 from rich.console import Console
 from rich.table import Table
 
+from .cache import CACHE_DIR_NAME, FileCache
+from .utils import atomic_write_bytes, atomic_write_text, content_hash, ensure_dir, parallel_map
+
 console = Console()
 
 
@@ -19,12 +30,13 @@ class ValidationIssue:
     description: str
     line: int | None = None
     fixable: bool = True
+    severity: str = "error"
+    rule: str = ""
 
 
-def validate_css_comments(content: str, filename: str) -> list[ValidationIssue]:
-    """Check for CSS comment issues inside style blocks."""
+def validate_css_comments(lines: list[str], filename: str) -> list[ValidationIssue]:
+    """Check for CSS comment issues inside style blocks, given the file's lines."""
     issues = []
-    lines = content.split('\n')
 
     # Find the style block
     style_start = None
@@ -81,51 +93,423 @@ def validate_css_comments(content: str, filename: str) -> list[ValidationIssue]:
     return issues
 
 
-def validate_design(file_path: Path) -> list[ValidationIssue]:
-    """Validate a single design file and return any issues found."""
+# Significant CSS tokens. Everything between matches is skipped in one regex
+# step, so a stylesheet is scanned in a single linear pass.
+_CSS_TOKEN_RE = re.compile(r"/\*|[\"'{}]|var\(\s*(--[\w-]+)\s*(,?)")
+_CSS_STRING_BODY = {
+    '"': re.compile(r'[^"\\\n]*(?:\\[\s\S][^"\\\n]*)*'),
+    "'": re.compile(r"[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*"),
+}
+_STYLE_BLOCK_RE = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.IGNORECASE | re.DOTALL)
+
+# Custom properties can be declared in any stylesheet rule, in inline style
+# attributes, or from script via setProperty(). Kept as two patterns: a single
+# alternation defeats the regex engine's literal prefix search and is ~5x slower.
+_CUSTOM_PROPERTY_DEF_RE = re.compile(r"(--[\w-]+)\s*:")
+_SET_PROPERTY_RE = re.compile(r"""setProperty\(\s*['"](--[\w-]+)""")
+
+
+@dataclass
+class CssScan:
+    """Structural facts gathered by lex_css for one stylesheet."""
+    unclosed_braces: list[int]
+    stray_braces: list[int]
+    unterminated_strings: list[int]
+    unterminated_comment: int | None
+    var_uses: list[tuple[str, int]]
+
+
+def lex_css(css: str, base: int = 0) -> CssScan:
+    """Scan a stylesheet for braces, strings, comments and var() references.
+
+    Offsets in the result are absolute (css offset + base). Comments and
+    strings are skipped so braces inside them are not counted. var() uses
+    with a fallback value are not recorded since they cannot be undefined.
+    """
+    open_braces: list[int] = []
+    stray: list[int] = []
+    strings: list[int] = []
+    comment = None
+    var_uses: list[tuple[str, int]] = []
+    pos = 0
+    length = len(css)
+
+    while True:
+        m = _CSS_TOKEN_RE.search(css, pos)
+        if not m:
+            break
+        token = m.group(0)
+        start = m.start()
+
+        if token == "/*":
+            end = css.find("*/", m.end())
+            if end == -1:
+                comment = base + start
+                break
+            pos = end + 2
+        elif token in ('"', "'"):
+            end = _CSS_STRING_BODY[token].match(css, m.end()).end()
+            if end < length and css[end] == token:
+                pos = end + 1
+            else:
+                strings.append(base + start)
+                pos = end
+        elif token == "{":
+            open_braces.append(base + start)
+            pos = m.end()
+        elif token == "}":
+            if open_braces:
+                open_braces.pop()
+            else:
+                stray.append(base + start)
+            pos = m.end()
+        else:
+            if not m.group(2):
+                var_uses.append((m.group(1), base + start))
+            pos = m.end()
+
+    return CssScan(open_braces, stray, strings, comment, var_uses)
+
+
+def _line_at(content: str, offset: int) -> int:
+    return content.count("\n", 0, offset) + 1
+
+
+def scan_style_blocks(content: str) -> list[CssScan]:
+    """Lex every <style> block in a document."""
+    return [lex_css(block.group(1), block.start(1)) for block in _STYLE_BLOCK_RE.finditer(content)]
+
+
+def validate_css_structure(content: str, filename: str,
+                           scans: list[CssScan] | None = None) -> list[ValidationIssue]:
+    """Check every <style> block for unbalanced braces and unterminated strings and comments."""
     issues = []
-    content = file_path.read_text()
-    filename = file_path.name
+    if scans is None:
+        scans = scan_style_blocks(content)
+
+    for scan in scans:
+        if scan.unterminated_comment is not None:
+            issues.append(ValidationIssue(
+                file=filename,
+                issue_type="unterminated_css_comment",
+                description="CSS comment /* is never closed in its <style> block",
+                line=_line_at(content, scan.unterminated_comment),
+                fixable=False
+            ))
+
+        if scan.unterminated_strings:
+            issues.append(ValidationIssue(
+                file=filename,
+                issue_type="unterminated_css_string",
+                description=f"{len(scan.unterminated_strings)} CSS string(s) not closed before end of line",
+                line=_line_at(content, scan.unterminated_strings[0]),
+                fixable=False
+            ))
+
+        if scan.unclosed_braces or scan.stray_braces:
+            first = min(scan.unclosed_braces[:1] + scan.stray_braces[:1])
+            issues.append(ValidationIssue(
+                file=filename,
+                issue_type="unbalanced_css_braces",
+                description=(f"{len(scan.unclosed_braces)} unclosed '{{' and "
+                             f"{len(scan.stray_braces)} unmatched '}}' in <style> block"),
+                line=_line_at(content, first),
+                fixable=False
+            ))
 
-    # Basic structure checks
-    if '<!DOCTYPE html>' not in content:
+    return issues
+
+
+def validate_custom_properties(content: str, filename: str,
+                               scans: list[CssScan] | None = None) -> list[ValidationIssue]:
+    """Check var() references against the custom properties the document declares."""
+    if scans is None:
+        scans = scan_style_blocks(content)
+    var_uses = [use for scan in scans for use in scan.var_uses]
+    if not var_uses:
+        return []
+
+    defined = set(_CUSTOM_PROPERTY_DEF_RE.findall(content))
+    if 'setProperty' in content:
+        defined.update(_SET_PROPERTY_RE.findall(content))
+
+    issues = []
+    reported = set()
+    for name, offset in var_uses:
+        if name in defined or name in reported:
+            continue
+        reported.add(name)
         issues.append(ValidationIssue(
             file=filename,
+            issue_type="undefined_custom_property",
+            description=f"var({name}) used without a fallback but {name} is never declared",
+            line=_line_at(content, offset),
+            fixable=False
+        ))
+    return issues
+
+
+_SCRIPT_BLOCK_RE = re.compile(r"<script\b[^>]*>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+
+
+class DesignView:
+    """Parsed view of one design file shared by every rule.
+
+    Regions are parsed lazily and at most once, so rules that need the same
+    region (e.g. the lexed stylesheets) do not repeat the work.
+    """
+
+    def __init__(self, filename: str, content: str, size: int):
+        self.filename = filename
+        self.content = content
+        self.size = size
+
+    @cached_property
+    def lines(self) -> list[str]:
+        return self.content.split('\n')
+
+    @cached_property
+    def style_blocks(self) -> list[tuple[int, str]]:
+        """(offset, text) of each <style> block body."""
+        return [(m.start(1), m.group(1)) for m in _STYLE_BLOCK_RE.finditer(self.content)]
+
+    @cached_property
+    def css_scans(self) -> list[CssScan]:
+        return [lex_css(text, offset) for offset, text in self.style_blocks]
+
+    @cached_property
+    def script_blocks(self) -> list[tuple[int, str]]:
+        """(offset, text) of each <script> block body."""
+        return [(m.start(1), m.group(1)) for m in _SCRIPT_BLOCK_RE.finditer(self.content)]
+
+
+# Work done to prepare each region a rule can declare.
+REGION_LOADERS = {
+    "html": lambda view: view.lines,
+    "style": lambda view: view.css_scans,
+    "script": lambda view: view.script_blocks,
+}
+
+SEVERITIES = ("error", "warning")
+
+
+@dataclass
+class Rule:
+    """A registered validation check.
+
+    Bump version whenever the check's logic changes: the validation cache
+    then re-runs only this rule on otherwise unchanged files. fix, when set,
+    rewrites a document's text and returns (new_text, fix descriptions).
+    """
+    name: str
+    check: Callable[[DesignView], list[ValidationIssue]]
+    regions: tuple[str, ...] = ("html",)
+    severity: str = "error"
+    version: int = 1
+    fix: Callable[[str], tuple[str, list[str]]] | None = None
+    description: str = ""
+
+    @property
+    def fixable(self) -> bool:
+        return self.fix is not None
+
+
+# Rules run in registration order.
+RULES: dict[str, Rule] = {}
+
+
+def register_rule(name: str, regions: tuple[str, ...] = ("html",), severity: str = "error",
+                  version: int = 1, fix: Callable[[str], tuple[str, list[str]]] | None = None):
+    """Decorator registering a check function as a validation rule."""
+    unknown = set(regions) - set(REGION_LOADERS)
+    if unknown:
+        raise ValueError(f"Unknown regions for rule {name}: {', '.join(sorted(unknown))}")
+    if severity not in SEVERITIES:
+        raise ValueError(f"Unknown severity for rule {name}: {severity}")
+
+    def decorator(check: Callable[[DesignView], list[ValidationIssue]]):
+        doc = (check.__doc__ or "").strip()
+        RULES[name] = Rule(name, check, tuple(regions), severity, version, fix,
+                           doc.splitlines()[0] if doc else "")
+        return check
+    return decorator
+
+
+def select_rules(only: list[str] | None = None, skip: list[str] | None = None) -> list[Rule]:
+    """Return the enabled rules, in registration order."""
+    requested = set(only or []) | set(skip or [])
+    unknown = requested - set(RULES)
+    if unknown:
+        raise ValueError(f"Unknown rule(s): {', '.join(sorted(unknown))}. "
+                         f"Available: {', '.join(RULES)}")
+    return [rule for name, rule in RULES.items()
+            if (not only or name in only) and name not in (skip or [])]
+
+
+@dataclass
+class RuleStats:
+    """Accumulated timing for one rule or region parse."""
+    files: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+
+
+class RuleProfile:
+    """Per-rule wall time and hit counts across a validation run."""
+
+    def __init__(self):
+        self.stats: dict[str, RuleStats] = defaultdict(RuleStats)
+
+    def record(self, name: str, seconds: float, hits: int = 0) -> None:
+        stats = self.stats[name]
+        stats.files += 1
+        stats.hits += hits
+        stats.seconds += seconds
+
+
+def run_rules(view: DesignView, rules: list[Rule],
+              profile: RuleProfile | None = None) -> dict[str, list[ValidationIssue]]:
+    """Run rules over a view and return their issues keyed by rule name."""
+    regions = []
+    for rule in rules:
+        for region in rule.regions:
+            if region not in regions:
+                regions.append(region)
+
+    for region in regions:
+        start = time.perf_counter()
+        REGION_LOADERS[region](view)
+        if profile is not None:
+            profile.record(f"parse:{region}", time.perf_counter() - start)
+
+    results = {}
+    for rule in rules:
+        start = time.perf_counter()
+        issues = rule.check(view)
+        elapsed = time.perf_counter() - start
+        for issue in issues:
+            issue.severity = rule.severity
+            issue.rule = rule.name
+        if profile is not None:
+            profile.record(rule.name, elapsed, len(issues))
+        results[rule.name] = issues
+    return results
+
+
+@register_rule("structure", regions=("html",))
+def check_structure(view: DesignView) -> list[ValidationIssue]:
+    """Document has a doctype and a <style> block."""
+    issues = []
+
+    if '<!DOCTYPE html>' not in view.content:
+        issues.append(ValidationIssue(
+            file=view.filename,
             issue_type="missing_doctype",
             description="Missing <!DOCTYPE html> declaration",
             fixable=False
         ))
 
-    if '<style' not in content:
+    if '<style' not in view.content:
         issues.append(ValidationIssue(
-            file=filename,
+            file=view.filename,
             issue_type="missing_style",
             description="Missing <style> block",
             fixable=False
         ))
 
-    # File size check
-    size = file_path.stat().st_size
-    if size < 10000:
-        issues.append(ValidationIssue(
-            file=filename,
+    return issues
+
+
+@register_rule("file_size", regions=(), severity="warning")
+def check_file_size(view: DesignView) -> list[ValidationIssue]:
+    """File is large enough to be a complete showcase."""
+    if view.size < 10000:
+        return [ValidationIssue(
+            file=view.filename,
             issue_type="too_small",
-            description=f"File size {size} bytes is below 10KB minimum",
+            description=f"File size {view.size} bytes is below 10KB minimum",
             fixable=False
-        ))
+        )]
+    return []
 
-    # CSS comment checks
-    issues.extend(validate_css_comments(content, filename))
 
-    return issues
+@register_rule("css_comments", regions=("html",), fix=lambda text: fix_css_comments_text(text))
+def check_css_comments(view: DesignView) -> list[ValidationIssue]:
+    """Header comments before :root use /* */ and are closed."""
+    return validate_css_comments(view.lines, view.filename)
 
 
-def fix_css_comments(file_path: Path) -> tuple[bool, str]:
+@register_rule("css_structure", regions=("style",))
+def check_css_structure(view: DesignView) -> list[ValidationIssue]:
+    """Stylesheets have balanced braces and terminated strings and comments."""
+    return validate_css_structure(view.content, view.filename, view.css_scans)
+
+
+@register_rule("css_custom_properties", regions=("style",), severity="warning")
+def check_css_custom_properties(view: DesignView) -> list[ValidationIssue]:
+    """Every var() without a fallback refers to a declared custom property."""
+    return validate_custom_properties(view.content, view.filename, view.css_scans)
+
+
+CACHE_VERSION = 3
+
+
+def validate_design(file_path: Path, rules: list[Rule] | None = None,
+                    profile: RuleProfile | None = None) -> list[ValidationIssue]:
+    """Validate a single design file and return any issues found."""
+    if rules is None:
+        rules = list(RULES.values())
+    data = file_path.read_bytes()
+    view = DesignView(file_path.name, data.decode("utf-8", errors="replace"), len(data))
+    results = run_rules(view, rules, profile)
+    return [issue for rule in rules for issue in results[rule.name]]
+
+
+def validate_design_cached(file_path: Path, key: str, cache: FileCache,
+                           rules: list[Rule] | None = None,
+                           profile: RuleProfile | None = None) -> tuple[list[ValidationIssue], bool]:
+    """Validate a design, reusing cached results for unchanged files and rules.
+
+    Returns (issues, was_cached). Only rules whose version differs from the
+    cached entry are re-run; cached results for disabled rules are kept.
     """
-    Fix CSS comment issues in a design file.
-    Returns (was_fixed, description).
+    if rules is None:
+        rules = list(RULES.values())
+    stat = file_path.stat()
+    data = None
+    entry = cache.lookup(key, stat)
+    digest = entry["sha256"] if entry else None
+    if entry is None:
+        data = file_path.read_bytes()
+        entry, digest = cache.lookup_content(key, stat, data)
+
+    cached = entry["results"] if entry else {}
+    stale = [rule for rule in rules if cached.get(rule.name, {}).get("version") != rule.version]
+
+    if stale:
+        if data is None:
+            data = file_path.read_bytes()
+        view = DesignView(file_path.name, data.decode("utf-8", errors="replace"), len(data))
+        fresh = run_rules(view, stale, profile)
+        results = {name: result for name, result in cached.items() if name in RULES}
+        for rule in stale:
+            results[rule.name] = {
+                "version": rule.version,
+                "issues": [asdict(issue) for issue in fresh[rule.name]],
+            }
+        entry = cache.store(key, stat, digest, results)
+
+    issues = [ValidationIssue(**issue)
+              for rule in rules
+              for issue in entry["results"][rule.name]["issues"]]
+    return issues, not stale
+
+
+def fix_css_comments_text(content: str) -> tuple[str, list[str]]:
+    """
+    Fix CSS comment issues in a design's text.
+    Returns (new_content, fix descriptions); content is unchanged if no fixes apply.
     """
-    content = file_path.read_text()
     lines = content.split('\n')
     modified = False
     fixes = []
@@ -142,7 +526,7 @@ def fix_css_comments(file_path: Path) -> tuple[bool, str]:
             break
 
     if not style_start or not root_line:
-        return False, "Could not find style block or :root"
+        return content, []
 
     # Fix HTML comments in style block
     for i in range(style_start, root_line):
@@ -172,55 +556,284 @@ def fix_css_comments(file_path: Path) -> tuple[bool, str]:
         fixes.append(f"Line {root_line+1}: Inserted */ to close CSS comment")
 
     if modified:
-        file_path.write_text('\n'.join(lines))
-        return True, '; '.join(fixes)
+        return '\n'.join(lines), fixes
+
+    return content, []
 
+
+def fix_css_comments(file_path: Path) -> tuple[bool, str]:
+    """
+    Fix CSS comment issues in a design file.
+    Returns (was_fixed, description).
+    """
+    content = file_path.read_text()
+    fixed, fixes = fix_css_comments_text(content)
+    if fixes:
+        atomic_write_text(file_path, fixed)
+        return True, '; '.join(fixes)
     return False, "No fixes needed"
 
 
-def validate_batch(batch_path: Path, fix: bool = False) -> dict:
+def apply_fixes(view: DesignView, rules: list[Rule]) -> tuple[str, list[str]]:
+    """Run each fixable rule on a view and chain the fixes of those that found issues.
+
+    Returns (fixed text, fix descriptions); the text is unchanged when nothing applied.
+    """
+    fixable = [rule for rule in rules if rule.fixable]
+    results = run_rules(view, fixable)
+    fixed = view.content
+    fixes = []
+    for rule in fixable:
+        if results[rule.name]:
+            fixed, rule_fixes = rule.fix(fixed)
+            fixes.extend(rule_fixes)
+    if fixed == view.content:
+        return view.content, []
+    return fixed, fixes
+
+
+@dataclass
+class FixResult:
+    """Outcome of fixing one design file. Paths are relative to the batch."""
+    file: str
+    fixes: list[str]
+    before_sha256: str
+    after_sha256: str
+    diff: str = ""
+    applied: bool = False
+    error: str = ""
+
+
+def _fix_file(job: tuple[str, str, tuple[str, ...], str | None]) -> FixResult | None:
+    """Worker: run fixable rules on one file and apply their fixes in memory.
+
+    With a backup_dir the original is saved under its content hash and the
+    fixed text is written atomically; without one a unified diff is returned.
+    Files that aren't valid UTF-8 are left untouched and come back with an error.
+    """
+    path_str, rel, rule_names, backup_dir = job
+    path = Path(path_str)
+    data = path.read_bytes()
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError as e:
+        digest = content_hash(data)
+        return FixResult(rel, [], digest, digest, error=f"not valid UTF-8 (byte {e.start}), left unchanged")
+    fixed, fixes = apply_fixes(DesignView(path.name, content, len(data)),
+                               [RULES[name] for name in rule_names])
+    if not fixes:
+        return None
+
+    after = fixed.encode("utf-8")
+    result = FixResult(rel, fixes, content_hash(data), content_hash(after))
+
+    if backup_dir is None:
+        result.diff = ''.join(difflib.unified_diff(
+            content.splitlines(keepends=True), fixed.splitlines(keepends=True),
+            fromfile=f"a/{path_str}", tofile=f"b/{path_str}",
+        ))
+        return result
+
+    backup = Path(backup_dir) / f"{result.before_sha256}.html"
+    if not backup.exists():
+        atomic_write_bytes(backup, data)
+    atomic_write_bytes(path, after)
+    result.applied = True
+    return result
+
+
+def fix_designs(batch_path: Path, design_files: list[Path], rules: list[Rule],
+                dry_run: bool = False, workers: int | None = None) -> list[FixResult]:
+    """Fix design files in parallel.
+
+    Each file is read once, passed through every applicable rule fixer, and
+    replaced via temp file + fsync + rename, so an interrupted run never
+    leaves a truncated design. Originals are kept in .cache/fix-backups and a
+    report with before/after hashes is written so the run can be rolled back.
+    With dry_run nothing is written and each result carries a unified diff.
+    """
+    backup_dir = None
+    if not dry_run:
+        backup_dir = str(ensure_dir(batch_path / CACHE_DIR_NAME / "fix-backups"))
+    rule_names = tuple(rule.name for rule in rules if rule.fixable)
+    jobs = [(str(f), str(f.relative_to(batch_path)), rule_names, backup_dir) for f in design_files]
+
+    results = [r for r in parallel_map(_fix_file, jobs, workers) if r is not None]
+
+    if any(r.applied for r in results):
+        report_dir = ensure_dir(batch_path / CACHE_DIR_NAME / "fix-reports")
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        report = {
+            "created_at": datetime.now().isoformat(),
+            "fixes": [
+                {k: v for k, v in asdict(r).items() if k not in ("diff", "applied", "error")}
+                for r in results if r.applied
+            ],
+        }
+        atomic_write_text(report_dir / f"{stamp}.json", json.dumps(report, indent=2))
+
+    return results
+
+
+def rollback_fixes(batch_path: Path, report_path: Path | None = None) -> tuple[int, list[str]]:
+    """Restore the originals recorded in a fix report (the latest by default).
+
+    A file is only restored if it still has the content the fix produced.
+    Returns (restored count, skipped file descriptions).
+    """
+    if report_path is None:
+        reports = sorted((batch_path / CACHE_DIR_NAME / "fix-reports").glob("*.json"))
+        if not reports:
+            raise FileNotFoundError(f"No fix reports found in {batch_path}")
+        report_path = reports[-1]
+
+    report = json.loads(report_path.read_text())
+    backup_dir = batch_path / CACHE_DIR_NAME / "fix-backups"
+    restored = 0
+    skipped = []
+
+    for entry in report["fixes"]:
+        path = batch_path / entry["file"]
+        backup = backup_dir / f"{entry['before_sha256']}.html"
+        if not path.exists() or content_hash(path.read_bytes()) != entry["after_sha256"]:
+            skipped.append(f"{entry['file']}: changed since the fix")
+            continue
+        if not backup.exists():
+            skipped.append(f"{entry['file']}: backup missing")
+            continue
+        atomic_write_bytes(path, backup.read_bytes())
+        restored += 1
+
+    report_path.rename(report_path.with_suffix(".rolled-back"))
+    return restored, skipped
+
+
+def find_designs_dir(batch_path: Path) -> Path | None:
+    """Return the folder to validate: designs/, else .staging/, else None.
+
+    An empty designs/ (say, left by an interrupted promote) defers to .staging/.
+    """
+    designs, staging = batch_path / "designs", batch_path / ".staging"
+    if designs.is_dir() and (not staging.is_dir() or any(designs.glob("*.html"))):
+        return designs
+    if staging.is_dir():
+        return staging
+    return None
+
+
+def find_batches(path: Path) -> list[Path]:
+    """Resolve a batch folder, or an outputs folder holding several batches."""
+    if not path.is_dir():
+        raise ValueError(f"Not a folder: {path}")
+    if find_designs_dir(path) is not None:
+        return [path]
+    return sorted(d for d in path.iterdir() if d.is_dir() and find_designs_dir(d) is not None)
+
+
+def iter_validate_batch(batch_path: Path, use_cache: bool = True,
+                        rules: list[Rule] | None = None) -> Iterator[tuple[Path, list[ValidationIssue]]]:
+    """Yield (design file, issues) one file at a time.
+
+    Only the current file's issues are held in memory, so callers can stream
+    results for any number of files.
+    """
+    if rules is None:
+        rules = list(RULES.values())
+    designs_dir = find_designs_dir(batch_path)
+    if designs_dir is None:
+        return
+
+    with os.scandir(designs_dir) as entries:
+        names = sorted(e.name for e in entries if e.name.startswith("design-") and e.name.endswith(".html"))
+    cache = FileCache(batch_path / CACHE_DIR_NAME / "validate.json", version=CACHE_VERSION)
+    prefix = f"{designs_dir.name}/"
+
+    for name in names:
+        design_file = designs_dir / name
+        if use_cache:
+            issues, _ = validate_design_cached(design_file, prefix + name, cache, rules)
+        else:
+            issues = validate_design(design_file, rules)
+        yield design_file, issues
+
+    if use_cache:
+        cache.prune({prefix + name for name in names}, prefix=prefix)
+        cache.save()
+
+
+def validate_batch(batch_path: Path, fix: bool = False, use_cache: bool = True,
+                   rules: list[Rule] | None = None, profile: RuleProfile | None = None,
+                   dry_run: bool = False, patch_path: Path | None = None,
+                   workers: int | None = None) -> dict:
     """
     Validate all designs in a batch.
     Returns dict with results summary.
+
+    Results are cached per batch in .cache/validate.json so unchanged files
+    are not re-read on the next run. rules defaults to every registered rule.
+    With fix, files with fixable issues are fixed in parallel; dry_run prints
+    unified diffs instead and patch_path collects them into a patch file.
     """
-    designs_dir = batch_path / "designs"
-    if not designs_dir.exists():
-        designs_dir = batch_path / ".staging"
+    if rules is None:
+        rules = list(RULES.values())
 
-    if not designs_dir.exists():
+    designs_dir = find_designs_dir(batch_path)
+    if designs_dir is None:
         console.print(f"[red]No designs or staging folder found in {batch_path}[/red]")
         return {"total": 0, "with_issues": 0, "issues": []}
 
-    all_issues = []
-    files_with_issues = set()
-    fixed_count = 0
+    issues_by_file: dict[str, list[ValidationIssue]] = {}
+    fix_candidates = []
+    cached_count = 0
 
     design_files = sorted(designs_dir.glob("design-*.html"))
+    cache = FileCache(batch_path / CACHE_DIR_NAME / "validate.json", version=CACHE_VERSION)
+    prefix = f"{designs_dir.name}/"
+
+    def check(design_file: Path) -> list[ValidationIssue]:
+        nonlocal cached_count
+        if use_cache:
+            issues, was_cached = validate_design_cached(design_file, prefix + design_file.name,
+                                                        cache, rules, profile)
+            cached_count += was_cached
+            return issues
+        return validate_design(design_file, rules, profile)
 
     for design_file in design_files:
-        issues = validate_design(design_file)
-
-        if issues:
-            files_with_issues.add(design_file.name)
-
-            if fix:
-                # Try to fix fixable issues
-                fixable = [i for i in issues if i.fixable]
-                if fixable:
-                    was_fixed, fix_desc = fix_css_comments(design_file)
-                    if was_fixed:
-                        fixed_count += 1
-                        console.print(f"[green]Fixed {design_file.name}:[/green] {fix_desc}")
-                        # Re-validate after fix
-                        issues = validate_design(design_file)
-
-        all_issues.extend(issues)
+        issues = check(design_file)
+        issues_by_file[design_file.name] = issues
+        if fix and any(i.fixable for i in issues):
+            fix_candidates.append(design_file)
+
+    fix_results = []
+    if fix_candidates:
+        fix_results = fix_designs(batch_path, fix_candidates, rules,
+                                  dry_run=dry_run or patch_path is not None, workers=workers)
+        if patch_path is not None:
+            patched = [r for r in fix_results if r.diff]
+            atomic_write_text(patch_path, ''.join(r.diff for r in patched))
+            console.print(f"[green]Wrote patch for {len(patched)} files to {patch_path}[/green]")
+        for result in fix_results:
+            name = Path(result.file).name
+            if result.error:
+                console.print(f"[yellow]Skipped {name}:[/yellow] {result.error}")
+            elif result.applied:
+                console.print(f"[green]Fixed {name}:[/green] {'; '.join(result.fixes)}")
+                # Re-validate after fix
+                issues_by_file[name] = check(designs_dir / name)
+            elif patch_path is None:
+                console.print(result.diff, markup=False, highlight=False, end="")
+
+    if use_cache:
+        cache.prune({prefix + f.name for f in design_files}, prefix=prefix)
+        cache.save()
 
     return {
         "total": len(design_files),
-        "with_issues": len(files_with_issues),
-        "issues": all_issues,
-        "fixed": fixed_count
+        "with_issues": sum(1 for issues in issues_by_file.values() if issues),
+        "issues": [issue for issues in issues_by_file.values() for issue in issues],
+        "fixed": sum(1 for r in fix_results if r.applied),
+        "cached": cached_count
     }
 
 
@@ -228,6 +841,9 @@ def show_validation_report(results: dict) -> None:
     """Display a formatted validation report."""
     issues = results["issues"]
 
+    if results.get("cached"):
+        console.print(f"[dim]Reused cached results for {results['cached']}/{results['total']} files[/dim]")
+
     if not issues:
         console.print(f"\n[green]✓ All {results['total']} designs passed validation[/green]")
         return
@@ -244,11 +860,12 @@ def show_validation_report(results: dict) -> None:
     table = Table(show_header=True, header_style="bold")
     table.add_column("Issue Type", style="cyan")
     table.add_column("Count", justify="right")
+    table.add_column("Severity")
     table.add_column("Fixable", justify="center")
 
     for issue_type, type_issues in sorted(by_type.items()):
         fixable = "✓" if type_issues[0].fixable else "✗"
-        table.add_row(issue_type, str(len(type_issues)), fixable)
+        table.add_row(issue_type, str(len(type_issues)), type_issues[0].severity, fixable)
 
     console.print(table)
 
@@ -264,3 +881,34 @@ def show_validation_report(results: dict) -> None:
             console.print(f"    • {issue.file}{line_info}: {issue.description}")
         if len(type_issues) > 3:
             console.print(f"    ... and {len(type_issues) - 3} more")
+
+
+def show_rule_profile(profile: RuleProfile) -> None:
+    """Display per-rule timing, slowest first."""
+    if not profile.stats:
+        console.print("\n[dim]No rules ran (all results came from the cache; use --no-cache to profile)[/dim]")
+        return
+
+    total = sum(stats.seconds for stats in profile.stats.values())
+
+    table = Table(show_header=True, header_style="bold", title="Rule profile")
+    table.add_column("Rule", style="cyan")
+    table.add_column("Files", justify="right")
+    table.add_column("Hits", justify="right")
+    table.add_column("Total ms", justify="right")
+    table.add_column("Avg µs/file", justify="right")
+    table.add_column("Share", justify="right")
+
+    for name, stats in sorted(profile.stats.items(), key=lambda item: -item[1].seconds):
+        share = stats.seconds / total if total else 0
+        table.add_row(
+            name,
+            str(stats.files),
+            str(stats.hits),
+            f"{stats.seconds * 1000:.1f}",
+            f"{stats.seconds * 1e6 / stats.files:.0f}",
+            f"{share:.0%}",
+        )
+
+    console.print()
+    console.print(table)
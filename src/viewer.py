@@ -1,49 +1,97 @@
 # ABOUTME: Generates unified design viewer for browsing all designs.
-# ABOUTME: Creates all-designs.json and viewer.html for iframe-based slideshow.
+# ABOUTME: Creates all-designs.json, the sharded data/ catalog and index.html for the iframe slideshow.
 
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 
 from rich.console import Console
 
-console = Console()
+from .cache import CACHE_DIR_NAME, FileCache
+from .cards import build_cards
+from .catalog import CATALOG_DIR_NAME, SiteWriter, write_catalog
+from .fulltext import index_designs
+from .similar import build_similar_index
+from .tokens import collect_tokens
+from .utils import content_hash
 
+console = Console()
 
-def collect_all_designs(outputs_path: Path) -> list[dict]:
-    """Collect all designs from all batches into a single list."""
+# Bump when the shape of collected design records changes.
+VIEWER_CACHE_VERSION = 1
+
+# Designs kept loaded in hidden iframes on each side of the current one, and
+# designs beyond those hinted for the browser cache.
+DEFAULT_PRELOAD = 2
+DEFAULT_PREFETCH = 4
+
+
+def _batch_records(batch_name: str, manifest_path: Path, present: set[str]) -> list[dict]:
+    """Design records for one batch, keeping only designs whose file exists."""
+    manifest = json.loads(manifest_path.read_text())
+    records = []
+    for design in manifest.get("designs", []):
+        filename = f"design-{design['id']}.html"
+        if filename in present:
+            records.append({
+                "batch": batch_name,
+                "id": design["id"],
+                "name": design["name"],
+                "tagline": design["tagline"],
+                "path": f"outputs/{batch_name}/designs/{filename}",
+                "dimensions": design.get("dimensions", {})
+            })
+    return records
+
+
+def collect_all_designs(outputs_path: Path, use_cache: bool = True) -> list[dict]:
+    """Collect all designs from all batches into a single list.
+
+    Each batch is keyed by its manifest's stat signature plus a hash of the
+    designs/ listing (one scandir, no per-design stat). Batches whose key is
+    unchanged reuse the records cached in outputs/.cache/viewer.json.
+    """
+    cache = FileCache(outputs_path / CACHE_DIR_NAME / "viewer.json", version=VIEWER_CACHE_VERSION)
     all_designs = []
-
-    for run_dir in sorted(outputs_path.iterdir()):
-        if not run_dir.is_dir():
-            continue
-
-        manifest_path = run_dir / "manifest.json"
-        designs_dir = run_dir / "designs"
-
-        if not manifest_path.exists() or not designs_dir.exists():
+    live = set()
+
+    with os.scandir(outputs_path) as entries:
+        run_dirs = sorted((e for e in entries if e.is_dir() and not e.name.startswith(".")),
+                          key=lambda e: e.name)
+
+    for run_dir in run_dirs:
+        manifest_path = Path(run_dir.path) / "manifest.json"
+        try:
+            manifest_stat = manifest_path.stat()
+            with os.scandir(Path(run_dir.path) / "designs") as entries:
+                present = {e.name for e in entries if e.name.endswith(".html")}
+        except FileNotFoundError:
             continue
 
-        manifest = json.loads(manifest_path.read_text())
         batch_name = run_dir.name
+        live.add(batch_name)
+        listing = content_hash("\n".join(sorted(present)).encode())
+        entry = cache.lookup(batch_name, manifest_stat) if use_cache else None
+        if entry and entry["sha256"] == listing:
+            all_designs.extend(entry["results"]["designs"])
+            continue
 
-        for design in manifest.get("designs", []):
-            design_file = designs_dir / f"design-{design['id']}.html"
-            if design_file.exists():
-                all_designs.append({
-                    "batch": batch_name,
-                    "id": design["id"],
-                    "name": design["name"],
-                    "tagline": design["tagline"],
-                    "path": f"outputs/{batch_name}/designs/design-{design['id']}.html",
-                    "dimensions": design.get("dimensions", {})
-                })
+        records = _batch_records(batch_name, manifest_path, present)
+        cache.store(batch_name, manifest_stat, listing, {"designs": records})
+        all_designs.extend(records)
 
+    cache.prune(live)
+    cache.save()
     return all_designs
 
 
-def generate_viewer_html(designs: list[dict]) -> str:
-    """Generate the viewer HTML page."""
+def generate_viewer_html(bootstrap: dict, preload: int = DEFAULT_PRELOAD, prefetch: int = DEFAULT_PREFETCH) -> str:
+    """Generate the viewer HTML page around the catalog's bootstrap index.
+
+    preload designs on each side are kept warm in hidden iframes; the next
+    prefetch designs beyond those get <link rel=prefetch> hints.
+    """
     return f'''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -226,6 +274,114 @@ def generate_viewer_html(designs: list[dict]) -> str:
             color: var(--text);
         }}
 
+        .similar-content {{
+            padding: 1rem 1.5rem;
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(160px, 1fr));
+            gap: 1rem;
+        }}
+
+        .similar-item {{
+            background: var(--bg);
+            border: 1px solid var(--border);
+            border-radius: 6px;
+            padding: 0.5rem;
+            cursor: pointer;
+        }}
+
+        .similar-item:hover {{
+            border-color: var(--accent);
+        }}
+
+        .similar-item img {{
+            display: block;
+            width: 100%;
+            aspect-ratio: 240 / 150;
+            border-radius: 4px;
+            margin-bottom: 0.4rem;
+        }}
+
+        .search {{
+            position: relative;
+        }}
+
+        .search input {{
+            width: 14rem;
+            background: var(--bg);
+            border: 1px solid var(--border);
+            color: var(--text);
+            padding: 0.4rem 0.75rem;
+            border-radius: 6px;
+            font-family: inherit;
+            font-size: 0.8rem;
+        }}
+
+        .search input:focus {{
+            outline: none;
+            border-color: var(--accent);
+        }}
+
+        .search-results {{
+            display: none;
+            position: absolute;
+            top: calc(100% + 0.25rem);
+            right: 0;
+            width: 24rem;
+            max-height: 60vh;
+            overflow-y: auto;
+            background: var(--surface);
+            border: 1px solid var(--border);
+            border-radius: 6px;
+            z-index: 10;
+            text-align: left;
+        }}
+
+        .search-results.open {{
+            display: block;
+        }}
+
+        .search-result {{
+            padding: 0.5rem 0.75rem;
+            cursor: pointer;
+        }}
+
+        .search-result.highlighted {{
+            background: var(--bg);
+        }}
+
+        .search-result .design-meta {{
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }}
+
+        .search-status {{
+            padding: 0.4rem 0.75rem;
+            font-size: 0.7rem;
+            color: var(--text-muted);
+            border-top: 1px solid var(--border);
+        }}
+
+        .filter-status {{
+            padding: 0.75rem 1.5rem 0;
+            display: flex;
+            align-items: center;
+            gap: 1rem;
+            font-size: 0.8rem;
+            color: var(--text-muted);
+        }}
+
+        .dim-group select {{
+            width: 100%;
+            background: var(--surface);
+            color: var(--text);
+            border: 1px solid var(--border);
+            border-radius: 4px;
+            padding: 0.3rem;
+            font-family: inherit;
+            font-size: 0.8rem;
+        }}
+
         .viewer-container {{
             flex: 1;
             position: relative;
@@ -233,10 +389,105 @@ def generate_viewer_html(designs: list[dict]) -> str:
         }}
 
         iframe {{
+            position: absolute;
+            inset: 0;
             width: 100%;
             height: 100%;
             border: none;
             background: white;
+            visibility: hidden;
+        }}
+
+        /* Only the current design's frame is shown; the rest of the pool
+           preloads neighbours in the background. */
+        iframe.active {{
+            visibility: visible;
+        }}
+
+        /* The design's vibe card stands in while its frame loads. */
+        .poster {{
+            position: absolute;
+            top: 50%;
+            left: 50%;
+            width: min(480px, 80%);
+            transform: translate(-50%, -50%);
+            display: none;
+            border-radius: 8px;
+            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.4);
+        }}
+
+        /* Grid mode replaces the slideshow with a scrolling overview. Only
+           cells near the viewport exist; the spacer gives the scrollbar its
+           full height. */
+        .grid-container {{
+            flex: 1;
+            position: relative;
+            overflow-y: auto;
+            display: none;
+        }}
+
+        body.grid-mode .grid-container {{
+            display: block;
+        }}
+
+        body.grid-mode .viewer-container {{
+            display: none;
+        }}
+
+        .grid-toolbar {{
+            position: sticky;
+            top: 0;
+            z-index: 2;
+            display: flex;
+            align-items: center;
+            gap: 1rem;
+            padding: 0.5rem 1rem;
+            background: var(--bg);
+            font-size: 0.8rem;
+            color: var(--text-muted);
+        }}
+
+        .grid-spacer {{
+            position: relative;
+            margin: 0 1rem 1rem;
+        }}
+
+        .grid-cell {{
+            position: absolute;
+            top: 0;
+            left: 0;
+            width: 240px;
+            height: 150px;
+            overflow: hidden;
+            border: 1px solid var(--border);
+            border-radius: 8px;
+            background: var(--surface);
+            cursor: pointer;
+            contain: strict;
+        }}
+
+        .grid-cell:hover,
+        .grid-cell.current {{
+            border-color: var(--accent);
+        }}
+
+        .grid-cell img {{
+            display: block;
+            width: 100%;
+            height: 100%;
+        }}
+
+        /* Live previews render the page at 960x600 and scale it to the cell. */
+        .grid-cell iframe {{
+            inset: auto;
+            top: 0;
+            left: 0;
+            width: 960px;
+            height: 600px;
+            transform: scale(0.25);
+            transform-origin: 0 0;
+            visibility: visible;
+            pointer-events: none;
         }}
 
         .loading {{
@@ -293,7 +544,7 @@ def generate_viewer_html(designs: list[dict]) -> str:
             <a href="about.html" class="about-link">What the heck is this?</a>
             <div class="nav-controls">
                 <button class="nav-btn" id="prevBtn" title="Previous (←)">← Prev</button>
-                <span class="counter" id="counter">1 / {len(designs)}</span>
+                <span class="counter" id="counter">1 / {bootstrap['total']}</span>
                 <button class="nav-btn" id="nextBtn" title="Next (→)">Next →</button>
             </div>
         </div>
@@ -302,37 +553,668 @@ def generate_viewer_html(designs: list[dict]) -> str:
                 <div class="design-name" id="designName">Loading...</div>
                 <div class="design-meta" id="designMeta"></div>
             </div>
+            <div class="search">
+                <input type="search" id="searchInput" placeholder="Search designs…" autocomplete="off" spellcheck="false">
+                <div class="search-results" id="searchResults"></div>
+            </div>
+            <button class="prompt-toggle" id="gridToggle" title="Grid overview (G)">Grid</button>
+            <button class="prompt-toggle" id="similarToggle" title="Similar designs (S)">Similar</button>
+            <button class="prompt-toggle" id="filterToggle">Filter</button>
             <button class="prompt-toggle" id="promptToggle">Show Prompt</button>
         </div>
     </header>
 
+    <div class="prompt-panel" id="filterPanel">
+        <div class="filter-status">
+            <span id="filterStatus">Loading filters...</span>
+            <button class="prompt-toggle" id="filterClear">Clear</button>
+        </div>
+        <div class="prompt-content" id="filterContent"></div>
+    </div>
+
+    <div class="prompt-panel" id="similarPanel">
+        <div class="similar-content" id="similarContent"></div>
+    </div>
+
     <div class="prompt-panel" id="promptPanel">
         <div class="prompt-content" id="promptContent"></div>
     </div>
 
-    <div class="viewer-container">
+    <div class="viewer-container" id="frames">
         <div class="loading" id="loading">Loading design...</div>
-        <iframe id="viewer" title="Design preview"></iframe>
+        <img class="poster" id="poster" alt="">
+    </div>
+
+    <div class="grid-container" id="grid">
+        <div class="grid-toolbar">
+            <span id="gridStatus"></span>
+            <label><input type="checkbox" id="gridLive"> Live previews</label>
+        </div>
+        <div class="grid-spacer" id="gridSpacer"></div>
     </div>
 
     <div class="keyboard-hint" id="hint">
-        ← → Arrow keys to navigate
+        ← → Arrow keys to navigate · G for the grid · S for similar designs
     </div>
 
     <script>
-        const designs = {json.dumps(designs, indent=2)};
+        // Bootstrap index: counts, batch ranges, dimension dictionaries and shard
+        // URLs. Design records live in fixed-size columnar shards fetched on
+        // demand around the current position.
+        const catalog = {json.dumps(bootstrap, separators=(",", ":"))};
+        const total = catalog.total;
+        const shards = new Map();
+        const cardShards = new Map();
+        const similarShards = new Map();
+
+        // Designs kept loaded in hidden iframes on each side of the current one
+        // (override with ?preload=N), and further ones hinted with rel=prefetch.
+        const params = new URLSearchParams(window.location.search);
+        const PRELOAD = Math.max(0, parseInt(params.get('preload') ?? '{preload}', 10) || 0);
+        const PREFETCH = {prefetch};
+        const pool = new Map();
+        const prefetched = new Set();
 
         let currentIndex = 0;
-        const viewer = document.getElementById('viewer');
+        let loadToken = 0;
+        const frames = document.getElementById('frames');
         const counter = document.getElementById('counter');
         const designName = document.getElementById('designName');
         const designMeta = document.getElementById('designMeta');
         const prevBtn = document.getElementById('prevBtn');
         const nextBtn = document.getElementById('nextBtn');
         const loading = document.getElementById('loading');
+        const poster = document.getElementById('poster');
         const promptToggle = document.getElementById('promptToggle');
         const promptPanel = document.getElementById('promptPanel');
         const promptContent = document.getElementById('promptContent');
+        const similarToggle = document.getElementById('similarToggle');
+        const similarPanel = document.getElementById('similarPanel');
+        const similarContent = document.getElementById('similarContent');
+        const filterToggle = document.getElementById('filterToggle');
+        const filterPanel = document.getElementById('filterPanel');
+        const filterContent = document.getElementById('filterContent');
+        const filterStatus = document.getElementById('filterStatus');
+        const filterClear = document.getElementById('filterClear');
+
+        // Facet filtering. facets[d][v] is the bitset (Uint32Array, bit i =
+        // design position i) of designs whose dimension d has value v.
+        // Filters AND across dimensions; order holds the matching positions
+        // in catalog order, or null when no filter is active.
+        const WORDS = Math.ceil(total / 32);
+        let facets = null;
+        let facetsRequest = null;
+        const selected = new Map();
+        let order = null;
+
+        // Columnar shard -> typed arrays. dims is a base64 row-major matrix of
+        // per-dimension value codes (0 = absent), one row per design.
+        function decodeShard(raw) {{
+            const bytes = Uint8Array.from(atob(raw.dims), c => c.charCodeAt(0));
+            let codes = bytes;
+            if (catalog.codeBytes === 2) {{
+                codes = new Uint16Array(bytes.length / 2);
+                for (let i = 0; i < codes.length; i++) codes[i] = bytes[2 * i] | (bytes[2 * i + 1] << 8);
+            }}
+            return {{
+                batch: Uint16Array.from(raw.batch),
+                id: Uint32Array.from(raw.id),
+                name: raw.name,
+                tagline: raw.tagline,
+                hash: raw.hash,
+                codes,
+            }};
+        }}
+
+        function recordAt(shard, offset) {{
+            const batch = catalog.batches[shard.batch[offset]].name;
+            const id = shard.id[offset];
+            const width = catalog.dimensions.length;
+            const dimensions = {{}};
+            for (let d = 0; d < width; d++) {{
+                const code = shard.codes[offset * width + d];
+                if (code) dimensions[catalog.dimensions[d]] = catalog.values[d][code - 1];
+            }}
+            const path = catalog.pathTemplate
+                .replace('{{batch}}', batch)
+                .replace('{{id}}', id)
+                .replace('{{hash}}', shard.hash ? shard.hash[offset] : '');
+            return {{
+                batch,
+                id,
+                name: shard.name[offset],
+                tagline: shard.tagline[offset],
+                path,
+                dimensions,
+            }};
+        }}
+
+        function loadShard(number) {{
+            if (!shards.has(number)) {{
+                const request = fetch(catalog.shards[number]).then(response => {{
+                    if (!response.ok) throw new Error(`${{catalog.shards[number]}}: ${{response.status}}`);
+                    return response.json();
+                }}).then(decodeShard);
+                // Forget failed fetches so the next navigation retries them.
+                request.catch(() => shards.delete(number));
+                shards.set(number, request);
+            }}
+            return shards.get(number);
+        }}
+
+        // Vibe cards: one JSON array of SVG strings per design shard.
+        function loadCards(number) {{
+            if (!catalog.cards) return Promise.resolve(null);
+            if (!cardShards.has(number)) {{
+                const request = fetch(catalog.cards[number]).then(response => {{
+                    if (!response.ok) throw new Error(`${{catalog.cards[number]}}: ${{response.status}}`);
+                    return response.json();
+                }});
+                request.catch(() => cardShards.delete(number));
+                cardShards.set(number, request);
+            }}
+            return cardShards.get(number);
+        }}
+
+        async function cardFor(index) {{
+            const cards = await loadCards(Math.floor(index / catalog.shardSize));
+            return cards ? 'data:image/svg+xml,' + encodeURIComponent(cards[index % catalog.shardSize]) : null;
+        }}
+
+        // Similar designs: per design shard, one [[position, percent], ...] list per design.
+        function loadSimilar(number) {{
+            if (!catalog.similar) return Promise.resolve(null);
+            if (!similarShards.has(number)) {{
+                const request = fetch(catalog.similar[number]).then(response => {{
+                    if (!response.ok) throw new Error(`${{catalog.similar[number]}}: ${{response.status}}`);
+                    return response.json();
+                }});
+                request.catch(() => similarShards.delete(number));
+                similarShards.set(number, request);
+            }}
+            return similarShards.get(number);
+        }}
+
+        async function renderSimilar(index) {{
+            const lists = await loadSimilar(Math.floor(index / catalog.shardSize));
+            const neighbours = lists ? lists[index % catalog.shardSize] : [];
+            const items = await Promise.all(neighbours.map(async ([position, percent]) => {{
+                const [design, card] = await Promise.all([getDesign(position), cardFor(position).catch(() => null)]);
+                return `
+                    <div class="similar-item" data-position="${{position}}">
+                        ${{card ? `<img src="${{card}}" alt="">` : ''}}
+                        <div class="design-name">${{escapeHtml(design.name)}}</div>
+                        <div class="design-meta">${{escapeHtml(design.batch)}} · #${{design.id}} · ${{percent}}% alike</div>
+                    </div>`;
+            }}));
+            // Navigation moved on while the lists were loading.
+            if (index !== currentIndex) return;
+            similarContent.innerHTML = items.join('') ||
+                '<div class="dim-group"><div class="dim-value" style="color: var(--text-muted)">No similar designs available</div></div>';
+        }}
+
+        function toggleSimilar() {{
+            similarPanel.classList.toggle('open');
+            similarToggle.classList.toggle('active');
+            if (similarPanel.classList.contains('open')) renderSimilar(currentIndex).catch(err => console.error(err));
+        }}
+
+        function base64Bytes(text) {{
+            return Uint8Array.from(atob(text), c => c.charCodeAt(0));
+        }}
+
+        // Gap list: LEB128 varints, each the distance to the previous position minus one.
+        function decodeGaps(bytes) {{
+            const positions = [];
+            let position = -1, value = 0, shift = 0;
+            for (const byte of bytes) {{
+                value |= (byte & 0x7f) << shift;
+                if (byte & 0x80) {{ shift += 7; continue; }}
+                position += value + 1;
+                positions.push(position);
+                value = shift = 0;
+            }}
+            return positions;
+        }}
+
+        function decodeBits(container) {{
+            const bytes = base64Bytes(container.d);
+            const bits = new Uint32Array(WORDS);
+            if (container.k === 'b') {{
+                for (let i = 0; i < bytes.length; i++) bits[i >> 2] |= bytes[i] << ((i & 3) * 8);
+                return bits;
+            }}
+            for (const position of decodeGaps(bytes)) {{
+                bits[position >> 5] |= 1 << (position & 31);
+            }}
+            return bits;
+        }}
+
+        function popcount(bits) {{
+            let count = 0;
+            for (let i = 0; i < bits.length; i++) {{
+                let v = bits[i] - ((bits[i] >>> 1) & 0x55555555);
+                v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+                count += (((v + (v >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+            }}
+            return count;
+        }}
+
+        // AND of every selected dimension's bitset, optionally leaving one out
+        // (used for that dimension's own counts). null means "everything".
+        function intersect(skip) {{
+            let acc = null;
+            for (const [d, v] of selected) {{
+                if (d === skip) continue;
+                const bits = facets[d][v];
+                if (!acc) {{ acc = bits.slice(); continue; }}
+                for (let i = 0; i < WORDS; i++) acc[i] &= bits[i];
+            }}
+            return acc;
+        }}
+
+        function countWith(acc, bits) {{
+            if (!acc) return popcount(bits);
+            let count = 0;
+            for (let i = 0; i < WORDS; i++) {{
+                let v = acc[i] & bits[i];
+                v = v - ((v >>> 1) & 0x55555555);
+                v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+                count += (((v + (v >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+            }}
+            return count;
+        }}
+
+        function positionsOf(bits) {{
+            const positions = new Uint32Array(popcount(bits));
+            let n = 0;
+            for (let w = 0; w < WORDS; w++) {{
+                let word = bits[w];
+                while (word) {{
+                    const low = word & -word;
+                    positions[n++] = w * 32 + 31 - Math.clz32(low);
+                    word ^= low;
+                }}
+            }}
+            return positions;
+        }}
+
+        function loadFacets() {{
+            if (!facetsRequest) {{
+                facetsRequest = fetch(catalog.facets)
+                    .then(response => {{
+                        if (!response.ok) throw new Error(`${{catalog.facets}}: ${{response.status}}`);
+                        return response.json();
+                    }})
+                    .then(raw => {{ facets = raw.map(values => values.map(decodeBits)); }});
+                facetsRequest.catch(() => {{ facetsRequest = null; }});
+            }}
+            return facetsRequest;
+        }}
+
+        function renderFilters() {{
+            filterContent.innerHTML = catalog.dimensions.map((name, d) => {{
+                const base = intersect(d);
+                const options = catalog.values[d].map((value, v) => {{
+                    const count = countWith(base, facets[d][v]);
+                    const chosen = selected.get(d) === v ? ' selected' : '';
+                    const disabled = count === 0 && !chosen ? ' disabled' : '';
+                    return `<option value="${{v}}"${{chosen}}${{disabled}}>${{escapeHtml(value)}} (${{count}})</option>`;
+                }}).join('');
+                return `
+                    <div class="dim-group">
+                        <div class="dim-label">${{escapeHtml(name.replace(/_/g, ' '))}}</div>
+                        <select data-dimension="${{d}}"><option value="">Any</option>${{options}}</select>
+                    </div>`;
+            }}).join('');
+        }}
+
+        function applyFilter() {{
+            const started = performance.now();
+            const acc = intersect(-1);
+            order = acc ? positionsOf(acc) : null;
+            const elapsed = performance.now() - started;
+
+            renderFilters();
+            const matching = order ? order.length : total;
+            filterStatus.textContent = `${{matching}} of ${{total}} designs match · filtered in ${{elapsed.toFixed(2)}} ms`;
+
+            if (gridOpen) layoutGrid();
+            if (order && order.length && rankOf(currentIndex) === -1) {{
+                loadDesign(order[0]);
+            }} else {{
+                loadDesign(currentIndex);
+            }}
+        }}
+
+        // Rank of a position within the active filter (-1 if it does not match).
+        function rankOf(index) {{
+            if (!order) return index;
+            let lo = 0, hi = order.length;
+            while (lo < hi) {{
+                const mid = (lo + hi) >> 1;
+                if (order[mid] < index) lo = mid + 1; else hi = mid;
+            }}
+            return order[lo] === index ? lo : -1;
+        }}
+
+        // The position `delta` steps from index within the active filter, or -1.
+        function step(index, delta) {{
+            if (!order) {{
+                const target = index + delta;
+                return target >= 0 && target < total ? target : -1;
+            }}
+            const rank = rankOf(index);
+            if (rank === -1) return -1;
+            const target = rank + delta;
+            return target >= 0 && target < order.length ? order[target] : -1;
+        }}
+
+        filterToggle.addEventListener('click', async () => {{
+            filterPanel.classList.toggle('open');
+            filterToggle.classList.toggle('active');
+            if (!facets) {{
+                try {{
+                    await loadFacets();
+                    applyFilter();
+                }} catch (err) {{
+                    filterStatus.textContent = 'Could not load filters';
+                    console.error(err);
+                }}
+            }}
+        }});
+
+        filterContent.addEventListener('change', (e) => {{
+            const d = parseInt(e.target.dataset.dimension);
+            if (e.target.value === '') selected.delete(d);
+            else selected.set(d, parseInt(e.target.value));
+            applyFilter();
+        }});
+
+        filterClear.addEventListener('click', () => {{
+            selected.clear();
+            if (facets) applyFilter();
+        }});
+
+        // Type-ahead search over names, taglines, dimension values and batches.
+        // The index (data/search.json) loads on first focus; scoring matches
+        // SearchIndex.query in src/search_index.py.
+        const EXACT = 1.0, PREFIX = 0.7, FUZZY = 0.5, MIN_SIMILARITY = 0.5;
+        const SEARCH_LIMIT = 8;
+        const searchInput = document.getElementById('searchInput');
+        const searchResults = document.getElementById('searchResults');
+        let searchIndex = null;
+        let searchRequest = null;
+        let searchToken = 0;
+        let highlighted = -1;
+
+        function loadSearch() {{
+            if (!searchRequest) {{
+                searchRequest = fetch(catalog.search)
+                    .then(response => {{
+                        if (!response.ok) throw new Error(`${{catalog.search}}: ${{response.status}}`);
+                        return response.json();
+                    }})
+                    .then(raw => {{ searchIndex = {{...raw, decoded: new Map()}}; }});
+                searchRequest.catch(() => {{ searchRequest = null; }});
+            }}
+            return searchRequest;
+        }}
+
+        function tokenize(text) {{
+            return text.toLowerCase().match(/[a-z0-9]+/g) || [];
+        }}
+
+        function trigrams(term) {{
+            const padded = ` ${{term}} `;
+            const grams = new Set();
+            for (let i = 0; i < padded.length - 2; i++) grams.add(padded.slice(i, i + 3));
+            return grams;
+        }}
+
+        function termPostings(termId) {{
+            let postings = searchIndex.decoded.get(termId);
+            if (!postings) {{
+                postings = searchIndex.postings[termId].map(field => decodeGaps(base64Bytes(field)));
+                searchIndex.decoded.set(termId, postings);
+            }}
+            return postings;
+        }}
+
+        function matchingTerms(token) {{
+            const terms = searchIndex.terms;
+            const matches = new Map();
+            let lo = 0, hi = terms.length;
+            while (lo < hi) {{
+                const mid = (lo + hi) >> 1;
+                if (terms[mid] < token) lo = mid + 1; else hi = mid;
+            }}
+            for (let id = lo; id < terms.length && terms[id].startsWith(token); id++) {{
+                matches.set(id, terms[id] === token ? EXACT : PREFIX * (0.5 + 0.5 * token.length / terms[id].length));
+            }}
+            if (!matches.size && token.length >= 3) {{
+                const wanted = trigrams(token);
+                const shared = new Map();
+                for (const gram of wanted) {{
+                    const encoded = searchIndex.trigrams[gram];
+                    if (!encoded) continue;
+                    for (const id of decodeGaps(base64Bytes(encoded))) shared.set(id, (shared.get(id) || 0) + 1);
+                }}
+                for (const [id, count] of shared) {{
+                    const similarity = 2 * count / (wanted.size + trigrams(terms[id]).size);
+                    if (similarity >= MIN_SIMILARITY) matches.set(id, FUZZY * similarity);
+                }}
+            }}
+            return matches;
+        }}
+
+        // Ranked [position, score] pairs for designs matching every token.
+        function search(text, limit) {{
+            let scores = null;
+            for (const token of tokenize(text)) {{
+                const tokenScores = new Map();
+                for (const [id, quality] of matchingTerms(token)) {{
+                    termPostings(id).forEach((positions, field) => {{
+                        const score = quality * searchIndex.weights[field];
+                        for (const position of positions) {{
+                            if (score > (tokenScores.get(position) || 0)) tokenScores.set(position, score);
+                        }}
+                    }});
+                }}
+                if (scores === null) {{
+                    scores = tokenScores;
+                }} else {{
+                    for (const [position, score] of scores) {{
+                        if (tokenScores.has(position)) scores.set(position, score + tokenScores.get(position));
+                        else scores.delete(position);
+                    }}
+                }}
+                if (!scores.size) return [];
+            }}
+            return [...(scores || [])].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit);
+        }}
+
+        // Full-text search over the pages' own text (catalog.fulltext): BM25 with
+        // terms hashed to shards, matching FulltextIndex in src/fulltext.py.
+        const CONTENT_LIMIT = 5;
+        let fulltext = null;
+        let fulltextRequest = null;
+        const fulltextShards = new Map();
+
+        function decodeVarints(bytes) {{
+            const values = [];
+            let value = 0, shift = 0;
+            for (const byte of bytes) {{
+                value |= (byte & 0x7f) << shift;
+                if (byte & 0x80) {{ shift += 7; continue; }}
+                values.push(value);
+                value = shift = 0;
+            }}
+            return values;
+        }}
+
+        function fnv1a(text) {{
+            let hash = 0x811c9dc5;
+            for (const byte of new TextEncoder().encode(text)) {{
+                hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+            }}
+            return hash;
+        }}
+
+        function loadFulltext() {{
+            if (!fulltextRequest) {{
+                fulltextRequest = fetch(catalog.fulltext)
+                    .then(response => {{
+                        if (!response.ok) throw new Error(`${{catalog.fulltext}}: ${{response.status}}`);
+                        return response.json();
+                    }})
+                    .then(meta => {{ fulltext = {{...meta, lengths: decodeVarints(base64Bytes(meta.lengths))}}; }});
+                fulltextRequest.catch(() => {{ fulltextRequest = null; }});
+            }}
+            return fulltextRequest;
+        }}
+
+        function fulltextShard(number) {{
+            if (!fulltextShards.has(number)) {{
+                const url = fulltext.files[number];
+                const request = fetch(url).then(response => {{
+                    if (!response.ok) throw new Error(`${{url}}: ${{response.status}}`);
+                    return response.json();
+                }});
+                request.catch(() => fulltextShards.delete(number));
+                fulltextShards.set(number, request);
+            }}
+            return fulltextShards.get(number);
+        }}
+
+        async function searchContent(text, limit) {{
+            await loadFulltext();
+            const terms = [...new Set(tokenize(text))];
+            const entries = await Promise.all(terms.map(async term => {{
+                const shard = await fulltextShard(fnv1a(term) % fulltext.shards);
+                return shard[term];
+            }}));
+            const scores = new Map();
+            for (const entry of entries) {{
+                if (!entry) continue;
+                const positions = decodeGaps(base64Bytes(entry[0]));
+                const frequencies = decodeVarints(base64Bytes(entry[1]));
+                const idf = Math.log(1 + (fulltext.total - positions.length + 0.5) / (positions.length + 0.5));
+                positions.forEach((position, i) => {{
+                    const tf = frequencies[i];
+                    const norm = fulltext.k1 * (1 - fulltext.b + fulltext.b * fulltext.lengths[position] / (fulltext.avgLength || 1));
+                    scores.set(position, (scores.get(position) || 0) + idf * tf * (fulltext.k1 + 1) / (tf + norm));
+                }});
+            }}
+            return [...scores].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit);
+        }}
+
+        function escapeHtml(text) {{
+            return String(text).replace(/[&<>"]/g, c => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}})[c]);
+        }}
+
+        async function runSearch() {{
+            const token = ++searchToken;
+            const text = searchInput.value.trim();
+            if (!text) {{
+                searchResults.classList.remove('open');
+                return;
+            }}
+            await loadSearch();
+            const started = performance.now();
+            const hits = search(text, SEARCH_LIMIT);
+            const elapsed = performance.now() - started;
+            let contentHits = [];
+            try {{
+                const shown = new Set(hits.map(([position]) => position));
+                contentHits = (await searchContent(text, CONTENT_LIMIT + shown.size))
+                    .filter(([position]) => !shown.has(position))
+                    .slice(0, CONTENT_LIMIT);
+            }} catch (err) {{
+                console.error(err);
+            }}
+            const all = [...hits, ...contentHits];
+            const designs = await Promise.all(all.map(([position]) => getDesign(position)));
+            if (token !== searchToken) return;
+
+            const item = (design, i) => `
+                <div class="search-result${{i === 0 ? ' highlighted' : ''}}" data-position="${{all[i][0]}}">
+                    <div class="design-name">${{escapeHtml(design.name)}}</div>
+                    <div class="design-meta">${{escapeHtml(design.batch)}} · #${{design.id}} · ${{escapeHtml(design.tagline)}}</div>
+                </div>`;
+            highlighted = all.length ? 0 : -1;
+            searchResults.innerHTML =
+                designs.slice(0, hits.length).map(item).join('') +
+                (contentHits.length ? '<div class="search-status">In page content</div>' : '') +
+                designs.slice(hits.length).map((design, i) => item(design, hits.length + i)).join('') +
+                `<div class="search-status">${{all.length ? '' : 'No matches · '}}${{elapsed.toFixed(2)}} ms</div>`;
+            searchResults.classList.add('open');
+        }}
+
+        function clearFilter() {{
+            selected.clear();
+            order = null;
+            if (facets) {{
+                renderFilters();
+                filterStatus.textContent = `${{total}} of ${{total}} designs match`;
+            }}
+        }}
+
+        function openResult(position) {{
+            // Leave an active filter that would hide the chosen design.
+            if (order && rankOf(position) === -1) clearFilter();
+            searchResults.classList.remove('open');
+            searchInput.blur();
+            loadDesign(position);
+        }}
+
+        function highlight(index) {{
+            const items = searchResults.querySelectorAll('.search-result');
+            if (!items.length) return;
+            highlighted = (index + items.length) % items.length;
+            items.forEach((item, i) => item.classList.toggle('highlighted', i === highlighted));
+        }}
+
+        searchInput.addEventListener('focus', () => {{
+            loadSearch().catch(err => console.error(err));
+            if (searchInput.value.trim()) searchResults.classList.add('open');
+        }});
+        searchInput.addEventListener('input', () => runSearch().catch(err => console.error(err)));
+        searchInput.addEventListener('keydown', (e) => {{
+            if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {{
+                e.preventDefault();
+                highlight(highlighted + (e.key === 'ArrowDown' ? 1 : -1));
+            }} else if (e.key === 'Enter') {{
+                const item = searchResults.querySelectorAll('.search-result')[highlighted];
+                if (item) openResult(parseInt(item.dataset.position));
+            }} else if (e.key === 'Escape') {{
+                searchResults.classList.remove('open');
+                searchInput.blur();
+            }}
+        }});
+        searchResults.addEventListener('mousedown', (e) => {{
+            const item = e.target.closest('.search-result');
+            if (item) {{
+                e.preventDefault();
+                openResult(parseInt(item.dataset.position));
+            }}
+        }});
+        searchInput.addEventListener('blur', () => searchResults.classList.remove('open'));
+
+        async function getDesign(index) {{
+            const shard = await loadShard(Math.floor(index / catalog.shardSize));
+            return recordAt(shard, index % catalog.shardSize);
+        }}
+
+        // Warm the neighbouring shard once we are within a few designs of its edge.
+        function prefetchAround(index) {{
+            const margin = 16;
+            for (const neighbour of [index - margin, index + margin]) {{
+                if (neighbour >= 0 && neighbour < total) {{
+                    loadShard(Math.floor(neighbour / catalog.shardSize)).catch(() => {{}});
+                }}
+            }}
+        }}
 
         function renderDimensions(dims) {{
             if (!dims || Object.keys(dims).length === 0) {{
@@ -347,35 +1229,129 @@ def generate_viewer_html(designs: list[dict]) -> str:
                 `).join('');
         }}
 
-        function loadDesign(index) {{
-            if (index < 0 || index >= designs.length) return;
+        // One iframe per warm design, keyed by path. Frames start loading as
+        // soon as they are created, so navigating to a warm design just swaps
+        // which frame is visible.
+        function frameFor(path) {{
+            let frame = pool.get(path);
+            if (!frame) {{
+                frame = document.createElement('iframe');
+                frame.title = 'Design preview';
+                frame.dataset.loaded = '';
+                frame.onload = () => {{
+                    frame.dataset.loaded = '1';
+                    if (frame.classList.contains('active')) {{
+                        loading.style.display = 'none';
+                        poster.style.display = 'none';
+                    }}
+                }};
+                frame.src = path;
+                frames.appendChild(frame);
+                pool.set(path, frame);
+            }}
+            return frame;
+        }}
 
-            currentIndex = index;
-            const design = designs[index];
+        function showFrame(path) {{
+            const frame = frameFor(path);
+            for (const other of pool.values()) {{
+                if (other !== frame) other.classList.remove('active');
+            }}
+            frame.classList.add('active');
+            loading.style.display = frame.dataset.loaded ? 'none' : 'block';
+            poster.style.display = 'none';
+            return frame;
+        }}
 
-            loading.style.display = 'block';
-            viewer.style.opacity = '0';
+        // Show the vibe card over a frame that is still loading.
+        async function showPoster(index, frame, token) {{
+            const url = await cardFor(index);
+            if (!url || token !== loadToken || frame.dataset.loaded) return;
+            poster.src = url;
+            poster.style.display = 'block';
+            loading.style.display = 'none';
+        }}
 
-            viewer.onload = () => {{
-                loading.style.display = 'none';
-                viewer.style.opacity = '1';
-            }};
+        // Preload the next and previous PRELOAD designs, drop frames that fell
+        // out of the window, and hint the designs just beyond it.
+        async function warmAround(index, token) {{
+            const wanted = [index];
+            for (let distance = 1; distance <= PRELOAD; distance++) {{
+                wanted.push(step(index, distance), step(index, -distance));
+            }}
+            const keep = new Set();
+            for (const position of wanted) {{
+                if (position === -1) continue;
+                const design = await getDesign(position);
+                if (token !== loadToken) return;
+                keep.add(design.path);
+                frameFor(design.path);
+            }}
+            for (const [path, frame] of pool) {{
+                if (!keep.has(path)) {{
+                    frame.remove();
+                    pool.delete(path);
+                }}
+            }}
+
+            for (let distance = PRELOAD + 1; distance <= PRELOAD + PREFETCH; distance++) {{
+                const position = step(index, distance);
+                if (position === -1) break;
+                const design = await getDesign(position);
+                if (token !== loadToken) return;
+                if (prefetched.has(design.path) || pool.has(design.path)) continue;
+                const link = document.createElement('link');
+                link.rel = 'prefetch';
+                link.href = design.path;
+                document.head.appendChild(link);
+                prefetched.add(design.path);
+            }}
+        }}
+
+        async function loadDesign(index) {{
+            if (index < 0 || index >= total) return;
 
-            viewer.src = design.path;
-            counter.textContent = `${{index + 1}} / ${{designs.length}}`;
+            currentIndex = index;
+            const token = ++loadToken;
+            const rank = rankOf(index);
+            counter.textContent = order
+                ? `${{rank === -1 ? '–' : rank + 1}} / ${{order.length}}`
+                : `${{index + 1}} / ${{total}}`;
+            prevBtn.disabled = step(index, -1) === -1;
+            nextBtn.disabled = step(index, 1) === -1;
+
+            let design;
+            try {{
+                design = await getDesign(index);
+            }} catch (err) {{
+                if (token === loadToken) designName.textContent = 'Could not load design index';
+                console.error(err);
+                return;
+            }}
+            // A later navigation superseded this one while the shard was loading.
+            if (token !== loadToken) return;
+
+            const frame = showFrame(design.path);
+            if (!frame.dataset.loaded) showPoster(index, frame, token).catch(() => {{}});
             designName.textContent = design.name;
             designMeta.textContent = `${{design.batch}} · #${{design.id}}`;
 
-            prevBtn.disabled = index === 0;
-            nextBtn.disabled = index === designs.length - 1;
-
             // Update prompt panel content
             promptContent.innerHTML = renderDimensions(design.dimensions);
+            if (similarPanel.classList.contains('open')) renderSimilar(index).catch(err => console.error(err));
 
             // Update URL hash for bookmarking
             history.replaceState(null, '', `#${{design.batch}}/${{design.id}}`);
+            prefetchAround(index);
+            warmAround(index, token).catch(err => console.error(err));
         }}
 
+        similarToggle.addEventListener('click', toggleSimilar);
+        similarContent.addEventListener('click', (e) => {{
+            const item = e.target.closest('.similar-item');
+            if (item) loadDesign(parseInt(item.dataset.position, 10));
+        }});
+
         // Prompt toggle
         promptToggle.addEventListener('click', () => {{
             promptPanel.classList.toggle('open');
@@ -384,24 +1360,220 @@ def generate_viewer_html(designs: list[dict]) -> str:
         }});
 
         function next() {{
-            if (currentIndex < designs.length - 1) {{
-                loadDesign(currentIndex + 1);
+            const target = step(currentIndex, 1);
+            if (target !== -1) {{
+                loadDesign(target);
             }}
         }}
 
         function prev() {{
-            if (currentIndex > 0) {{
-                loadDesign(currentIndex - 1);
+            const target = step(currentIndex, -1);
+            if (target !== -1) {{
+                loadDesign(target);
+            }}
+        }}
+
+        // Grid mode: a virtualized overview of the (filtered) designs. Only
+        // rows near the viewport have cells in the DOM. An IntersectionObserver
+        // fills cells with their vibe card as they scroll into view, or, with
+        // "Live previews" on, with a scaled-down iframe; at most
+        // MAX_LIVE_FRAMES iframes exist at once and the rest wait their turn.
+        const CELL_WIDTH = 240;
+        const CELL_HEIGHT = 150;
+        const GAP = 16;
+        const OVERSCAN_ROWS = 2;
+        const MAX_LIVE_FRAMES = 12;
+        const grid = document.getElementById('grid');
+        const gridSpacer = document.getElementById('gridSpacer');
+        const gridToggle = document.getElementById('gridToggle');
+        const gridLive = document.getElementById('gridLive');
+        const gridStatus = document.getElementById('gridStatus');
+        let gridOpen = false;
+        let gridColumns = 1;
+        let gridRenderQueued = false;
+        const gridCells = new Map();
+        const liveFrames = new Set();
+        const liveQueue = [];
+
+        function gridCount() {{
+            return order ? order.length : total;
+        }}
+
+        const cellObserver = new IntersectionObserver(entries => {{
+            for (const entry of entries) {{
+                const cell = entry.target;
+                cell.dataset.visible = entry.isIntersecting ? '1' : '';
+                if (entry.isIntersecting) fillCell(cell);
+                else releaseFrame(cell);
+            }}
+            pumpLiveFrames();
+        }}, {{ root: grid, rootMargin: '150px 0px' }});
+
+        async function fillCell(cell) {{
+            if (gridLive.checked && !liveFrames.has(cell) && !liveQueue.includes(cell)) liveQueue.push(cell);
+            if (cell.dataset.filled || liveFrames.has(cell)) return;
+            cell.dataset.filled = '1';
+            const position = cell.dataset.position;
+            try {{
+                const url = await cardFor(parseInt(position));
+                if (!url || liveFrames.has(cell) || cell.dataset.position !== position) return;
+                const img = document.createElement('img');
+                img.alt = '';
+                img.decoding = 'async';
+                img.src = url;
+                cell.replaceChildren(img);
+            }} catch (err) {{
+                cell.dataset.filled = '';
+                console.error(err);
+            }}
+        }}
+
+        function pumpLiveFrames() {{
+            while (liveFrames.size < MAX_LIVE_FRAMES && liveQueue.length) {{
+                const cell = liveQueue.shift();
+                if (cell.isConnected && cell.dataset.visible) startFrame(cell);
+            }}
+        }}
+
+        async function startFrame(cell) {{
+            // The slot is taken before the record loads, so the cap holds
+            // even while shards are still being fetched.
+            liveFrames.add(cell);
+            let design;
+            try {{
+                design = await getDesign(parseInt(cell.dataset.position));
+            }} catch (err) {{
+                // A failed shard fetch must not keep the slot; give it to the next queued cell.
+                liveFrames.delete(cell);
+                console.error(err);
+                pumpLiveFrames();
+                return;
+            }}
+            if (!liveFrames.has(cell)) return;
+            const frame = document.createElement('iframe');
+            frame.title = design.name;
+            frame.tabIndex = -1;
+            frame.src = design.path;
+            cell.replaceChildren(frame);
+            cell.dataset.filled = '';
+        }}
+
+        function releaseFrame(cell) {{
+            const queued = liveQueue.indexOf(cell);
+            if (queued !== -1) liveQueue.splice(queued, 1);
+            if (liveFrames.delete(cell)) {{
+                cell.replaceChildren();
+                if (cell.dataset.visible && cell.isConnected) fillCell(cell);
+            }}
+        }}
+
+        function removeCell(rank, cell) {{
+            cellObserver.unobserve(cell);
+            cell.dataset.visible = '';
+            releaseFrame(cell);
+            cell.remove();
+            gridCells.delete(rank);
+        }}
+
+        // Create cells for the rows in (and just around) the viewport and
+        // drop the rest.
+        function renderGrid() {{
+            const rowHeight = CELL_HEIGHT + GAP;
+            const top = grid.scrollTop - gridSpacer.offsetTop;
+            const firstRow = Math.max(0, Math.floor(top / rowHeight) - OVERSCAN_ROWS);
+            const lastRow = Math.floor((top + grid.clientHeight) / rowHeight) + OVERSCAN_ROWS;
+            const first = firstRow * gridColumns;
+            const last = Math.min(gridCount(), (lastRow + 1) * gridColumns);
+
+            for (const [rank, cell] of gridCells) {{
+                if (rank < first || rank >= last) removeCell(rank, cell);
+            }}
+            for (let rank = first; rank < last; rank++) {{
+                if (gridCells.has(rank)) continue;
+                const position = order ? order[rank] : rank;
+                const cell = document.createElement('div');
+                cell.className = 'grid-cell';
+                if (position === currentIndex) cell.classList.add('current');
+                cell.dataset.position = position;
+                const x = (rank % gridColumns) * (CELL_WIDTH + GAP);
+                const y = Math.floor(rank / gridColumns) * rowHeight;
+                cell.style.transform = `translate(${{x}}px, ${{y}}px)`;
+                gridSpacer.appendChild(cell);
+                gridCells.set(rank, cell);
+                cellObserver.observe(cell);
             }}
+            pumpLiveFrames();
+        }}
+
+        function layoutGrid() {{
+            for (const [rank, cell] of gridCells) removeCell(rank, cell);
+            const width = grid.clientWidth - 2 * GAP;
+            gridColumns = Math.max(1, Math.floor((width + GAP) / (CELL_WIDTH + GAP)));
+            gridSpacer.style.height = `${{Math.ceil(gridCount() / gridColumns) * (CELL_HEIGHT + GAP)}}px`;
+            gridStatus.textContent = `${{gridCount()}} designs`;
+            renderGrid();
+        }}
+
+        function openGrid() {{
+            gridOpen = true;
+            document.body.classList.add('grid-mode');
+            gridToggle.classList.add('active');
+            layoutGrid();
+            // Start with the current design in the middle of the view.
+            const row = Math.floor(Math.max(0, rankOf(currentIndex)) / gridColumns);
+            grid.scrollTop = gridSpacer.offsetTop + row * (CELL_HEIGHT + GAP) - (grid.clientHeight - CELL_HEIGHT) / 2;
+            renderGrid();
+        }}
+
+        function closeGrid() {{
+            gridOpen = false;
+            document.body.classList.remove('grid-mode');
+            gridToggle.classList.remove('active');
+            for (const [rank, cell] of gridCells) removeCell(rank, cell);
         }}
 
+        gridToggle.addEventListener('click', () => gridOpen ? closeGrid() : openGrid());
+        gridSpacer.addEventListener('click', (e) => {{
+            const cell = e.target.closest('.grid-cell');
+            if (!cell) return;
+            closeGrid();
+            loadDesign(parseInt(cell.dataset.position));
+        }});
+        gridLive.addEventListener('change', () => {{
+            for (const cell of gridCells.values()) {{
+                releaseFrame(cell);
+                cell.dataset.filled = '';
+                if (cell.dataset.visible) fillCell(cell);
+            }}
+            pumpLiveFrames();
+        }});
+        grid.addEventListener('scroll', () => {{
+            if (gridRenderQueued) return;
+            gridRenderQueued = true;
+            requestAnimationFrame(() => {{
+                gridRenderQueued = false;
+                renderGrid();
+            }});
+        }}, {{ passive: true }});
+        window.addEventListener('resize', () => {{
+            if (gridOpen) layoutGrid();
+        }});
+
         // Button handlers
         prevBtn.addEventListener('click', prev);
         nextBtn.addEventListener('click', next);
 
         // Keyboard navigation
         document.addEventListener('keydown', (e) => {{
-            if (e.key === 'ArrowRight') {{
+            // Arrow keys inside the search box and filter selects belong to them.
+            if (e.target.closest && e.target.closest('input, select')) return;
+            if (e.key === 'g' && !e.metaKey && !e.ctrlKey && !e.altKey) {{
+                gridOpen ? closeGrid() : openGrid();
+            }} else if (gridOpen) {{
+                if (e.key === 'Escape') closeGrid();
+            }} else if (e.key === 's' && !e.metaKey && !e.ctrlKey && !e.altKey) {{
+                toggleSimilar();
+            }} else if (e.key === 'ArrowRight') {{
                 e.preventDefault();
                 next();
             }} else if (e.key === 'ArrowLeft') {{
@@ -410,14 +1582,21 @@ def generate_viewer_html(designs: list[dict]) -> str:
             }}
         }});
 
-        // Parse hash on load
+        // Parse hash on load: the batch's id runs give the position directly
         function parseHash() {{
             const hash = window.location.hash.slice(1);
             if (hash) {{
                 const [batch, id] = hash.split('/');
-                const index = designs.findIndex(d => d.batch === batch && d.id === parseInt(id));
-                if (index !== -1) {{
-                    return index;
+                const range = catalog.batches.find(b => b.name === batch);
+                const wanted = parseInt(id);
+                if (range) {{
+                    let offset = 0;
+                    for (const [first, length] of range.ids) {{
+                        if (wanted >= first && wanted < first + length) {{
+                            return range.start + offset + wanted - first;
+                        }}
+                        offset += length;
+                    }}
                 }}
             }}
             return 0;
@@ -441,11 +1620,11 @@ def generate_viewer_html(designs: list[dict]) -> str:
 '''
 
 
-def build_viewer(outputs_path: Path) -> None:
+def build_viewer(outputs_path: Path, use_cache: bool = True, preload: int = DEFAULT_PRELOAD) -> None:
     """Build the unified design viewer."""
     console.print("[blue]Collecting designs from all batches...[/blue]")
 
-    designs = collect_all_designs(outputs_path)
+    designs = collect_all_designs(outputs_path, use_cache=use_cache)
 
     if not designs:
         console.print("[red]No designs found![/red]")
@@ -458,8 +1637,28 @@ def build_viewer(outputs_path: Path) -> None:
     json_path.write_text(json.dumps(designs, indent=2))
     console.print(f"[green]Wrote {json_path}[/green]")
 
+    # Full-text index over the pages themselves (only new or edited pages are parsed)
+    fulltext = index_designs(outputs_path, designs)
+    console.print(f"[green]Indexed page text ({fulltext.parsed} new or changed pages parsed)[/green]")
+
+    # Vibe cards from each page's :root tokens (only new or edited pages are read)
+    tokens, extracted = collect_tokens(outputs_path, designs)
+    console.print(f"[green]Rendered vibe cards ({extracted} new or changed pages read)[/green]")
+
+    # Nearest neighbours for the "Similar" panel (only new or changed designs are searched in full)
+    similar = build_similar_index(outputs_path, designs, tokens)
+    console.print(f"[green]Updated similar designs ({similar.refreshed} neighbour lists searched)[/green]")
+
+    # Write the sharded catalog the viewer loads lazily
+    catalog = write_catalog(designs, SiteWriter(outputs_path.parent), fulltext, build_cards(designs, tokens),
+                            similar.viewer_lists())
+    console.print(
+        f"[green]Wrote {CATALOG_DIR_NAME}/ ({len(catalog['bootstrap']['shards'])} shards, "
+        f"{catalog['written']} files updated, {catalog['removed']} removed)[/green]"
+    )
+
     # Write index HTML (the viewer is now the main page)
-    viewer_html = generate_viewer_html(designs)
+    viewer_html = generate_viewer_html(catalog["bootstrap"], preload=preload)
     index_path = outputs_path.parent / "index.html"
     index_path.write_text(viewer_html)
     console.print(f"[green]Wrote {index_path}[/green]")